@@ -0,0 +1,251 @@
+"""
+금융위원회 REPO거래정보 - 일별 가중평균 금리 집계 테이블 (daily_vwap_agg)
+원본 거래 DB 안에 (날짜, 담보, 통화, 만기) 단위의 누적합을 유지
+- sum_amt      = SUM(buyScrtBuyAmt)
+- sum_rate_amt = SUM(rpInrt * buyScrtBuyAmt)
+가중평균 금리 = sum_rate_amt / sum_amt 이므로 일별 금리 산출이 전체 거래 스캔 없이 O(일수)
+
+- 수집 시: RP_Collector.TradeWriter가 날짜 수집 완료 시점에 해당 날짜만 갱신
+- 기존 DB: refresh_dirty_dates()가 마지막 갱신 이후 수집된 날짜만 다시 집계
+- 집계 테이블 없이 원본을 직접 읽을 때: compute_daily_vwap()이 커버링 인덱스로 한 번만 스캔
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+import RP_Metrics as rm
+import RP_Schema as rs
+
+AGG_TABLE = 'daily_vwap_agg'
+AGG_STATE_TABLE = 'daily_vwap_agg_state'
+
+# 기본 분석 조건 (RP_Classify와 동일)
+DEFAULT_CURRENCY = '대한민국 원'
+DEFAULT_TERM = '1영업일'
+TOTAL_LABEL = '전체'
+
+def init_agg_tables(conn):
+    """
+    집계 테이블 / 갱신 상태 테이블 생성
+    """
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {AGG_TABLE} (
+            basDt TEXT NOT NULL,
+            rpBuyAplCurCdNm TEXT,
+            rdptTermCcdNm TEXT,
+            scrsItmsKcdNm TEXT,
+            sum_amt REAL,
+            sum_rate_amt REAL,
+            trade_count INTEGER,
+            PRIMARY KEY (basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {AGG_STATE_TABLE} (
+            basDt TEXT PRIMARY KEY,
+            refreshed_at TEXT
+        )
+    ''')
+
+def date_source_sql(conn):
+    """
+    날짜 하나의 거래를 (통화명, 만기명, 담보명, 금리, 금액, 증거금률)로 읽는 SQL (파라미터: 날짜 1개)
+    정규화 DB는 뷰 대신 거래 테이블 PK(basDt 정수)를 직접 사용
+    다른 날짜별 집계(RP_Dispersion 스케치 등)도 같은 SQL을 FROM 절로 사용
+    """
+    if rs.is_normalized(conn):
+        return f'''
+            SELECT CAST(f.basDt AS TEXT) AS basDt, c.name AS rpBuyAplCurCdNm,
+                   t.name AS rdptTermCcdNm, s.name AS scrsItmsKcdNm,
+                   f.rpInrt AS rpInrt, f.buyScrtBuyAmt AS buyScrtBuyAmt, f.rpMrgamRto AS rpMrgamRto
+            FROM {rs.FACT_TABLE} f
+            LEFT JOIN dim_currency c ON c.id = f.cur_id
+            LEFT JOIN dim_term t ON t.id = f.term_id
+            LEFT JOIN dim_scrs_itms s ON s.id = f.scrs_id
+            WHERE f.basDt = CAST(? AS INTEGER)
+        '''
+    return '''
+        SELECT basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm,
+               CAST(rpInrt AS REAL) AS rpInrt, CAST(buyScrtBuyAmt AS REAL) AS buyScrtBuyAmt,
+               CAST(rpMrgamRto AS REAL) AS rpMrgamRto
+        FROM repo_trades
+        WHERE basDt = ?
+    '''
+
+def refresh_date(conn, base_date):
+    """
+    날짜 하나의 집계를 다시 계산 (커밋은 호출자가 담당)
+    """
+    with rm.timer('sql.agg_refresh_date'):
+        conn.execute(f'DELETE FROM {AGG_TABLE} WHERE basDt = ?', (base_date,))
+        conn.execute(f'''
+            INSERT INTO {AGG_TABLE}
+            SELECT basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm,
+                   SUM(buyScrtBuyAmt), SUM(rpInrt * buyScrtBuyAmt), COUNT(*)
+            FROM ({date_source_sql(conn)})
+            WHERE buyScrtBuyAmt > 0
+            GROUP BY rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm
+        ''', (base_date,))
+    conn.execute(
+        f'INSERT OR REPLACE INTO {AGG_STATE_TABLE} (basDt, refreshed_at) VALUES (?, ?)',
+        (base_date, datetime.now().isoformat())
+    )
+
+def find_dirty_dates(conn, state_table=AGG_STATE_TABLE):
+    """
+    집계가 필요한 날짜 목록
+    - 집계된 적이 없는 날짜
+    - 마지막 집계 이후 다시 수집된 날짜 (collection_status.collected_at 기준,
+      collection_status가 없는 DB는 다시 수집된 날짜 없음으로 처리)
+    state_table: (basDt, refreshed_at) 갱신 상태 테이블 (다른 날짜별 집계도 같은 방식으로 사용)
+    """
+    init_agg_tables(conn)
+    if rs.is_normalized(conn):
+        trade_dates = f'SELECT DISTINCT CAST(basDt AS TEXT) AS basDt FROM {rs.FACT_TABLE}'
+    else:
+        trade_dates = 'SELECT DISTINCT basDt FROM repo_trades'
+
+    sql = f'''
+        SELECT d.basDt
+        FROM ({trade_dates}) d
+        LEFT JOIN {state_table} a ON a.basDt = d.basDt
+        WHERE a.basDt IS NULL
+    '''
+    has_status = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='collection_status'"
+    ).fetchone() is not None
+    if has_status:
+        sql += f'''
+            UNION
+            SELECT cs.basDt
+            FROM collection_status cs
+            JOIN {state_table} a ON a.basDt = cs.basDt
+            WHERE cs.collected_at > a.refreshed_at
+        '''
+
+    with rm.timer('sql.find_dirty_dates'):
+        rows = conn.execute(sql).fetchall()
+    return sorted(r[0] for r in rows)
+
+def refresh_dirty_dates(conn, verbose=True):
+    """
+    변경된 날짜만 다시 집계 (기존 DB 최초 실행 시에는 전체 날짜 집계)
+    """
+    dates = find_dirty_dates(conn)
+    for i, base_date in enumerate(dates, 1):
+        refresh_date(conn, base_date)
+        if i % 100 == 0:
+            conn.commit()
+            if verbose:
+                print(f"  → 집계 갱신 {i}/{len(dates)}일")
+    conn.commit()
+    if verbose:
+        print(f"✓ 일별 집계 갱신: {len(dates)}일")
+    return dates
+
+def vwap_with_total(df):
+    """
+    (basDt, scrsItmsKcdNm, sum_amt, sum_rate_amt) 부분합 → 담보별 + 전체 가중평균 금리
+    전체 행은 담보별 부분합을 다시 더해 만들므로 원본 거래를 한 번 더 읽지 않음
+    다른 경로로 만든 부분합(RP_Chunked 청크 집계 등)도 같은 함수로 마무리
+    """
+    by_collateral = df.groupby(['basDt', 'scrsItmsKcdNm'], dropna=False)[['sum_amt', 'sum_rate_amt']].sum().reset_index()
+    total = df.groupby('basDt')[['sum_amt', 'sum_rate_amt']].sum().reset_index()
+    total['scrsItmsKcdNm'] = TOTAL_LABEL
+
+    result = pd.concat([by_collateral, total], ignore_index=True)
+    result['vwap_rate'] = result['sum_rate_amt'] / result['sum_amt']
+    return result[['basDt', 'scrsItmsKcdNm', 'vwap_rate']].sort_values('basDt', kind='stable').reset_index(drop=True)
+
+def load_daily_vwap(conn, currency=DEFAULT_CURRENCY, term=DEFAULT_TERM,
+                    start_date='20150101', end_date='20251231'):
+    """
+    집계 테이블에서 담보별 + 전체 가중평균 금리 조회 (long format)
+    반환 컬럼: basDt, scrsItmsKcdNm, vwap_rate
+    """
+    with rm.timer('sql.load_daily_vwap'):
+        df = pd.read_sql_query(f'''
+            SELECT basDt, scrsItmsKcdNm, sum_amt, sum_rate_amt
+            FROM {AGG_TABLE}
+            WHERE rpBuyAplCurCdNm = ? AND rdptTermCcdNm = ?
+              AND basDt BETWEEN ? AND ?
+        ''', conn, params=(currency, term, start_date, end_date))
+    rm.count('sql.rows_read', len(df))
+    return vwap_with_total(df)
+
+# -----------------------------------------------------------------------------
+# 원본 거래 테이블 직접 집계 (집계 테이블 없이, 한 번의 스캔)
+# -----------------------------------------------------------------------------
+VWAP_INDEX = 'idx_vwap_cover'
+
+def ensure_vwap_index(conn, table='repo_trades'):
+    """
+    가중평균 금리 집계용 커버링 인덱스 생성
+    (통화, 만기, 날짜, 담보) 순서라 GROUP BY basDt, 담보가 인덱스 순서 그대로 진행되고,
+    금액/금리까지 포함해 원본 테이블을 읽지 않음
+    """
+    if rs.is_normalized(conn):
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {VWAP_INDEX}
+            ON {rs.FACT_TABLE}(cur_id, term_id, basDt, scrs_id, buyScrtBuyAmt, rpInrt)
+        ''')
+    else:
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {VWAP_INDEX}
+            ON "{table}"(rpBuyAplCurCdNm, rdptTermCcdNm, basDt, scrsItmsKcdNm, buyScrtBuyAmt, rpInrt)
+        ''')
+    conn.commit()
+
+def compute_daily_vwap(conn, currency=DEFAULT_CURRENCY, term=DEFAULT_TERM,
+                       start_date='20150101', end_date='20251231', table='repo_trades'):
+    """
+    원본 거래 테이블을 한 번만 읽어 담보별 + 전체 가중평균 금리 산출 (long format)
+    반환 컬럼: basDt, scrsItmsKcdNm, vwap_rate
+    """
+    with rm.timer('sql.ensure_vwap_index'):
+        ensure_vwap_index(conn, table)
+
+    with rm.timer('sql.compute_daily_vwap'):
+        if rs.is_normalized(conn):
+            # 통화/만기 이름 → 사전 ID로 바꿔 거래 테이블 인덱스를 직접 사용
+            cur_ids = [r[0] for r in conn.execute('SELECT id FROM dim_currency WHERE name = ?', (currency,))]
+            term_ids = [r[0] for r in conn.execute('SELECT id FROM dim_term WHERE name = ?', (term,))]
+            df = pd.read_sql_query(f'''
+                SELECT CAST(g.basDt AS TEXT) AS basDt, s.name AS scrsItmsKcdNm, g.sum_amt, g.sum_rate_amt
+                FROM (
+                    SELECT basDt, scrs_id,
+                           SUM(buyScrtBuyAmt) AS sum_amt, SUM(rpInrt * buyScrtBuyAmt) AS sum_rate_amt
+                    FROM {rs.FACT_TABLE}
+                    WHERE cur_id IN ({', '.join('?' * len(cur_ids)) or 'NULL'})
+                      AND term_id IN ({', '.join('?' * len(term_ids)) or 'NULL'})
+                      AND basDt BETWEEN CAST(? AS INTEGER) AND CAST(? AS INTEGER)
+                      AND buyScrtBuyAmt > 0
+                    GROUP BY basDt, scrs_id
+                ) g
+                LEFT JOIN dim_scrs_itms s ON s.id = g.scrs_id
+            ''', conn, params=(*cur_ids, *term_ids, start_date, end_date))
+        else:
+            df = pd.read_sql_query(f'''
+                SELECT basDt, scrsItmsKcdNm,
+                       SUM(buyScrtBuyAmt) AS sum_amt, SUM(rpInrt * buyScrtBuyAmt) AS sum_rate_amt
+                FROM "{table}"
+                WHERE rpBuyAplCurCdNm = ?
+                  AND rdptTermCcdNm = ?
+                  AND basDt BETWEEN ? AND ?
+                  AND buyScrtBuyAmt > 0
+                GROUP BY basDt, scrsItmsKcdNm
+            ''', conn, params=(currency, term, start_date, end_date))
+    rm.count('sql.rows_read', len(df))
+
+    return vwap_with_total(df)
+
+def open_and_refresh(db_path, verbose=True):
+    """
+    원본 DB를 열고 변경분 집계를 반영한 연결 반환
+    """
+    conn = sqlite3.connect(db_path)
+    init_agg_tables(conn)
+    refresh_dirty_dates(conn, verbose)
+    return conn
@@ -0,0 +1,493 @@
+"""
+금융위원회 REPO거래정보 - 성능 측정 스크립트
+
+사용법:
+    python RP_Bench.py vwap <원본거래.db>
+        기존 RP_Classify 방식(담보별/전체 쿼리 2회) vs 날짜 구간 청크 집계 vs 한 번의 스캔 + 커버링 인덱스 vs 집계 테이블 비교
+    python RP_Bench.py suite [행수] [--save-baseline] [--only 단계 ...]
+        합성 거래 DB(RP_Synth, 기본 SUITE_ROWS건)로 단계별 성능 측정 후 저장된 기준값과 비교
+        단계: ingest(TradeWriter 적재), collect(스텁 API 전체 수집), vwap(RP_Classify 쿼리),
+              merge(asd.py 통합 / RP_Store 분할 집계), loaders(노트북 거래대금 쿼리 / daily_repo_rates 로드)
+        기준값보다 REGRESSION_TOLERANCE 이상 느린 항목이 있으면 ❌ 표시 후 종료 코드 1
+        --save-baseline: 이번 결과를 기준값으로 저장 (기계 + 행수별)
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import RP_Aggregate
+
+# 기존 RP_Classify.py의 쿼리 (비교 기준)
+LEGACY_QUERY_BY_COLLATERAL = """
+    SELECT
+        basDt,
+        scrsItmsKcdNm,
+        SUM( CAST(rpInrt AS REAL) * CAST(buyScrtBuyAmt AS REAL) ) / SUM( CAST(buyScrtBuyAmt AS REAL) ) as vwap_rate
+    FROM repo_trades
+    WHERE
+        rpBuyAplCurCdNm = '대한민국 원'
+        AND rdptTermCcdNm = '1영업일'
+        AND basDt BETWEEN '20150101' AND '20251231'
+        AND CAST(buyScrtBuyAmt AS REAL) > 0
+    GROUP BY basDt, scrsItmsKcdNm
+    ORDER BY basDt
+"""
+
+LEGACY_QUERY_TOTAL = """
+    SELECT
+        basDt,
+        '전체' as scrsItmsKcdNm,
+        SUM( CAST(rpInrt AS REAL) * CAST(buyScrtBuyAmt AS REAL) ) / SUM( CAST(buyScrtBuyAmt AS REAL) ) as vwap_rate
+    FROM repo_trades
+    WHERE
+        rpBuyAplCurCdNm = '대한민국 원'
+        AND rdptTermCcdNm = '1영업일'
+        AND basDt BETWEEN '20150101' AND '20251231'
+        AND CAST(buyScrtBuyAmt AS REAL) > 0
+    GROUP BY basDt
+    ORDER BY basDt
+"""
+
+def _best_of(func, repeat):
+    """repeat회 실행 중 가장 빠른 시간(초)과 마지막 결과 반환"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def _same_result(a, b):
+    """두 결과(basDt, scrsItmsKcdNm, vwap_rate)가 같은지 확인"""
+    key = ['basDt', 'scrsItmsKcdNm']
+    a = a.sort_values(key).reset_index(drop=True)
+    b = b.sort_values(key).reset_index(drop=True)
+    if len(a) != len(b) or not (a[key].astype(str).values == b[key].astype(str).values).all():
+        return False
+    return bool(((a['vwap_rate'] - b['vwap_rate']).abs() < 1e-9).all())
+
+def _same_table(a, b):
+    """두 일별 금리 표(날짜 인덱스 x 담보 컬럼)가 같은지 확인 (인덱스 이름/컬럼 순서 무시)"""
+    if list(a.index) != list(b.index) or sorted(a.columns) != sorted(b.columns):
+        return False
+    diff = (a[b.columns] - b).abs()
+    return bool(((diff < 1e-9) | (a[b.columns].isna() & b.isna())).all().all())
+
+def bench_vwap(db_path, repeat=3):
+    """
+    일별 가중평균 금리 산출 방식별 소요 시간 비교
+    ※ 비교를 위해 커버링 인덱스(idx_vwap_cover)를 잠시 삭제 후 다시 생성
+    """
+    conn = sqlite3.connect(db_path)
+    n_trades = conn.execute('SELECT COUNT(*) FROM repo_trades').fetchone()[0]
+
+    print(f"\n{'='*70}")
+    print(f"📊 일별 가중평균 금리 벤치마크: {db_path} ({n_trades:,}건, {repeat}회 중 최솟값)")
+    print(f"{'='*70}")
+
+    # 1) 기존 방식: 담보별 쿼리 + 전체 쿼리 (원본 2회 스캔)
+    conn.execute(f'DROP INDEX IF EXISTS {RP_Aggregate.VWAP_INDEX}')
+
+    def legacy():
+        by_coll = pd.read_sql_query(LEGACY_QUERY_BY_COLLATERAL, conn)
+        total = pd.read_sql_query(LEGACY_QUERY_TOTAL, conn)
+        return pd.concat([by_coll, total], ignore_index=True)
+
+    t_legacy, df_legacy = _best_of(legacy, repeat)
+
+    # 1-1) 날짜 구간 단위 집계 (인덱스 없이 basDt 범위 탐색, 임시 정렬은 청크 크기로 제한)
+    import RP_Chunked
+    t_chunked, df_chunked = _best_of(lambda: RP_Chunked.compute_daily_vwap(db_path, verbose=False), repeat)
+
+    # 2) 한 번의 스캔 + 커버링 인덱스 (인덱스 생성은 최초 1회 비용으로 따로 측정)
+    t0 = time.perf_counter()
+    RP_Aggregate.ensure_vwap_index(conn)
+    t_index = time.perf_counter() - t0
+    t_single, df_single = _best_of(lambda: RP_Aggregate.compute_daily_vwap(conn), repeat)
+
+    # 3) 집계 테이블 (최초 집계는 따로 측정)
+    t0 = time.perf_counter()
+    RP_Aggregate.refresh_dirty_dates(conn, verbose=False)
+    t_refresh = time.perf_counter() - t0
+    t_agg, df_agg = _best_of(lambda: RP_Aggregate.load_daily_vwap(conn), repeat)
+    conn.close()
+
+    print(f"  기존 (쿼리 2회)            : {t_legacy:8.3f}초")
+    print(f"  날짜 구간 청크 집계        : {t_chunked:8.3f}초  ({t_legacy / t_chunked:5.1f}배, {RP_Chunked.CHUNK_DAYS}일 단위)")
+    print(f"  한 번의 스캔 + 커버링 인덱스: {t_single:8.3f}초  ({t_legacy / t_single:5.1f}배, 인덱스 생성 {t_index:.3f}초 별도)")
+    print(f"  집계 테이블 조회            : {t_agg:8.3f}초  ({t_legacy / t_agg:5.1f}배, 변경분 집계 {t_refresh:.3f}초 별도)")
+    print(f"  결과 일치: 청크 {_same_result(df_legacy, df_chunked)}, 한 번의 스캔 {_same_result(df_legacy, df_single)}, "
+          f"집계 테이블 {_same_result(df_legacy, df_agg)}")
+
+    return {
+        'trades': n_trades,
+        'legacy_sec': t_legacy,
+        'chunked_sec': t_chunked,
+        'single_scan_sec': t_single,
+        'index_build_sec': t_index,
+        'agg_table_sec': t_agg,
+        'agg_refresh_sec': t_refresh,
+    }
+
+# -----------------------------------------------------------------------------
+# 단계별 성능 측정 (합성 데이터)
+# -----------------------------------------------------------------------------
+BENCH_DIR = os.path.join('cache', 'bench')
+BASELINE_FILE = 'bench_baselines.json'
+SUITE_ROWS = 1000000            # 기본 합성 거래 건수
+SUITE_SEED = 20250101
+SUITE_REPEAT = 3
+INGEST_ROWS = 200000            # ingest 단계 적재 건수 상한
+COLLECT_DAYS = ('20250303', '20250314')   # collect 단계 수집 기간 (스텁 API)
+COLLECT_TRADES_PER_DAY = 3000
+REGRESSION_TOLERANCE = 0.20     # 기준값 대비 허용 증가율 (초 단위 항목)
+STAGES = ['ingest', 'collect', 'vwap', 'merge', 'loaders']
+
+# asd.py 입력 DB 구성 (기간별 D_Repo 파일)
+MERGE_PARTS = [('2015-2019', '20150101', '20191231'), ('2020-2024', '20200101', '20241231'),
+               ('2025', '20250101', '20251231')]
+
+# 기초통계량 분석 노트북의 연도별 거래대금 쿼리 (비교 기준)
+LEGACY_ANNUAL_TOTAL = """
+    SELECT
+        SUBSTR(basDt, 1, 4) as year,
+        SUM(CAST(rpBuyAmt AS REAL)) as total_amount
+    FROM repo_trades
+    WHERE rpBuyAplCurCdNm = '대한민국 원'
+    GROUP BY SUBSTR(basDt, 1, 4)
+"""
+
+LEGACY_ANNUAL_COLLATERAL = """
+    SELECT
+        SUBSTR(basDt, 1, 4) as year,
+        scrsItmsKcdNm as collateral,
+        SUM(CAST(rpBuyAmt AS REAL)) as amount
+    FROM repo_trades
+    WHERE rpBuyAplCurCdNm = '대한민국 원'
+      AND rdptTermCcdNm = '1영업일'
+    GROUP BY SUBSTR(basDt, 1, 4), scrsItmsKcdNm
+"""
+
+def synth_db(n_rows=SUITE_ROWS, seed=SUITE_SEED):
+    """합성 거래 DB 경로 (없으면 RP_Synth로 생성, 같은 행수/시드는 재사용)"""
+    import RP_Synth
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f'synth_{n_rows}_{seed}.db')
+    if not os.path.exists(path):
+        print(f"⏳ 합성 거래 DB 생성: {path}")
+        tmp = path + '.tmp'
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        RP_Synth.generate_db(tmp, n_rows, seed=seed)
+        os.replace(tmp, path)
+    return path
+
+def _fresh_trade_db(name):
+    """빈 거래 DB (RP_Collector 스키마)"""
+    import RP_Synth
+
+    path = os.path.join(BENCH_DIR, name)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    RP_Synth._init_trade_db(path)
+    return path
+
+def bench_ingest(n_rows=INGEST_ROWS, seed=SUITE_SEED):
+    """
+    API 응답 형식 거래 dict -> TradeWriter.write_trades 적재 속도 (save_trades_to_db 경로)
+    """
+    import RP_Calendar
+    import RP_Collector
+    import RP_Synth
+
+    records, n_trades = [], 0
+    for base_date in RP_Calendar.trading_days('20150101', '20251231'):
+        if n_trades >= n_rows:
+            break
+        day = RP_Synth.day_records(base_date, COLLECT_TRADES_PER_DAY, seed)
+        records.append((base_date, day))
+        n_trades += len(day)
+    path = _fresh_trade_db('ingest.db')
+
+    writer = RP_Collector.TradeWriter(path)
+    t0 = time.perf_counter()
+    for base_date, day in records:
+        for page_no, start in enumerate(range(0, len(day), RP_Collector.PAGE_SIZE), 1):
+            writer.write_trades(day[start:start + RP_Collector.PAGE_SIZE], base_date, page_no)
+    writer.commit()
+    elapsed = time.perf_counter() - t0
+    writer.close()
+
+    print(f"  ingest : {n_trades:,}건 {elapsed:.3f}초 ({n_trades / elapsed:,.0f}건/초)")
+    return {'ingest_sec': elapsed, 'ingest_rows': n_trades, 'ingest_rows_per_sec': n_trades / elapsed}
+
+def bench_collect(start_date=COLLECT_DAYS[0], end_date=COLLECT_DAYS[1], trades_per_day=COLLECT_TRADES_PER_DAY):
+    """
+    스텁 API(RP_MockAPI, synthetic) -> collect_date_range 전체 경로 (HTTP + JSON + 적재)
+    응답 캐시는 끄고 요청 속도 제한은 풀어서 측정
+    """
+    import RP_Collector as rc
+    import RP_MockAPI
+
+    server, base_url = RP_MockAPI.start_mock_server(trades_per_day=trades_per_day, generator='synthetic')
+    path = _fresh_trade_db('collect.db')
+    prev = (rc.DB_FILE, rc.CACHE_MODE, rc.BASE_URL, rc._rate_limiter)
+    rc.DB_FILE, rc.CACHE_MODE, rc.BASE_URL = path, 'off', base_url
+    rc.configure_rate_limit(10000)
+    try:
+        t0 = time.perf_counter()
+        rc.collect_date_range(start_date, end_date)
+        rc.close_writer()
+        elapsed = time.perf_counter() - t0
+    finally:
+        rc.DB_FILE, rc.CACHE_MODE, rc.BASE_URL, rc._rate_limiter = prev
+        server.shutdown()
+        server.server_close()
+
+    conn = sqlite3.connect(path)
+    n_trades = conn.execute('SELECT COUNT(*) FROM repo_trades').fetchone()[0]
+    conn.close()
+    print(f"  collect: {n_trades:,}건 {elapsed:.3f}초 ({n_trades / elapsed:,.0f}건/초, 요청 {server.request_count}회)")
+    return {'collect_sec': elapsed, 'collect_rows': n_trades, 'collect_rows_per_sec': n_trades / elapsed}
+
+def _reset_agg(db_path):
+    """집계 테이블 삭제 (벤치마크마다 전체 집계부터 측정)"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(f'DROP TABLE IF EXISTS {RP_Aggregate.AGG_TABLE}')
+    conn.execute(f'DROP TABLE IF EXISTS {RP_Aggregate.AGG_STATE_TABLE}')
+    conn.commit()
+    conn.close()
+
+def _merge_inputs(db_path):
+    """
+    합성 거래 DB의 일별 가중평균 금리 -> 기간별 D_Repo 형식 DB 3개 (asd.py 입력과 같은 형식, 1회 생성)
+    """
+    conn = sqlite3.connect(db_path)
+    daily = RP_Aggregate.compute_daily_vwap(conn)
+    conn.close()
+    daily = daily.pivot_table(index='basDt', columns='scrsItmsKcdNm', values='vwap_rate').round(3)
+    daily.index = pd.to_datetime(daily.index, format='%Y%m%d')
+    daily.columns.name = None
+    daily = daily[[RP_Aggregate.TOTAL_LABEL] + [c for c in daily.columns if c != RP_Aggregate.TOTAL_LABEL]]
+
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    paths = []
+    for label, start, end in MERGE_PARTS:
+        path = os.path.join(BENCH_DIR, f'{stem}_D_Repo_{label}.db')
+        if not os.path.exists(path):
+            part = daily.loc[start:end]
+            out = sqlite3.connect(path)
+            part.to_sql('daily_repo_rates', out, if_exists='replace', index=True, index_label='basDt')
+            out.close()
+        paths.append(path)
+    return paths
+
+def _legacy_merge(input_dbs, output_db):
+    """최적화 전 asd.py 통합 방식 고정 사본 (비교 기준 행)"""
+    df_list = []
+    for db_path in input_dbs:
+        conn = sqlite3.connect(db_path)
+        df_temp = pd.read_sql("SELECT * FROM daily_repo_rates", conn)
+        conn.close()
+        df_temp['date'] = pd.to_datetime(df_temp['basDt'])
+        df_list.append(df_temp.drop(columns=['basDt']))
+
+    df_combined = pd.concat(df_list, ignore_index=True)
+    df_combined = df_combined.drop_duplicates(subset=['date'], keep='first')
+    df_combined = df_combined.sort_values('date').reset_index(drop=True).set_index('date')
+
+    conn = sqlite3.connect(output_db)
+    df_combined.to_sql('daily_repo_rates', conn, if_exists='replace', index=True, index_label='basDt')
+    conn.close()
+    return df_combined
+
+def _merge_store(db_path):
+    """합성 거래 DB를 연도별 분할 저장소로 나눈 것 (RP_Store 통합 경로 입력, 1회 생성)"""
+    import RP_Store
+
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    store = RP_Store.PartitionedStore(os.path.join(BENCH_DIR, f'{stem}_store'))
+    if not store.partitions():
+        store.split_legacy(db_path)
+    return store
+
+def bench_merge(db_path, repeat=SUITE_REPEAT):
+    """
+    daily_repo_rates 통합: 기존 방식 사본(비교 기준) vs 배포 코드 asd.merge_daily_dbs vs RP_Store 분할 집계
+    """
+    import asd
+
+    input_dbs = _merge_inputs(db_path)
+    store = _merge_store(db_path)
+    output_db = os.path.join(BENCH_DIR, 'merge_out.db')
+
+    def shipped():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asd.merge_daily_dbs(input_dbs, output_db)
+
+    def partitioned():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return store.export_daily_repo_rates(os.path.join(BENCH_DIR, 'merge_store_out.db'))
+
+    t_legacy, legacy = _best_of(lambda: _legacy_merge(input_dbs, output_db), repeat)
+    t_shipped, merged = _best_of(shipped, repeat)
+    t_store, from_store = _best_of(partitioned, repeat)
+    same, same_store = _same_table(legacy, merged), _same_table(legacy, from_store)
+    print(f"  merge  : {len(merged):,}일 기존 {t_legacy:.3f}초 / asd.py {t_shipped:.3f}초 (결과 일치 {same}) / "
+          f"RP_Store {t_store:.3f}초 (결과 일치 {same_store})")
+    return {'legacy_sec': t_legacy, 'shipped_sec': t_shipped, 'store_sec': t_store, 'merge_days': len(merged)}
+
+def bench_loaders(db_path, repeat=SUITE_REPEAT):
+    """
+    노트북 로더: 연도별 거래대금(SUBSTR GROUP BY 2회 vs RP_Cube 1회 스캔 vs 날짜 구간 청크 집계), daily_repo_rates 로드
+    """
+    import RP_Chunked
+    import RP_Cube
+    import RP_Panel
+
+    def legacy():
+        conn = sqlite3.connect(db_path)
+        total = pd.read_sql(LEGACY_ANNUAL_TOTAL, conn)
+        coll = pd.read_sql(LEGACY_ANNUAL_COLLATERAL, conn)
+        conn.close()
+        return total, coll
+
+    cubes = [
+        RP_Cube.Cube('annual_volume', ['year'], ['volume'], where={'rpBuyAplCurCdNm': RP_Aggregate.DEFAULT_CURRENCY}),
+        RP_Cube.Cube('annual_collateral_volume', ['year', 'scrsItmsKcdNm'], ['volume'],
+                     where={'rpBuyAplCurCdNm': RP_Aggregate.DEFAULT_CURRENCY,
+                            'rdptTermCcdNm': RP_Aggregate.DEFAULT_TERM}),
+    ]
+    t_legacy, (total, _) = _best_of(legacy, repeat)
+    t_cube, result = _best_of(lambda: RP_Cube.compute_cubes([db_path], cubes, use_cache=False, verbose=False), repeat)
+    same = bool(((total.set_index('year')['total_amount'].sort_index()
+                  - result['annual_volume'].set_index('year')['volume'].sort_index()).abs() < 1).all())
+
+    def chunked():
+        partials = RP_Chunked.daily_partials(db_path, verbose=False)
+        return (RP_Chunked.annual_volume(partials),
+                RP_Chunked.annual_volume(partials, term=RP_Aggregate.DEFAULT_TERM, by_collateral=True))
+
+    t_chunked, (chunked_total, _) = _best_of(chunked, repeat)
+    same_chunked = bool(((total.set_index('year')['total_amount'].sort_index()
+                          - chunked_total.set_index('year')['total_amount'].sort_index()).abs() < 1).all())
+
+    merged = os.path.join(BENCH_DIR, 'merge_out.db')
+    if not os.path.exists(merged):
+        _legacy_merge(_merge_inputs(db_path), merged)
+    t_repo, repo = _best_of(lambda: RP_Panel._read_repo(merged), repeat)
+
+    print(f"  loaders: 연도별 거래대금 SUBSTR 쿼리 {t_legacy:.3f}초 / RP_Cube {t_cube:.3f}초 (결과 일치 {same}) / "
+          f"청크 {t_chunked:.3f}초 (결과 일치 {same_chunked}), daily_repo_rates {len(repo):,}일 {t_repo:.3f}초")
+    return {'annual_volume_legacy_sec': t_legacy, 'annual_volume_cube_sec': t_cube,
+            'annual_volume_chunked_sec': t_chunked, 'repo_rates_load_sec': t_repo}
+
+def run_suite(n_rows=SUITE_ROWS, stages=None, seed=SUITE_SEED, repeat=SUITE_REPEAT):
+    """
+    단계별 측정 -> {'단계.항목': 값}
+    """
+    stages = stages or STAGES
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"지원하지 않는 단계: {', '.join(sorted(unknown))}")
+    db_path = synth_db(n_rows, seed)
+
+    print(f"\n{'='*70}")
+    print(f"📊 단계별 성능 측정: {db_path} ({', '.join(stages)})")
+    print(f"{'='*70}")
+    results = {}
+    for stage in stages:
+        if stage == 'ingest':
+            out = bench_ingest(seed=seed)
+        elif stage == 'collect':
+            out = bench_collect()
+        elif stage == 'vwap':
+            _reset_agg(db_path)
+            out = bench_vwap(db_path, repeat)
+        elif stage == 'merge':
+            out = bench_merge(db_path, repeat)
+        else:
+            out = bench_loaders(db_path, repeat)
+        results.update({f'{stage}.{k}': round(float(v), 6) for k, v in out.items()})
+    return results
+
+def _machine_key():
+    return f"{platform.node()}|{platform.system()}|{platform.machine()}|py{platform.python_version()}"
+
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(results, n_rows, path=BASELINE_FILE):
+    """기준값 저장 (기계 + 행수별로 덮어씀)"""
+    baselines = load_baselines(path)
+    baselines.setdefault(_machine_key(), {})[str(n_rows)] = {
+        'saved_at': datetime.now().isoformat(), 'results': results}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2)
+    print(f"✓ 기준값 저장: {path} ({_machine_key()}, {n_rows:,}건)")
+
+def compare_baseline(results, n_rows, path=BASELINE_FILE, tolerance=REGRESSION_TOLERANCE):
+    """
+    기준값 대비 비교표 출력, 느려진 항목 목록 반환 (초 단위 항목만 판정)
+    """
+    baseline = load_baselines(path).get(_machine_key(), {}).get(str(n_rows))
+    if baseline is None:
+        print(f"⚠️ 기준값 없음 ({_machine_key()}, {n_rows:,}건) - --save-baseline으로 저장")
+        return []
+
+    print(f"\n[기준값 비교] {baseline['saved_at']} 기준, 허용 +{tolerance:.0%}")
+    regressions = []
+    for name, value in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"  {name:42s}: {value:12.4f}  (기준값 없음)")
+            continue
+        change = (value - base) / base if base else 0.0
+        mark = ''
+        if name.endswith('_sec') and change > tolerance:
+            regressions.append(name)
+            mark = '❌'
+        elif name.endswith('_sec') and change < -tolerance:
+            mark = '✓'
+        print(f"  {name:42s}: {value:12.4f}  (기준 {base:12.4f}, {change:+7.1%}) {mark}")
+    if regressions:
+        print(f"❌ 성능 저하 {len(regressions)}건: {', '.join(regressions)}")
+    else:
+        print("✅ 성능 저하 없음")
+    return regressions
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == 'vwap':
+        bench_vwap(sys.argv[2])
+    elif len(sys.argv) >= 2 and sys.argv[1] == 'suite':
+        args = sys.argv[2:]
+        save = '--save-baseline' in args
+        args = [a for a in args if a != '--save-baseline']
+        only = None
+        if '--only' in args:
+            i = args.index('--only')
+            only, args = args[i + 1:], args[:i]
+        n_rows = int(args[0]) if args else SUITE_ROWS
+
+        results = run_suite(n_rows, only)
+        regressions = compare_baseline(results, n_rows)
+        if save:
+            save_baseline(results, n_rows)
+        sys.exit(1 if regressions and not save else 0)
+    else:
+        print(__doc__)
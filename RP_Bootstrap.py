@@ -0,0 +1,181 @@
+"""
+금융위원회 REPO거래정보 - 블록 부트스트랩 신뢰구간
+RP_Regression 시계열 회귀(전체 시장 + 담보유형별, 수준/1차 차분)의 계수에 대해
+이동블록(moving block) / 정상(stationary) 부트스트랩 백분위 신뢰구간 계산
+
+- 블록 합 = 누적합의 차이이므로 재표본마다 데이터를 복사하지 않음
+  반복별 (X'X, X'y) = 블록 시작/끝 지시행렬 x 누적합 행렬 -> 배치로 한 번에 풀기
+- 회귀식(모형)마다 프로세스 풀에 분배, 시드는 SEED + 모형 순번으로 고정 (작업자 수와 무관하게 같은 결과)
+- 결과는 reg_*.csv 의 해당 계수 옆에 CI 컬럼으로 추가
+
+사용법:
+    python RP_Bootstrap.py [반복수] [출력폴더]
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import RP_Regression as rr
+
+N_BOOT = 10000
+BLOCK_LEN = 20          # 평균 블록 길이 (거래일, 약 1개월)
+METHOD = 'stationary'   # 'stationary' (기하분포 블록 길이, 원형) / 'moving' (고정 길이)
+ALPHA = 0.05            # 95% 신뢰구간
+SEED = 20250101
+BOOT_BATCH = 500        # 한 번에 푸는 반복 수 (메모리 제한)
+WORKERS = None          # 프로세스 수 (None이면 CPU 수)
+
+# CI를 붙일 담보유형별 표 컬럼
+LEVEL_CI_VARS = ['BankStress', 'CreditSpread']
+DIFF_CI_VARS = ['d_bank', 'd_credit']
+
+def _block_plan(rng, n, n_reps, block_len, method):
+    """
+    반복별 블록 시작점/길이 (n_reps, m) - 블록 길이 합계는 정확히 n
+    stationary는 원형(끝에서 처음으로 이어짐)이므로 시작점이 0~n-1
+    """
+    if method == 'moving':
+        m = -(-n // block_len)
+        starts = rng.integers(0, n - block_len + 1, size=(n_reps, m))
+        lengths = np.full((n_reps, m), block_len)
+    else:
+        m = int(n / block_len + 8 * np.sqrt(n / block_len) + 8)
+        starts = rng.integers(0, n, size=(n_reps, m))
+        lengths = rng.geometric(1 / block_len, size=(n_reps, m))
+        while (lengths.sum(axis=1) < n).any():
+            starts = np.hstack([starts, rng.integers(0, n, size=(n_reps, m))])
+            lengths = np.hstack([lengths, rng.geometric(1 / block_len, size=(n_reps, m))])
+
+    # 합계가 n을 넘는 부분은 잘라냄 (넘친 뒤의 블록은 길이 0)
+    overflow = np.maximum(np.cumsum(lengths, axis=1) - n, 0)
+    lengths = np.clip(lengths - overflow, 0, None)
+    return starts, lengths
+
+def bootstrap_spec(y, X, n_reps=N_BOOT, block_len=BLOCK_LEN, method=METHOD, seed_seq=None):
+    """
+    회귀식 1개의 부트스트랩 계수 (n_reps, k)
+    """
+    n, k = X.shape
+    rng = np.random.default_rng(seed_seq)
+
+    # 원형 블록을 위해 두 번 이어 붙인 뒤 누적합 (행: 0..2n)
+    Xc = np.concatenate([X, X])
+    yc = np.concatenate([y, y])
+    c_xx = np.zeros((2 * n + 1, k * k))
+    c_xx[1:] = np.cumsum((Xc[:, :, None] * Xc[:, None, :]).reshape(2 * n, k * k), axis=0)
+    c_xy = np.zeros((2 * n + 1, k))
+    c_xy[1:] = np.cumsum(Xc * yc[:, None], axis=0)
+
+    draws = np.empty((n_reps, k))
+    for start in range(0, n_reps, BOOT_BATCH):
+        b = min(BOOT_BATCH, n_reps - start)
+        starts, lengths = _block_plan(rng, n, b, block_len, method)
+
+        # 블록 합 = C[끝] - C[시작] -> 반복별 지시행렬 W (b, 2n+1) 과 누적합의 곱
+        # (블록 수가 적으므로 희소행렬, 같은 위치의 중복 항목은 합산됨)
+        rows = np.repeat(np.arange(b), starts.shape[1])
+        W = sparse.csr_matrix(
+            (np.concatenate([np.ones(rows.size), -np.ones(rows.size)]),
+             (np.concatenate([rows, rows]), np.concatenate([(starts + lengths).ravel(), starts.ravel()]))),
+            shape=(b, 2 * n + 1)
+        )
+
+        xtx = (W @ c_xx).reshape(b, k, k)
+        xty = W @ c_xy
+        draws[start:start + b] = np.linalg.solve(xtx, xty[..., None])[..., 0]
+    return draws
+
+def _run_task(args):
+    y, X, n_reps, block_len, method, seed_seq = args
+    return bootstrap_spec(y, X, n_reps, block_len, method, seed_seq)
+
+def bootstrap_params(specs, n_boot=N_BOOT, block_len=BLOCK_LEN, method=METHOD, seed=SEED, workers=WORKERS):
+    """
+    time_series_specs 결과의 모든 회귀식에 대해 부트스트랩
+
+    Returns:
+        dict: {('level'|'diff', 라벨): DataFrame (n_boot, 계수명)}
+    """
+    keys, tasks = [], []
+    for kind in ['level', 'diff']:
+        for label, (y, X, names) in specs[kind]:
+            seed_seq = np.random.SeedSequence(seed, spawn_key=(len(tasks),))
+            keys.append((kind, label, names))
+            tasks.append((y, X, n_boot, block_len, method, seed_seq))
+
+    print(f"🔁 부트스트랩: 회귀식 {len(tasks)}개 x {n_boot:,}회 ({method}, 블록 {block_len})")
+    t0 = time.time()
+    if workers == 1:
+        outputs = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(_run_task, tasks))
+    print(f"✓ 부트스트랩 완료: {time.time() - t0:.1f}초")
+
+    return {(kind, label): pd.DataFrame(draws, columns=names)
+            for (kind, label, names), draws in zip(keys, outputs)}
+
+def _interval(values, alpha):
+    low, high = np.nanpercentile(values, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return low, high
+
+def _insert_ci(df, after, name, low, high):
+    pos = df.columns.get_loc(after) + 1
+    df.insert(pos, f'{name}_ci_low', low)
+    df.insert(pos + 1, f'{name}_ci_high', high)
+
+def add_bootstrap_ci(results, draws, alpha=ALPHA, n_lags=rr.N_LAGS):
+    """
+    run_all 결과표에 신뢰구간 컬럼 추가
+    - reg_level_kofr / reg_diff_kofr: 모든 계수에 'CI 하한', 'CI 상한'
+    - reg_collateral_level: BankStress, CreditSpread 옆에 _ci_low/_ci_high
+    - reg_collateral_diff: d_bank, d_credit, BankStress_총합, CreditSpread_총합 옆에 _ci_low/_ci_high
+    """
+    for kind, key in [('level', 'level_results'), ('diff', 'diff_results')]:
+        table = results[key]
+        market = draws[(kind, None)]
+        bounds = [_interval(market[v], alpha) for v in table['변수']]
+        pos = table.columns.get_loc('표준오차') + 1
+        table.insert(pos, 'CI 하한', [round(low, 4) for low, _ in bounds])
+        table.insert(pos + 1, 'CI 상한', [round(high, 4) for _, high in bounds])
+
+    coll_level = results['coll_level_df']
+    for v in LEVEL_CI_VARS:
+        bounds = [_interval(draws[('level', coll)][v], alpha) for coll in coll_level['담보유형']]
+        _insert_ci(coll_level, f'{v}_p', v, [b[0] for b in bounds], [b[1] for b in bounds])
+
+    coll_diff = results['coll_diff_df']
+    sums = {
+        'BankStress_총합': ['d_bank'] + [f'd_bank_L{i}' for i in range(1, n_lags + 1)],
+        'CreditSpread_총합': ['d_credit'] + [f'd_credit_L{i}' for i in range(1, n_lags + 1)],
+    }
+    for v in DIFF_CI_VARS + list(sums):
+        bounds = []
+        for coll in coll_diff['담보유형']:
+            d = draws[('diff', coll)]
+            bounds.append(_interval(d[sums[v]].sum(axis=1) if v in sums else d[v], alpha))
+        _insert_ci(coll_diff, f'{v}_p' if v in DIFF_CI_VARS else v, v, [b[0] for b in bounds], [b[1] for b in bounds])
+    return results
+
+def run(df_analysis, df_panel, n_boot=N_BOOT, block_len=BLOCK_LEN, method=METHOD, seed=SEED, workers=WORKERS):
+    """회귀 + 부트스트랩 CI (run_all 결과 dict에 'bootstrap' 추가)"""
+    results = rr.run_all(df_analysis, df_panel)
+    draws = bootstrap_params(results['specs'], n_boot, block_len, method, seed, workers)
+    add_bootstrap_ci(results, draws)
+    results['bootstrap'] = draws
+    return results
+
+if __name__ == "__main__":
+    import RP_Panel
+
+    n_boot = int(sys.argv[1]) if len(sys.argv) > 1 else N_BOOT
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else rr.OUTPUT_DIR
+    _, df_analysis, df_panel = RP_Panel.analysis_frames(RP_Panel.load_panel())
+    results = run(df_analysis, df_panel, n_boot)
+    print(results['coll_level_df'].to_string(index=False))
+    rr.save_results(results, output_dir)
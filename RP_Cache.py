@@ -0,0 +1,193 @@
+"""
+금융위원회 REPO거래정보 - API 응답 디스크 캐시
+- (basDt, pageNo, numOfRows) → 응답 원문(JSON) 해시 → gzip 압축 파일
+- 내용이 같은 응답(휴일의 빈 응답 등)은 파일 하나만 저장 (content-addressed)
+- 전체 크기가 MAX_CACHE_MB를 넘으면 가장 오래 사용하지 않은 응답부터 삭제
+- RP_Collector.CACHE_MODE = 'readwrite'로 켜야 응답을 저장함 (기본값 'off')
+- RP_Collector.CACHE_MODE = 'replay'이면 API 대신 캐시만 사용 (오프라인 재적재)
+
+폴더 구조:
+    <CACHE_DIR>/index.db             # 키 → 해시 색인
+    <CACHE_DIR>/objects/ab/abcd....json.gz
+
+사용법:
+    python RP_Cache.py stats [캐시폴더]
+    python RP_Cache.py evict [캐시폴더]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+CACHE_DIR = os.path.join('cache', 'responses')
+MAX_CACHE_MB = 2048          # 캐시 최대 크기 (압축 후 기준)
+EVICT_CHECK_EVERY = 100      # 저장 N회마다 크기 확인
+
+class ResponseCache:
+    """
+    API 응답 캐시 (스레드 안전)
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_mb=MAX_CACHE_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.puts_since_check = 0
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), timeout=60, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                basDt TEXT,
+                pageNo INTEGER,
+                numOfRows INTEGER,
+                digest TEXT,
+                fetched_at TEXT,
+                PRIMARY KEY (basDt, pageNo, numOfRows)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER,
+                last_used REAL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_digest ON responses(digest)')
+        self.conn.commit()
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], f'{digest}.json.gz')
+
+    def get_raw(self, base_date, page_no, num_rows):
+        """
+        캐시된 응답 원문(bytes) 반환, 없으면 None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT digest FROM responses WHERE basDt = ? AND pageNo = ? AND numOfRows = ?',
+                (base_date, int(page_no), int(num_rows))
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('UPDATE blobs SET last_used = ? WHERE digest = ?', (time.time(), row[0]))
+
+        try:
+            with gzip.open(self._blob_path(row[0]), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get(self, base_date, page_no, num_rows):
+        """
+        캐시된 응답(JSON dict) 반환, 없으면 None
+        """
+        raw = self.get_raw(base_date, page_no, num_rows)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def put(self, base_date, page_no, num_rows, raw):
+        """
+        응답 원문(bytes) 저장
+        """
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.{threading.get_ident()}.tmp'
+            with gzip.open(tmp, 'wb', compresslevel=6) as f:
+                f.write(raw)
+            os.replace(tmp, path)
+
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO blobs (digest, size, last_used) VALUES (?, ?, ?)',
+                (digest, os.path.getsize(path), time.time())
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (basDt, pageNo, numOfRows, digest, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (base_date, int(page_no), int(num_rows), digest, time.strftime('%Y-%m-%dT%H:%M:%S'))
+            )
+            self.conn.commit()
+            self.puts_since_check += 1
+            check = self.puts_since_check >= EVICT_CHECK_EVERY
+            if check:
+                self.puts_since_check = 0
+        if check:
+            self.evict()
+        return digest
+
+    def total_bytes(self):
+        with self.lock:
+            return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """
+        최대 크기를 넘으면 가장 오래 사용하지 않은 응답 파일부터 삭제
+        반환값: 삭제한 파일 수
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self.lock:
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            if total <= limit:
+                return 0
+            for digest, size in self.conn.execute('SELECT digest, size FROM blobs ORDER BY last_used').fetchall():
+                if total <= limit:
+                    break
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+                self.conn.execute('DELETE FROM responses WHERE digest = ?', (digest,))
+                self.conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+                total -= size
+                removed += 1
+            self.conn.commit()
+        return removed
+
+    def cached_dates(self, start_date=None, end_date=None, num_rows=None):
+        """
+        첫 페이지가 캐시된 날짜 목록 (재적재 대상)
+        """
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT DISTINCT basDt FROM responses
+                WHERE pageNo = 1
+                  AND (? IS NULL OR numOfRows = ?)
+                  AND (? IS NULL OR basDt >= ?) AND (? IS NULL OR basDt <= ?)
+                ORDER BY basDt
+            ''', (num_rows, num_rows, start_date, start_date, end_date, end_date)).fetchall()
+        return [r[0] for r in rows]
+
+    def stats(self):
+        with self.lock:
+            n_keys = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            n_blobs, size = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+            n_dates = self.conn.execute('SELECT COUNT(DISTINCT basDt) FROM responses').fetchone()[0]
+        return {'keys': n_keys, 'blobs': n_blobs, 'bytes': size, 'dates': n_dates}
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] in ('stats', 'evict'):
+        cache = ResponseCache(sys.argv[2] if len(sys.argv) > 2 else CACHE_DIR)
+        if sys.argv[1] == 'evict':
+            print(f"✓ {cache.evict()}개 파일 삭제")
+        st = cache.stats()
+        print(f"캐시: {st['dates']}일, 응답 {st['keys']:,}개, 파일 {st['blobs']:,}개, {st['bytes'] / 1024 / 1024:.1f}MB")
+        cache.close()
+    else:
+        print(__doc__)
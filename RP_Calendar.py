@@ -0,0 +1,74 @@
+"""
+금융위원회 REPO거래정보 - 한국거래소(KRX) 휴장일 달력
+- 주말 + 아래 휴장일(공휴일, 대체공휴일, 임시공휴일, 선거일, 근로자의 날)은 REPO 거래가 없으므로 수집 대상에서 제외
+- 12월 31일은 REPO 거래가 있으므로 휴장일에 포함하지 않음
+- 2015~2025년은 D_Repo_2015-2025.db의 거래일과 대조해 확인
+"""
+
+from datetime import datetime, timedelta
+
+# 평일 휴장일 (YYYYMMDD) - 새 연도는 여기에 추가
+KRX_HOLIDAYS = {
+    # 2015
+    '20150101', '20150218', '20150219', '20150220', '20150501', '20150505', '20150525',
+    '20150814', '20150928', '20150929', '20151009', '20151225',
+    # 2016
+    '20160101', '20160208', '20160209', '20160210', '20160301', '20160413', '20160505',
+    '20160506', '20160606', '20160815', '20160914', '20160915', '20160916', '20161003',
+    # 2017
+    '20170127', '20170130', '20170301', '20170501', '20170503', '20170505', '20170509',
+    '20170606', '20170815', '20171002', '20171003', '20171004', '20171005', '20171006',
+    '20171009', '20171225',
+    # 2018
+    '20180101', '20180215', '20180216', '20180301', '20180501', '20180507', '20180522',
+    '20180606', '20180613', '20180815', '20180924', '20180925', '20180926', '20181003',
+    '20181009', '20181225',
+    # 2019
+    '20190101', '20190204', '20190205', '20190206', '20190301', '20190501', '20190506',
+    '20190606', '20190815', '20190912', '20190913', '20191003', '20191009', '20191225',
+    # 2020
+    '20200101', '20200124', '20200127', '20200415', '20200430', '20200501', '20200505',
+    '20200817', '20200930', '20201001', '20201002', '20201009', '20201225',
+    # 2021
+    '20210101', '20210211', '20210212', '20210301', '20210505', '20210519', '20210816',
+    '20210920', '20210921', '20210922', '20211004', '20211011',
+    # 2022
+    '20220131', '20220201', '20220202', '20220301', '20220309', '20220505', '20220601',
+    '20220606', '20220815', '20220909', '20220912', '20221003', '20221010',
+    # 2023
+    '20230123', '20230124', '20230301', '20230501', '20230505', '20230529', '20230606',
+    '20230815', '20230928', '20230929', '20231002', '20231003', '20231009', '20231225',
+    # 2024
+    '20240101', '20240209', '20240212', '20240301', '20240410', '20240501', '20240506',
+    '20240515', '20240606', '20240815', '20240916', '20240917', '20240918', '20241001',
+    '20241003', '20241009', '20241225',
+    # 2025
+    '20250101', '20250127', '20250128', '20250129', '20250130', '20250303', '20250501',
+    '20250505', '20250506', '20250603', '20250606', '20250815', '20251003', '20251006',
+    '20251007', '20251008', '20251009', '20251225',
+    # 2026
+    '20260101', '20260216', '20260217', '20260218', '20260302', '20260501', '20260505',
+    '20260525', '20260603', '20260817', '20260924', '20260925', '20261005', '20261009',
+    '20261225',
+}
+
+def is_trading_day(date_str):
+    """
+    거래일 여부 (주말/휴장일이 아닌 날)
+    """
+    return datetime.strptime(date_str, '%Y%m%d').weekday() < 5 and date_str not in KRX_HOLIDAYS
+
+def trading_days(start_date, end_date):
+    """
+    기간 내 거래일 목록 (오래된 날짜부터)
+    """
+    start_dt = datetime.strptime(start_date, '%Y%m%d')
+    end_dt = datetime.strptime(end_date, '%Y%m%d')
+    days = []
+    temp_date = start_dt
+    while temp_date <= end_dt:
+        date_str = temp_date.strftime('%Y%m%d')
+        if temp_date.weekday() < 5 and date_str not in KRX_HOLIDAYS:
+            days.append(date_str)
+        temp_date += timedelta(days=1)
+    return days
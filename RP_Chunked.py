@@ -0,0 +1,197 @@
+"""
+금융위원회 REPO거래정보 - 날짜 구간 단위 집계 (메모리 상한, 병렬 읽기)
+전체 기간을 한 번에 GROUP BY / ORDER BY 하면 원본이 큰 DB(2015~2025 전체)에서
+SQLite 임시 B-tree(정렬기)가 전체 거래 크기만큼 커짐 -> 날짜 구간(청크)으로 나눠 집계
+
+- basDt 인덱스 순서대로 거래일을 찾아(인덱스 탐색만, 스캔 없음) CHUNK_DAYS일씩 묶음
+- 청크마다 (날짜, 통화, 만기, 담보) 부분합 1회 집계
+    sum_amt / sum_rate_amt / vw_count : buyScrtBuyAmt > 0 거래의 가중평균 금리 부분합 (RP_Classify 조건)
+    volume / trade_count              : 전체 거래대금 SUM(rpBuyAmt) / 건수 (노트북 연도별 거래대금 조건)
+  날짜가 키에 들어 있어 청크끼리 겹치는 그룹이 없음 -> 청크 결과를 이어 붙이기만 하면 합쳐짐
+  (청크 크기/작업 수와 무관하게 항상 같은 값)
+- 임시 정렬 크기는 청크 하나(CHUNK_DAYS일 거래) x 동시 작업 수로 고정, 연결별 캐시도 CACHE_MB로 제한
+- workers > 1이면 청크마다 별도 읽기 전용 연결(mode=ro)로 동시에 집계
+- 연도별 / 전체 등 상위 집계는 일별 부분합을 다시 더해 계산 (원본 재스캔 없음)
+
+사용법:
+    python RP_Chunked.py <거래.db> [<거래.db> ...] [--days 청크일수] [--workers 작업수]
+        담보별 + 전체 일별 가중평균 금리와 연도별 거래대금 출력
+"""
+
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import RP_Aggregate as ra
+import RP_Metrics as rm
+import RP_Schema as rs
+
+CHUNK_DAYS = 20         # 청크 하나의 거래일 수 (임시 정렬 크기 상한 = 청크 거래 건수)
+WORKERS = 1             # 동시에 집계할 청크 수 (1이면 순차)
+CACHE_MB = 64           # 읽기 연결별 SQLite 페이지 캐시 상한
+
+KEY_COLUMNS = ['basDt', 'rpBuyAplCurCdNm', 'rdptTermCcdNm', 'scrsItmsKcdNm']
+SUM_COLUMNS = ['sum_amt', 'sum_rate_amt', 'vw_count', 'volume', 'trade_count']
+
+def open_readonly(db_path):
+    """읽기 전용 연결 (쓰기 잠금 없음, 병렬 작업마다 하나씩)"""
+    conn = sqlite3.connect(f'{Path(db_path).resolve().as_uri()}?mode=ro', uri=True)
+    conn.execute(f'PRAGMA cache_size=-{CACHE_MB * 1024}')
+    return conn
+
+def _source(conn):
+    """(날짜 테이블/컬럼, 날짜 비교식, 청크 거래를 원본 컬럼명으로 읽는 SQL)"""
+    if rs.is_normalized(conn):
+        return rs.FACT_TABLE, 'CAST(? AS INTEGER)', f'''
+            SELECT CAST(f.basDt AS TEXT) AS basDt, c.name AS rpBuyAplCurCdNm,
+                   t.name AS rdptTermCcdNm, s.name AS scrsItmsKcdNm,
+                   f.rpInrt AS rpInrt, f.rpBuyAmt AS rpBuyAmt, f.buyScrtBuyAmt AS buyScrtBuyAmt
+            FROM {rs.FACT_TABLE} f
+            LEFT JOIN dim_currency c ON c.id = f.cur_id
+            LEFT JOIN dim_term t ON t.id = f.term_id
+            LEFT JOIN dim_scrs_itms s ON s.id = f.scrs_id
+            WHERE f.basDt BETWEEN CAST(? AS INTEGER) AND CAST(? AS INTEGER)
+        '''
+    return 'repo_trades', '?', '''
+        SELECT basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm,
+               CAST(rpInrt AS REAL) AS rpInrt, CAST(rpBuyAmt AS REAL) AS rpBuyAmt,
+               CAST(buyScrtBuyAmt AS REAL) AS buyScrtBuyAmt
+        FROM repo_trades
+        WHERE basDt BETWEEN ? AND ?
+    '''
+
+def trade_dates(conn, start_date='20150101', end_date='20251231'):
+    """
+    기간 내 거래가 있는 날짜 목록 (basDt 인덱스로 다음 날짜만 찾아감 - 날짜 수만큼의 인덱스 탐색)
+    """
+    table, param, _ = _source(conn)
+    sql = f'SELECT MIN(basDt) FROM {table} WHERE basDt > {param} AND basDt <= {param}'
+    first = conn.execute(f'SELECT MIN(basDt) FROM {table} WHERE basDt >= {param} AND basDt <= {param}',
+                         (start_date, end_date)).fetchone()[0]
+    dates = []
+    while first is not None:
+        dates.append(str(first))
+        first = conn.execute(sql, (dates[-1], end_date)).fetchone()[0]
+    return dates
+
+def chunk_ranges(dates, chunk_days=CHUNK_DAYS):
+    """날짜 목록 -> [(첫 날짜, 마지막 날짜), ...] (chunk_days일씩)"""
+    return [(dates[i], dates[min(i + chunk_days, len(dates)) - 1]) for i in range(0, len(dates), chunk_days)]
+
+def chunk_partial(db_path, first_date, last_date):
+    """
+    청크 하나의 (날짜, 통화, 만기, 담보) 부분합 (별도 읽기 전용 연결)
+    """
+    conn = open_readonly(db_path)
+    try:
+        _, _, source = _source(conn)
+        with rm.timer('sql.chunk_partial'):
+            df = pd.read_sql_query(f'''
+                SELECT basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm,
+                       SUM(CASE WHEN buyScrtBuyAmt > 0 THEN buyScrtBuyAmt END) AS sum_amt,
+                       SUM(CASE WHEN buyScrtBuyAmt > 0 THEN rpInrt * buyScrtBuyAmt END) AS sum_rate_amt,
+                       SUM(buyScrtBuyAmt > 0) AS vw_count,
+                       SUM(rpBuyAmt) AS volume,
+                       COUNT(*) AS trade_count
+                FROM ({source})
+                GROUP BY basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm
+            ''', conn, params=(first_date, last_date))
+    finally:
+        conn.close()
+    rm.count('sql.rows_read', len(df))
+    return df
+
+def daily_partials(db_paths, start_date='20150101', end_date='20251231', chunk_days=CHUNK_DAYS,
+                   workers=WORKERS, verbose=True):
+    """
+    DB(들)의 일별 부분합 (청크 단위 집계를 이어 붙임)
+    여러 DB에 같은 날짜가 있으면 부분합끼리 더함
+    반환 컬럼: KEY_COLUMNS + SUM_COLUMNS
+    """
+    if isinstance(db_paths, str):
+        db_paths = [db_paths]
+
+    tasks = []
+    for db_path in db_paths:
+        conn = open_readonly(db_path)
+        with rm.timer('sql.trade_dates'):
+            dates = trade_dates(conn, start_date, end_date)
+        conn.close()
+        tasks.extend((db_path, first, last) for first, last in chunk_ranges(dates, chunk_days))
+        if verbose:
+            print(f"  → {Path(db_path).name}: {len(dates)}일, {len(chunk_ranges(dates, chunk_days))}개 청크")
+
+    t0 = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rp-chunk') as executor:
+            parts = list(executor.map(lambda task: chunk_partial(*task), tasks))
+    else:
+        parts = [chunk_partial(*task) for task in tasks]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=KEY_COLUMNS + SUM_COLUMNS)
+
+    df = pd.concat(parts, ignore_index=True)
+    if len(db_paths) > 1:
+        df = df.groupby(KEY_COLUMNS, dropna=False, sort=False)[SUM_COLUMNS].sum(min_count=1).reset_index()
+    df = df.sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+    if verbose:
+        print(f"✓ 청크 집계 완료: {len(tasks)}개 청크, 부분합 {len(df):,}행, {time.perf_counter() - t0:.1f}초")
+    return df
+
+# -----------------------------------------------------------------------------
+# 부분합 -> 결과표
+# -----------------------------------------------------------------------------
+def daily_vwap(partials, currency=ra.DEFAULT_CURRENCY, term=ra.DEFAULT_TERM):
+    """
+    담보별 + 전체 일별 가중평균 금리 (RP_Aggregate.compute_daily_vwap과 같은 형식)
+    반환 컬럼: basDt, scrsItmsKcdNm, vwap_rate
+    """
+    df = partials[(partials['rpBuyAplCurCdNm'] == currency) & (partials['rdptTermCcdNm'] == term)
+                  & (partials['vw_count'] > 0)]
+    return ra.vwap_with_total(df[['basDt', 'scrsItmsKcdNm', 'sum_amt', 'sum_rate_amt']])
+
+def annual_volume(partials, currency=ra.DEFAULT_CURRENCY, term=None, by_collateral=False):
+    """
+    연도별 거래대금 SUM(rpBuyAmt) (기초통계량 분석 노트북의 SUBSTR(basDt, 1, 4) 집계와 같은 값)
+    term을 주면 해당 만기만, by_collateral=True면 (year, collateral, amount)
+    """
+    df = partials[partials['rpBuyAplCurCdNm'] == currency]
+    if term is not None:
+        df = df[df['rdptTermCcdNm'] == term]
+    keys = [df['basDt'].str[:4].rename('year')]
+    if by_collateral:
+        keys.append(df['scrsItmsKcdNm'].rename('collateral'))
+    return df.groupby(keys)['volume'].sum().rename('amount' if by_collateral else 'total_amount').reset_index()
+
+def compute_daily_vwap(db_paths, currency=ra.DEFAULT_CURRENCY, term=ra.DEFAULT_TERM,
+                       start_date='20150101', end_date='20251231', chunk_days=CHUNK_DAYS,
+                       workers=WORKERS, verbose=True):
+    """청크 집계로 일별 가중평균 금리 (RP_Classify 대용량 DB용)"""
+    partials = daily_partials(db_paths, start_date, end_date, chunk_days, workers, verbose)
+    return daily_vwap(partials, currency, term)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--days', '--workers'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            del args[i:i + 2]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    partials = daily_partials(args, chunk_days=options.get('--days', CHUNK_DAYS),
+                              workers=options.get('--workers', WORKERS))
+    vwap = daily_vwap(partials).pivot(index='basDt', columns='scrsItmsKcdNm', values='vwap_rate')
+    print("\n[일별 가중평균 금리 - 최근 5일]")
+    print(vwap.tail().round(3).to_string())
+    volume = annual_volume(partials).set_index('year')['total_amount'] / 1e12
+    print("\n[연도별 거래대금 (조원, 대한민국 원)]")
+    print(volume.round(1).to_string())
@@ -1,6 +1,10 @@
 import pandas as pd
 from sqlalchemy import create_engine, inspect
 import sys
+import sqlite3
+
+import RP_Aggregate
+import RP_Metrics as rm
 
 # =============================================================================
 # 1. 입력 DB 연결 설정 (원본 데이터 읽기용)
@@ -8,6 +12,14 @@ import sys
 input_db_path = r'C:\Users\jay15\Desktop\DB_DATA\DataBase\r_2025.db'
 INPUT_CONN_STR = f"sqlite:///{input_db_path}"
 
+# 일별 집계 테이블(daily_vwap_agg) 사용 여부
+# True: 변경된 날짜만 재집계 후 집계 테이블에서 읽음 (O(일수))
+# False: 원본 거래 테이블을 직접 집계 (담보별/전체를 한 번의 스캔으로)
+USE_DAILY_AGG = True
+
+# 실행 지표 기록 (logs/rp_runs.jsonl, 구간별 SQL 시간 포함)
+rm.start_run('classify_csv', input_db=input_db_path, use_daily_agg=USE_DAILY_AGG)
+
 try:
     # 원본 DB 엔진 생성
     input_engine = create_engine(INPUT_CONN_STR)
@@ -16,7 +28,8 @@ try:
     
     # 테이블 확인 및 선택
     inspector = inspect(input_engine)
-    table_names = inspector.get_table_names()
+    # 정규화 스키마 DB(RP_Schema.py)는 repo_trades가 호환 뷰이므로 뷰도 포함
+    table_names = inspector.get_table_names() + inspector.get_view_names()
     
     if 'repo_trades' in table_names:
         target_table_name = 'repo_trades'
@@ -34,65 +47,37 @@ except Exception as e:
 # =============================================================================
 print("⏳ DB 엔진에서 가중평균 금리 계산 중... (메모리 최적화)")
 
-# -----------------------------------------------------------------------------
-# 2-1) 담보별 가중평균 금리
-# -----------------------------------------------------------------------------
-query_by_collateral = f"""
-    SELECT 
-        basDt, 
-        scrsItmsKcdNm,
-        SUM( CAST(rpInrt AS REAL) * CAST(buyScrtBuyAmt AS REAL) ) / SUM( CAST(buyScrtBuyAmt AS REAL) ) as vwap_rate
-    FROM 
-        "{target_table_name}"
-    WHERE 
-        rpBuyAplCurCdNm = '대한민국 원'
-        AND rdptTermCcdNm = '1영업일'
-        AND basDt BETWEEN '20150101' AND '20251231'
-        AND CAST(buyScrtBuyAmt AS REAL) > 0 
-    GROUP BY 
-        basDt, scrsItmsKcdNm
-    ORDER BY 
-        basDt
-"""
-
-# -----------------------------------------------------------------------------
-# 2-2) 전체 가중평균 금리 (담보 구분 없이)
-# -----------------------------------------------------------------------------
-query_total = f"""
-    SELECT 
-        basDt, 
-        '전체' as scrsItmsKcdNm,
-        SUM( CAST(rpInrt AS REAL) * CAST(buyScrtBuyAmt AS REAL) ) / SUM( CAST(buyScrtBuyAmt AS REAL) ) as vwap_rate
-    FROM 
-        "{target_table_name}"
-    WHERE 
-        rpBuyAplCurCdNm = '대한민국 원'
-        AND rdptTermCcdNm = '1영업일'
-        AND basDt BETWEEN '20150101' AND '20251231'
-        AND CAST(buyScrtBuyAmt AS REAL) > 0 
-    GROUP BY 
-        basDt
-    ORDER BY 
-        basDt
-"""
-
-try:
-    # 담보별 쿼리 실행
-    df_by_collateral = pd.read_sql(query_by_collateral, input_conn)
-    print(f"✅ 담보별 계산 완료! {len(df_by_collateral):,} 건")
-    
-    # 전체 쿼리 실행
-    df_total = pd.read_sql(query_total, input_conn)
-    print(f"✅ 전체 계산 완료! {len(df_total):,} 건")
-    
-    # 두 결과 합치기
-    df_result = pd.concat([df_by_collateral, df_total], ignore_index=True)
-    print(f"✅ 통합 완료! 총 {len(df_result):,} 건")
-    
-except Exception as e:
-    print(f"❌ 쿼리 실행 실패: {e}")
-    input_conn.close()
-    sys.exit()
+# 집계 테이블은 repo_trades 기준 -> 다른 이름의 거래 테이블은 원본 직접 집계로 대체
+if target_table_name != 'repo_trades' and USE_DAILY_AGG:
+    print(f"⚠️ '{target_table_name}' 테이블은 집계 테이블을 쓸 수 없어 원본 직접 집계로 대체")
+    USE_DAILY_AGG = False
+
+if USE_DAILY_AGG:
+    try:
+        # 마지막 실행 이후 수집/변경된 날짜만 다시 집계
+        with rm.timer('classify.refresh_agg'):
+            agg_conn = RP_Aggregate.open_and_refresh(input_db_path)
+        df_result = RP_Aggregate.load_daily_vwap(agg_conn, start_date='20150101', end_date='20251231')
+        agg_conn.close()
+        print(f"✅ 집계 테이블 조회 완료! 총 {len(df_result):,} 건")
+        
+    except Exception as e:
+        print(f"❌ 집계 테이블 조회 실패: {e}")
+        input_conn.close()
+        sys.exit()
+else:
+    try:
+        # 담보별 + 전체 가중평균 금리를 한 번의 스캔으로 계산 (커버링 인덱스 사용)
+        scan_conn = sqlite3.connect(input_db_path)
+        df_result = RP_Aggregate.compute_daily_vwap(scan_conn, start_date='20150101', end_date='20251231',
+                                                    table=target_table_name)
+        scan_conn.close()
+        print(f"✅ 담보별 + 전체 계산 완료! 총 {len(df_result):,} 건")
+        
+    except Exception as e:
+        print(f"❌ 쿼리 실행 실패: {e}")
+        input_conn.close()
+        sys.exit()
 
 input_conn.close()  # 원본 DB 연결 종료
 
@@ -142,7 +127,8 @@ print(f"   - 파일 경로: {output_csv_path}")
 
 try:
     # CSV로 저장 (index=True로 날짜 컬럼 포함)
-    daily_repo_rates.to_csv(output_csv_path, encoding='utf-8-sig')
+    with rm.timer('classify.save_result'):
+        daily_repo_rates.to_csv(output_csv_path, encoding='utf-8-sig')
     
     print("✅ CSV 저장 완료! (성공)")
 
@@ -159,4 +145,6 @@ print("📊 저장 결과 요약")
 print("=" * 60)
 print(f"  - 총 일수: {len(daily_repo_rates)}일")
 print(f"  - 담보유형: {len(daily_repo_rates.columns)}개")
-print(f"  - 컬럼: {daily_repo_rates.columns.tolist()}")
\ No newline at end of file
+print(f"  - 컬럼: {daily_repo_rates.columns.tolist()}")
+
+rm.end_run()
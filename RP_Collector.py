@@ -6,11 +6,21 @@
 import sys
 import io
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import time
 import sqlite3
 
+import RP_Schema as rs
+import RP_Aggregate as ra
+import RP_Cache
+import RP_Calendar
+import RP_Metrics as rm
+from RP_Schema import TRADE_COLUMNS
+
 # Windows 콘솔 인코딩 문제 해결
 if sys.platform == 'win32' and hasattr(sys.stdout, 'buffer'):
     try:
@@ -29,15 +39,309 @@ END_DATE = '20251231'    # 종료 날짜 (YYYYMMDD 형식)
 # 데이터베이스 파일명
 DB_FILE = 'repo_trades_2025.db'
 
+# 저장 방식: 'wide' (기존 22개 TEXT/REAL 컬럼) / 'normalized' (코드 사전 + 정수 거래 테이블, RP_Schema.py)
+STORAGE_MODE = 'wide'
+
 # API 설정
 BASE_URL = 'http://apis.data.go.kr/1160100/service/GetRepoTradInfoService/getCaseForTrad'
 SERVICE_KEY = '8e2d2fb441c63432251207ba4c64e26e90b7939e40980fdcff287553c5867f9a'
 
+# 동시 수집 설정
+PAGE_SIZE = 1000            # 페이지당 조회 건수
+MAX_PAGE_WORKERS = 4        # 날짜 하나 안에서 동시에 조회할 페이지 수
+MAX_DATE_WORKERS = 2        # 동시에 수집할 날짜 수
+RATE_LIMIT_PER_SEC = 2.0    # 초당 허용 요청 수 (기존 0.5초 대기와 동일한 평균 속도)
+RATE_LIMIT_BURST = 4        # 순간적으로 허용할 최대 요청 수
+
+# DB 쓰기 설정
+COMMIT_EVERY_PAGES = 50     # 페이지 N개(약 N×1000건)를 한 트랜잭션으로 묶어 커밋
+SQLITE_CACHE_MB = 256       # 대량 적재 시 SQLite 페이지 캐시 크기
+MAINTAIN_DAILY_AGG = True   # 날짜 수집 완료 시 일별 가중평균 집계(daily_vwap_agg, RP_Aggregate.py) 갱신
+
+# 날짜 재시도 설정 (수집 실패 날짜를 라운드가 끝난 뒤 다시 시도)
+DATE_RETRY_ROUNDS = 2           # 재시도 라운드 수
+DATE_RETRY_BACKOFF_SEC = 30     # 첫 재시도 전 대기 시간 (라운드마다 2배)
+
+# API 응답 캐시 (RP_Cache.py)
+# 'off': 사용 안 함 / 'readwrite': 캐시에 있으면 재사용, 없으면 API 조회 후 저장 / 'replay': 캐시만 사용 (오프라인)
+# 기본은 'off' - 'readwrite'로 바꾸면 ./cache/responses에 최대 RP_Cache.MAX_CACHE_MB까지 응답을 저장
+CACHE_MODE = 'off'
+
+# 내보내기 설정
+EXPORT_CHUNK_ROWS = 100000  # 내보내기/조회 시 한 번에 읽는 건수 (메모리 상한)
+EXCEL_MAX_ROWS = 1048575    # 엑셀 시트당 최대 데이터 행 수 (머리글 제외), 넘으면 다음 시트로
+
+class TokenBucket:
+    """
+    토큰 버킷 방식의 요청 속도 제한기 (스레드 안전)
+    """
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_rate_limiter = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+_session = None
+_session_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+def configure_rate_limit(rate_per_sec, burst=None):
+    """
+    요청 속도 제한 변경 (초당 요청 수, 버스트 크기)
+    """
+    global _rate_limiter
+    _rate_limiter = TokenBucket(rate_per_sec, burst or max(1, int(rate_per_sec * 2)))
+
+def get_session():
+    """
+    keep-alive 연결을 재사용하는 공용 HTTP 세션 반환
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = MAX_PAGE_WORKERS * MAX_DATE_WORKERS
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+class TradeWriter:
+    """
+    연결 하나를 계속 열어두고 거래/수집상태를 적재하는 DB 기록기 (스레드 안전)
+    - executemany로 페이지 단위 일괄 INSERT
+    - 여러 페이지/날짜를 한 트랜잭션으로 묶어 커밋 (COMMIT_EVERY_PAGES)
+    - 정규화 스키마 DB(RP_Schema)면 코드 사전으로 인코딩해 repo_trades_fact에 적재
+    """
+    INSERT_SQL = (
+        f"INSERT OR REPLACE INTO repo_trades ({', '.join(TRADE_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(TRADE_COLUMNS))})"
+    )
+
+    def __init__(self, db_file, commit_every_pages=COMMIT_EVERY_PAGES):
+        self.db_file = db_file
+        self.commit_every_pages = commit_every_pages
+        self.pending_pages = 0
+        self.lock = threading.RLock()
+        
+        self.conn = sqlite3.connect(db_file, timeout=60, check_same_thread=False)
+        # 대량 적재용 PRAGMA
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_MB * 1024}')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        
+        # 저장 방식은 DB 스키마를 보고 자동 판별
+        self.encoder = None
+        if rs.is_normalized(self.conn):
+            self.encoder = rs.CodeEncoder(self.conn)
+            self.INSERT_SQL = rs.FACT_INSERT_SQL
+        
+        if MAINTAIN_DAILY_AGG:
+            ra.init_agg_tables(self.conn)
+        
+        # 페이지 단위 적재 기록 (누락 페이지만 다시 받기 위해 사용)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS collection_pages (
+                basDt TEXT,
+                pageNo INTEGER,
+                numOfRows INTEGER,
+                row_count INTEGER,
+                PRIMARY KEY (basDt, numOfRows, pageNo)
+            )
+        ''')
+
+    def to_rows(self, trades_data):
+        """API 거래 dict 목록 → INSERT 파라미터 튜플 목록"""
+        if self.encoder is not None:
+            return self.encoder.encode_trades(trades_data)
+        return [tuple(trade.get(col) for col in TRADE_COLUMNS) for trade in trades_data]
+
+    def write_trades(self, trades_data, base_date=None, page_no=None, num_rows=None):
+        """거래 목록 적재 (커밋은 COMMIT_EVERY_PAGES마다), page_no가 있으면 페이지 적재 기록도 남김"""
+        if not trades_data:
+            return 0
+        
+        with self.lock:
+            if page_no is not None:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO collection_pages (basDt, pageNo, numOfRows, row_count) VALUES (?, ?, ?, ?)',
+                    (base_date, page_no, num_rows or PAGE_SIZE, len(trades_data))
+                )
+            with rm.timer('db.encode'):
+                rows = self.to_rows(trades_data)
+            with rm.timer('db.insert'):
+                try:
+                    self.conn.executemany(self.INSERT_SQL, rows)
+                    saved_count = len(rows)
+                except sqlite3.IntegrityError:
+                    # 문제 행이 섞여 있으면 행 단위로 다시 넣고 해당 행만 무시
+                    rm.count('db.integrity_fallback')
+                    saved_count = 0
+                    for row in rows:
+                        try:
+                            self.conn.execute(self.INSERT_SQL, row)
+                            saved_count += 1
+                        except sqlite3.IntegrityError:
+                            continue
+            rm.count('db.rows_inserted', saved_count)
+            
+            self.pending_pages += 1
+            if self.pending_pages >= self.commit_every_pages:
+                self.commit()
+        
+        return saved_count
+
+    def set_status(self, base_date, total_count, collected_count, status='completed'):
+        """수집 상태 기록 (거래 데이터와 같은 트랜잭션에 포함)"""
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO collection_status 
+                (basDt, total_count, collected_count, collected_at, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (base_date, total_count, collected_count, datetime.now().isoformat(), status))
+            
+            # 해당 날짜의 일별 집계도 같은 트랜잭션에서 갱신
+            if MAINTAIN_DAILY_AGG:
+                ra.refresh_date(self.conn, base_date)
+
+    def is_collected(self, base_date):
+        """수집 완료 여부 (아직 커밋 전인 상태도 포함)"""
+        with self.lock:
+            row = self.conn.execute('''
+                SELECT status FROM collection_status 
+                WHERE basDt = ? AND status = 'completed'
+            ''', (base_date,)).fetchone()
+        return row is not None
+
+    def saved_pages(self, base_date, num_rows=None):
+        """날짜 하나의 적재된 페이지 번호 집합"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT pageNo FROM collection_pages WHERE basDt = ? AND numOfRows = ?',
+                (base_date, num_rows or PAGE_SIZE)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def stored_status(self, base_date):
+        """(total_count, status) 또는 None"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT total_count, status FROM collection_status WHERE basDt = ?', (base_date,)
+            ).fetchone()
+
+    def count_trades(self, start_date, end_date):
+        """기간 내 날짜별 실제 적재 건수 {basDt: 건수} (한 번의 조회)"""
+        with self.lock:
+            if self.encoder is not None:
+                rows = self.conn.execute(f'''
+                    SELECT CAST(basDt AS TEXT), COUNT(*) FROM {rs.FACT_TABLE}
+                    WHERE basDt BETWEEN CAST(? AS INTEGER) AND CAST(? AS INTEGER)
+                    GROUP BY basDt
+                ''', (start_date, end_date)).fetchall()
+            else:
+                rows = self.conn.execute('''
+                    SELECT basDt, COUNT(*) FROM repo_trades
+                    WHERE basDt BETWEEN ? AND ?
+                    GROUP BY basDt
+                ''', (start_date, end_date)).fetchall()
+        return dict(rows)
+
+    def delete_date(self, base_date):
+        """날짜 하나의 거래/페이지 기록 삭제 (원천 데이터 건수가 바뀐 날짜 재적재용)"""
+        with self.lock:
+            if self.encoder is not None:
+                self.conn.execute(f'DELETE FROM {rs.FACT_TABLE} WHERE basDt = CAST(? AS INTEGER)', (base_date,))
+            else:
+                self.conn.execute('DELETE FROM repo_trades WHERE basDt = ?', (base_date,))
+            self.conn.execute('DELETE FROM collection_pages WHERE basDt = ?', (base_date,))
+
+    def load_done_dates(self):
+        """수집이 끝난 날짜(completed / no_data)를 한 번의 조회로 반환"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT basDt FROM collection_status
+                WHERE status IN ('completed', 'no_data')
+            ''').fetchall()
+        return {r[0] for r in rows}
+
+    def commit(self):
+        with self.lock:
+            with rm.timer('db.commit'):
+                self.conn.commit()
+            self.pending_pages = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+def get_writer():
+    """
+    현재 DB_FILE용 공용 TradeWriter 반환 (DB_FILE이 바뀌면 새로 연결)
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None and _writer.db_file != DB_FILE:
+            _writer.close()
+            _writer = None
+        if _writer is None:
+            _writer = TradeWriter(DB_FILE)
+        return _writer
+
+def close_writer():
+    """
+    남은 트랜잭션을 커밋하고 공용 연결 종료
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+def get_cache():
+    """
+    공용 응답 캐시 반환 (CACHE_MODE가 'off'이면 None)
+    """
+    global _cache
+    if CACHE_MODE == 'off':
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = RP_Cache.ResponseCache()
+        return _cache
+
 def init_database():
     """
     데이터베이스 및 테이블 초기화
     """
     conn = sqlite3.connect(DB_FILE)
+    
+    # 정규화 저장 방식 (기존 DB가 정규화 스키마인 경우 포함)
+    if STORAGE_MODE == 'normalized' or rs.is_normalized(conn):
+        rs.init_normalized_schema(conn)
+        conn.close()
+        print(f"✓ 데이터베이스 초기화 완료 (정규화 스키마): {DB_FILE}")
+        return
+    
     cursor = conn.cursor()
     
     # 거래 데이터 테이블 생성
@@ -94,21 +398,10 @@ def is_date_collected(base_date):
     """
     해당 날짜가 이미 수집되었는지 확인
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT status FROM collection_status 
-        WHERE basDt = ? AND status = 'completed'
-    ''', (base_date,))
-    
-    result = cursor.fetchone()
-    conn.close()
-    
-    return result is not None
+    return get_writer().is_collected(base_date)
 
-def get_repo_trades(base_date, num_rows=100, page_no=1, retry=3):
-    """API 호출 (재시도 로직 포함)"""
+def get_repo_trades(base_date, num_rows=100, page_no=1, retry=3, use_cache=True):
+    """API 호출 (재시도 로직, 속도 제한 포함), use_cache=False면 캐시를 읽지 않고 새로 조회"""
     params = {
         'serviceKey': SERVICE_KEY,
         'numOfRows': str(num_rows),
@@ -117,17 +410,39 @@ def get_repo_trades(base_date, num_rows=100, page_no=1, retry=3):
         'basDt': base_date
     }
     
+    # 캐시에 있으면 API를 호출하지 않음
+    cache = get_cache()
+    if cache is not None and use_cache:
+        data = cache.get(base_date, page_no, num_rows)
+        if data is not None:
+            rm.count('cache.hit')
+            return data
+        rm.count('cache.miss')
+        if CACHE_MODE == 'replay':
+            return None
+    
     for attempt in range(retry):
+        if attempt > 0:
+            rm.count('http.retries')
         try:
-            response = requests.get(BASE_URL, params=params, timeout=60)
+            with rm.timer('http.rate_limit_wait'):
+                _rate_limiter.acquire()
+            with rm.timer('http.request'):
+                response = get_session().get(BASE_URL, params=params, timeout=60)
+            rm.count('http.requests')
+            rm.count('http.bytes', len(response.content))
             
             if response.status_code == 200:
-                data = response.json()
+                with rm.timer('json.decode'):
+                    data = response.json()
                 if 'response' in data:
                     header = data['response'].get('header', {})
                     if header.get('resultCode') == '00':
+                        if cache is not None:
+                            cache.put(base_date, page_no, num_rows, response.content)
                         return data
         except requests.exceptions.Timeout:
+            rm.count('http.timeouts')
             if attempt < retry - 1:
                 print(f" (타임아웃, {attempt+1}/{retry} 재시도)", end="")
                 time.sleep(2)
@@ -136,6 +451,7 @@ def get_repo_trades(base_date, num_rows=100, page_no=1, retry=3):
                 print(f" (타임아웃 실패)")
                 return None
         except Exception as e:
+            rm.count('http.errors')
             if attempt < retry - 1:
                 print(f" (오류, {attempt+1}/{retry} 재시도)", end="")
                 time.sleep(2)
@@ -146,177 +462,299 @@ def get_repo_trades(base_date, num_rows=100, page_no=1, retry=3):
     
     return None
 
-def save_trades_to_db(trades_data, base_date):
+def save_trades_to_db(trades_data, base_date, page_no=None):
     """
-    거래 데이터를 DB에 저장
+    거래 데이터를 DB에 저장 (공용 연결, 일괄 INSERT)
     """
-    if not trades_data:
-        return 0
-    
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    saved_count = 0
-    for trade in trades_data:
-        try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO repo_trades (
-                    basDt, rpSqno, rpBuyAplCurCd, rpBuyAplCurCdNm,
-                    rdptTermCcd, rdptTermCcdNm, rpRmngExprDcd, rpRmngExprDcdNm,
-                    rpInrt, slngShtrFinBzcDcd, slngShtrFinBzcDcdNm,
-                    buynShtrFinBzcDcd, buynShtrFinBzcDcdNm, rpOpngDt,
-                    rpBuyAmt, rpMrgamRto, scrsItmsKcd, scrsItmsKcdNm,
-                    isinCd, isinCdNm, buyScrtBuyAmt, buyScrtEvlAmt
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                trade.get('basDt'), trade.get('rpSqno'),
-                trade.get('rpBuyAplCurCd'), trade.get('rpBuyAplCurCdNm'),
-                trade.get('rdptTermCcd'), trade.get('rdptTermCcdNm'),
-                trade.get('rpRmngExprDcd'), trade.get('rpRmngExprDcdNm'),
-                trade.get('rpInrt'), trade.get('slngShtrFinBzcDcd'),
-                trade.get('slngShtrFinBzcDcdNm'), trade.get('buynShtrFinBzcDcd'),
-                trade.get('buynShtrFinBzcDcdNm'), trade.get('rpOpngDt'),
-                trade.get('rpBuyAmt'), trade.get('rpMrgamRto'),
-                trade.get('scrsItmsKcd'), trade.get('scrsItmsKcdNm'),
-                trade.get('isinCd'), trade.get('isinCdNm'),
-                trade.get('buyScrtBuyAmt'), trade.get('buyScrtEvlAmt')
-            ))
-            saved_count += 1
-        except sqlite3.IntegrityError:
-            # 중복 데이터는 무시
-            continue
-    
-    conn.commit()
-    conn.close()
-    
-    return saved_count
+    return get_writer().write_trades(trades_data, base_date, page_no, PAGE_SIZE)
 
 def update_collection_status(base_date, total_count, collected_count, status='completed'):
     """
     수집 상태 업데이트
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT OR REPLACE INTO collection_status 
-        (basDt, total_count, collected_count, collected_at, status)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (base_date, total_count, collected_count, datetime.now().isoformat(), status))
+    get_writer().set_status(base_date, total_count, collected_count, status)
+
+def _extract_items(result):
+    """
+    API 응답에서 거래 목록 추출 (단건 응답은 리스트로 변환)
+    """
+    items = result['response'].get('body', {}).get('items', {})
+    if not items:
+        return []
+    items = items.get('item', [])
+    if not isinstance(items, list):
+        items = [items]
+    return items
+
+def _fetch_pages(base_date, first_result, total_count, skip_pages=(), page_workers=None, use_cache=True):
+    """
+    날짜 하나의 페이지들을 조회/적재 (1페이지는 이미 받은 응답 사용, skip_pages는 건너뜀)
+    반환값: (이번에 저장한 건수, 실패한 페이지 목록)
+    """
+    pages = (total_count + PAGE_SIZE - 1) // PAGE_SIZE
+    total_saved = 0
+    failed_pages = []
+    
+    if 1 not in skip_pages:
+        total_saved += save_trades_to_db(_extract_items(first_result), base_date, 1)
+    
+    # 나머지 페이지 동시 수집 (속도 제한은 TokenBucket이 담당)
+    remaining = [page for page in range(2, pages + 1) if page not in skip_pages]
+    if remaining:
+        workers = page_workers or MAX_PAGE_WORKERS
+        done_pages = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rp-page') as executor:
+            futures = {
+                executor.submit(get_repo_trades, base_date, PAGE_SIZE, page, 3, use_cache): page
+                for page in remaining
+            }
+            for future in as_completed(futures):
+                result_page = future.result()
+                done_pages += 1
+                if result_page and 'response' in result_page:
+                    total_saved += save_trades_to_db(_extract_items(result_page), base_date, futures[future])
+                else:
+                    failed_pages.append(futures[future])
+                
+                # 진행률 표시
+                if done_pages % 5 == 0:
+                    print(f"  → {base_date}: {done_pages}/{len(remaining)}페이지 진행 중 ({total_saved}건 저장)")
     
-    conn.commit()
-    conn.close()
+    return total_saved, sorted(failed_pages)
 
-def collect_date_data(base_date):
+def collect_date_data(base_date, page_workers=None, check_collected=True):
     """
-    특정 날짜의 모든 데이터 수집
+    특정 날짜의 모든 데이터 수집 (2페이지 이후는 동시 조회)
+    check_collected=False: 호출자가 이미 수집 여부를 걸러낸 경우 (collect_date_range)
+    - 실패한 페이지가 있으면 'partial'로 기록하고 False 반환 (다음 시도 때 누락 페이지만 조회)
     """
     # 이미 수집된 날짜인지 확인
-    if is_date_collected(base_date):
+    if check_collected and is_date_collected(base_date):
         print(f"{base_date}: 이미 수집 완료 (건너뛰기)")
         return True
     
-    print(f"\n{base_date} 데이터 조회 중...", end=" ")
-    
     # 첫 페이지 조회
-    result = get_repo_trades(base_date, num_rows=1000, page_no=1)
+    result = get_repo_trades(base_date, num_rows=PAGE_SIZE, page_no=1)
     
     if not result or 'response' not in result:
-        print("조회 실패")
+        print(f"{base_date}: 조회 실패")
         return False
     
     body = result['response'].get('body', {})
-    total_count = body.get('totalCount', 0)
+    total_count = int(body.get('totalCount', 0) or 0)
     
     if total_count == 0:
-        print("데이터 없음")
+        print(f"{base_date}: 데이터 없음")
         update_collection_status(base_date, 0, 0, 'no_data')
         return True
     
-    # 첫 페이지 데이터 저장
-    items = body.get('items', {}).get('item', [])
-    if not isinstance(items, list):
-        items = [items]
+    # 이전 시도에서 같은 건수로 일부 페이지를 받아 두었다면 그 페이지는 건너뜀
+    writer = get_writer()
+    stored = writer.stored_status(base_date)
+    skip_pages = writer.saved_pages(base_date) if stored and stored[0] == total_count else set()
     
-    saved = save_trades_to_db(items, base_date)
-    print(f"OK - {saved}건 수집 (전체 {total_count}건)", end="")
-    
-    total_saved = saved
-    
-    # 나머지 페이지 수집
-    if total_count > 1000:
-        pages = (total_count // 1000) + 1
-        for page in range(2, pages + 1):
-            result_page = get_repo_trades(base_date, num_rows=1000, page_no=page)
-            if result_page and 'response' in result_page:
-                items_page = result_page['response'].get('body', {}).get('items', {}).get('item', [])
-                if not isinstance(items_page, list):
-                    items_page = [items_page]
-                saved_page = save_trades_to_db(items_page, base_date)
-                total_saved += saved_page
-                
-                # 진행률 표시
-                if page % 5 == 0:
-                    print(f"\n  → {page}/{pages}페이지 진행 중 ({total_saved}건 저장)", end="")
-            
-            time.sleep(0.5)  # API 제한 준수
+    total_saved, failed_pages = _fetch_pages(base_date, result, total_count, skip_pages, page_workers)
+    collected = writer.count_trades(base_date, base_date).get(base_date, 0) if skip_pages else total_saved
     
-    print(f"\n  ✓ 완료: {total_saved}건 저장됨")
+    if failed_pages:
+        print(f"  ✗ {base_date}: {len(failed_pages)}페이지 실패 ({collected}/{total_count}건), 다음 시도 때 해당 페이지만 재조회")
+        update_collection_status(base_date, total_count, collected, 'partial')
+        rm.count('collect.dates_partial')
+        rm.event('date_partial', basDt=base_date, rows=collected, total=total_count, failed_pages=len(failed_pages))
+        return False
+    
+    print(f"  ✓ {base_date} 완료: {collected}건 저장됨 (전체 {total_count}건)")
     
     # 수집 완료 상태 저장
-    update_collection_status(base_date, total_count, total_saved, 'completed')
+    update_collection_status(base_date, total_count, collected, 'completed')
+    rm.count('collect.dates_completed')
+    rm.event('date_done', basDt=base_date, rows=collected, total=total_count)
     
     return True
 
-def collect_date_range(start_date, end_date):
+def plan_dates(start_date, end_date):
     """
-    날짜 범위의 데이터 수집 (주말 제외)
+    수집 대상 날짜 선정
+    1) 기간 내 거래일 (주말 + KRX 휴장일 제외, RP_Calendar.py)
+    2) collection_status의 completed / no_data 날짜를 한 번에 조회해 제외
+    3) 최신 날짜부터 정렬
+    반환값: (수집 대상 목록, 요약 dict)
     """
     start_dt = datetime.strptime(start_date, '%Y%m%d')
     end_dt = datetime.strptime(end_date, '%Y%m%d')
-    
-    # 전체 날짜 수와 평일 날짜 수 계산
     total_days = (end_dt - start_dt).days + 1
-    weekday_count = 0
-    temp_date = start_dt
-    while temp_date <= end_dt:
-        if temp_date.weekday() < 5:  # 0=월요일, 4=금요일
-            weekday_count += 1
-        temp_date += timedelta(days=1)
+    weekday_count = sum(1 for i in range(total_days) if (start_dt + timedelta(days=i)).weekday() < 5)
+    
+    trading = RP_Calendar.trading_days(start_date, end_date)
+    done = get_writer().load_done_dates()
+    targets = sorted((d for d in trading if d not in done), reverse=True)
+    
+    summary = {
+        'total_days': total_days,
+        'weekend_days': total_days - weekday_count,
+        'holiday_days': weekday_count - len(trading),
+        'done_days': len(trading) - len(targets),
+        'target_days': len(targets),
+    }
+    return targets, summary
+
+def collect_date_range(start_date, end_date, date_workers=None, page_workers=None):
+    """
+    날짜 범위의 데이터 수집 (주말/휴장일/수집 완료일 제외, 최신 날짜부터, 날짜 단위 동시 수집)
+    실패한 날짜는 라운드가 끝난 뒤 대기 시간을 늘려가며 다시 시도
+    """
+    start_dt = datetime.strptime(start_date, '%Y%m%d')
+    end_dt = datetime.strptime(end_date, '%Y%m%d')
+    target_dates, summary = plan_dates(start_date, end_date)
+    started = rm.start_run('collect_date_range', start_date=start_date, end_date=end_date,
+                           db_file=DB_FILE, target_days=summary['target_days'])
     
     print(f"\n{'='*80}")
     print(f"데이터 수집 기간: {start_dt.strftime('%Y-%m-%d')} ~ {end_dt.strftime('%Y-%m-%d')}")
-    print(f"총 {total_days}일 (평일 {weekday_count}일, 주말 {total_days - weekday_count}일)")
+    print(f"총 {summary['total_days']}일 (수집 대상 {summary['target_days']}일, 주말 {summary['weekend_days']}일, "
+          f"휴장일 {summary['holiday_days']}일, 이미 수집 {summary['done_days']}일)")
+    print(f"동시 수집: 날짜 {date_workers or MAX_DATE_WORKERS}개 × 페이지 {page_workers or MAX_PAGE_WORKERS}개, "
+          f"초당 {_rate_limiter.rate:g}건 제한")
     print(f"{'='*80}")
     
-    current_date = start_dt
     success_count = 0
-    fail_count = 0
-    skipped_weekend = 0
-    
-    while current_date <= end_dt:
-        # 주말 체크 (0=월요일, 5=토요일, 6=일요일)
-        if current_date.weekday() >= 5:
-            date_str = current_date.strftime('%Y%m%d')
-            weekday_name = '토요일' if current_date.weekday() == 5 else '일요일'
-            print(f"{date_str} ({weekday_name}): 주말 - 건너뛰기")
-            skipped_weekend += 1
-            current_date += timedelta(days=1)
-            continue
-        
-        date_str = current_date.strftime('%Y%m%d')
+    pending = target_dates
+    
+    for round_no in range(DATE_RETRY_ROUNDS + 1):
+        if round_no > 0:
+            wait = DATE_RETRY_BACKOFF_SEC * 2 ** (round_no - 1)
+            print(f"\n실패 {len(pending)}일 재시도 ({round_no}/{DATE_RETRY_ROUNDS}), {wait}초 대기...")
+            time.sleep(wait)
         
-        if collect_date_data(date_str):
-            success_count += 1
-        else:
-            fail_count += 1
+        failed = []
+        with ThreadPoolExecutor(max_workers=date_workers or MAX_DATE_WORKERS, thread_name_prefix='rp-date') as executor:
+            # 제출 순서(최신 날짜부터)대로 실행됨
+            futures = {
+                executor.submit(collect_date_data, date_str, page_workers, False): date_str
+                for date_str in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    ok = future.result()
+                except Exception as e:
+                    print(f"{futures[future]}: 수집 오류 ({e})")
+                    ok = False
+                if ok:
+                    success_count += 1
+                else:
+                    failed.append(futures[future])
         
-        current_date += timedelta(days=1)
-        time.sleep(0.5)  # 날짜 간 대기
+        pending = sorted(failed, reverse=True)
+        if not pending:
+            break
+    
+    # 마지막 트랜잭션 커밋
+    get_writer().commit()
     
     print(f"\n{'='*80}")
-    print(f"수집 완료 - 평일 {success_count}일 수집, 실패: {fail_count}일, 주말 제외: {skipped_weekend}일")
+    print(f"수집 완료 - {success_count}일 수집, 실패: {len(pending)}일, "
+          f"제외: 주말 {summary['weekend_days']}일 / 휴장일 {summary['holiday_days']}일 / 이미 수집 {summary['done_days']}일")
+    if pending:
+        print(f"실패 날짜: {', '.join(sorted(pending))}")
     print(f"{'='*80}\n")
+    if started:
+        rm.end_run(status='ok' if not pending else 'partial')
+
+def verify_and_repair(start_date, end_date, repair=True, page_workers=None):
+    """
+    수집 완료/일부 수집 날짜 점검 및 복구
+    1) 날짜별 1페이지를 새로 조회(캐시 미사용)해 API totalCount 확인
+    2) 저장된 total_count, 실제 적재 건수(한 번의 GROUP BY 조회)와 비교
+    3) 건수가 같고 일부만 빠졌으면 누락 페이지만, totalCount가 바뀌었으면 해당 날짜 전체를 다시 받음
+    4) 상태 갱신 시 해당 날짜의 일별 집계만 다시 계산 (TradeWriter.set_status)
+    반환값: {날짜: 점검 결과}
+    """
+    writer = get_writer()
+    with writer.lock:
+        status_rows = writer.conn.execute('''
+            SELECT basDt, total_count, status FROM collection_status
+            WHERE basDt BETWEEN ? AND ? AND status IN ('completed', 'partial')
+            ORDER BY basDt DESC
+        ''', (start_date, end_date)).fetchall()
+    actual_counts = writer.count_trades(start_date, end_date)
+
+    print(f"\n{'='*80}")
+    print(f"수집 점검: {start_date} ~ {end_date} ({len(status_rows)}일){' 및 복구' if repair else ''}")
+    print(f"{'='*80}")
+
+    results = {}
+    for base_date, stored_total, status in status_rows:
+        result = get_repo_trades(base_date, num_rows=PAGE_SIZE, page_no=1, use_cache=False)
+        if not result or 'response' not in result:
+            print(f"{base_date}: 조회 실패 (점검 보류)")
+            results[base_date] = 'unverified'
+            continue
+
+        remote_total = int(result['response'].get('body', {}).get('totalCount', 0) or 0)
+        actual = actual_counts.get(base_date, 0)
+        if remote_total == stored_total == actual and status == 'completed':
+            results[base_date] = 'ok'
+            continue
+
+        print(f"{base_date}: API {remote_total}건 / 기록 {stored_total}건 / 적재 {actual}건 ({status})")
+        if not repair:
+            results[base_date] = 'mismatch'
+            continue
+
+        if remote_total == 0:
+            writer.delete_date(base_date)
+            update_collection_status(base_date, 0, 0, 'no_data')
+            results[base_date] = 'no_data'
+            continue
+
+        if remote_total != stored_total:
+            # 원천 데이터가 바뀌어 페이지 경계도 달라졌으므로 날짜 전체 재적재
+            writer.delete_date(base_date)
+            skip_pages = set()
+        else:
+            skip_pages = writer.saved_pages(base_date)
+            # 모든 페이지가 적재 기록에 있는데 건수가 모자라면 어느 페이지인지 알 수 없으므로 전체 재조회
+            if len(skip_pages) >= (remote_total + PAGE_SIZE - 1) // PAGE_SIZE:
+                skip_pages = set()
+
+        _, failed_pages = _fetch_pages(base_date, result, remote_total, skip_pages, page_workers, use_cache=False)
+        collected = writer.count_trades(base_date, base_date).get(base_date, 0)
+        repaired = not failed_pages and collected == remote_total
+        update_collection_status(base_date, remote_total, collected, 'completed' if repaired else 'partial')
+        results[base_date] = 'repaired' if repaired else 'partial'
+        print(f"  {'✓' if repaired else '✗'} {base_date}: {collected}/{remote_total}건"
+              f"{'' if repaired else f' (실패 페이지 {failed_pages})'}")
+
+    writer.commit()
+
+    summary = {}
+    for value in results.values():
+        summary[value] = summary.get(value, 0) + 1
+    print(f"\n점검 결과: {', '.join(f'{k} {v}일' for k, v in sorted(summary.items())) or '대상 없음'}")
+    print(f"{'='*80}\n")
+    return results
+
+def rebuild_from_cache(db_file, start_date=None, end_date=None, date_workers=None, page_workers=None):
+    """
+    API 호출 없이 캐시된 응답만으로 DB 재적재 (스키마 변경/데이터 수정 후 재수집 대신 사용)
+    """
+    global DB_FILE, CACHE_MODE
+    prev_db, prev_mode = DB_FILE, CACHE_MODE
+    DB_FILE, CACHE_MODE = db_file, 'replay'
+    try:
+        init_database()
+        dates = get_cache().cached_dates(start_date, end_date, num_rows=PAGE_SIZE)
+        print(f"캐시에서 {len(dates)}일 재적재: {db_file}")
+        
+        started = time.perf_counter()
+        with rm.run('rebuild_from_cache', db_file=db_file, dates=len(dates)):
+            with ThreadPoolExecutor(max_workers=date_workers or MAX_DATE_WORKERS, thread_name_prefix='rp-date') as executor:
+                results = list(executor.map(lambda d: collect_date_data(d, page_workers), dates))
+            close_writer()
+        
+        print(f"✓ 재적재 완료: {sum(results)}/{len(dates)}일, {time.perf_counter() - started:.1f}초")
+    finally:
+        DB_FILE, CACHE_MODE = prev_db, prev_mode
 
 def get_db_stats():
     """
@@ -349,35 +787,151 @@ def get_db_stats():
     print(f"수집 완료 날짜: {completed_dates}일")
     print(f"{'='*80}\n")
 
-def export_to_excel(output_file='repo_trades_export.xlsx', start_date=None, end_date=None):
+def print_progress(done_rows, total_rows, eta_sec):
+    """
+    기본 진행 상황 출력 (내보내기/조회 progress 콜백)
     """
-    DB 데이터를 엑셀로 내보내기
+    if total_rows:
+        print(f"  → {done_rows:,}/{total_rows:,}건 ({done_rows / total_rows * 100:.1f}%), 남은 시간 약 {eta_sec:.0f}초")
+    else:
+        print(f"  → {done_rows:,}건")
+
+def _trade_query(start_date=None, end_date=None):
+    """
+    기간 조건 거래 조회 SQL + 바인딩 파라미터
+    """
+    if start_date and end_date:
+        return "SELECT * FROM repo_trades WHERE basDt BETWEEN ? AND ? ORDER BY basDt, rpSqno", (start_date, end_date)
+    return "SELECT * FROM repo_trades ORDER BY basDt, rpSqno", ()
+
+def _count_rows(conn, sql_query, params):
+    """
+    조회 결과 건수 (진행률/남은 시간 계산용)
+    """
+    return conn.execute(f"SELECT COUNT(*) FROM ({sql_query})", params).fetchone()[0]
+
+def iter_query(sql_query, params=(), chunksize=EXPORT_CHUNK_ROWS, progress=None, count_rows=True):
+    """
+    SQL 결과를 chunksize 건씩 DataFrame으로 순회 (전체 결과를 메모리에 올리지 않음)
+    progress(읽은 건수, 전체 건수, 남은 시간 초)를 청크마다 호출
     """
     conn = sqlite3.connect(DB_FILE)
+    try:
+        total_rows = _count_rows(conn, sql_query, params) if (progress and count_rows) else None
+        done_rows = 0
+        started = time.perf_counter()
+        
+        for chunk in pd.read_sql_query(sql_query, conn, params=params, chunksize=chunksize):
+            done_rows += len(chunk)
+            if progress:
+                elapsed = time.perf_counter() - started
+                eta = elapsed / done_rows * (total_rows - done_rows) if total_rows else 0.0
+                progress(done_rows, total_rows, eta)
+            yield chunk
+    finally:
+        conn.close()
+
+def _write_csv(chunks, output_file):
+    rows = 0
+    for chunk in chunks:
+        chunk.to_csv(output_file, mode='w' if rows == 0 else 'a', header=(rows == 0),
+                     index=False, encoding='utf-8-sig' if rows == 0 else 'utf-8')
+        rows += len(chunk)
+    return rows
+
+def _write_excel(chunks, output_file):
+    """
+    openpyxl 쓰기 전용 모드로 행을 바로 파일에 기록 (시트당 EXCEL_MAX_ROWS 초과 시 다음 시트)
+    """
+    from openpyxl import Workbook
+    
+    wb = Workbook(write_only=True)
+    ws = None
+    sheet_rows = 0
+    rows = 0
+    for chunk in chunks:
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if ws is None or sheet_rows >= EXCEL_MAX_ROWS:
+                ws = wb.create_sheet(f'repo_trades_{len(wb.worksheets) + 1}')
+                ws.append(list(chunk.columns))
+                sheet_rows = 0
+            ws.append(row)
+            sheet_rows += 1
+        rows += len(chunk)
+    if rows:
+        wb.save(output_file)
+    return rows
+
+def _write_parquet(chunks, output_file):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_file, table.schema, compression='zstd')
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+EXPORT_WRITERS = {'.xlsx': _write_excel, '.csv': _write_csv, '.parquet': _write_parquet}
+
+def export_trades(output_file, start_date=None, end_date=None, chunksize=EXPORT_CHUNK_ROWS, progress=print_progress):
+    """
+    DB 데이터를 청크 단위로 파일에 내보내기 (확장자로 형식 결정: .xlsx / .csv / .parquet)
+    메모리 사용량은 chunksize 건 정도로 고정
+    """
+    ext = output_file[output_file.rfind('.'):].lower()
+    if ext not in EXPORT_WRITERS:
+        raise ValueError(f"지원하지 않는 형식: {ext} (지원: {', '.join(EXPORT_WRITERS)})")
     
     if start_date and end_date:
-        query = f"SELECT * FROM repo_trades WHERE basDt BETWEEN '{start_date}' AND '{end_date}' ORDER BY basDt, rpSqno"
         print(f"기간 {start_date} ~ {end_date} 데이터를 내보냅니다...")
     else:
-        query = "SELECT * FROM repo_trades ORDER BY basDt, rpSqno"
         print("전체 데이터를 내보냅니다...")
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    sql_query, params = _trade_query(start_date, end_date)
+    rows = EXPORT_WRITERS[ext](iter_query(sql_query, params, chunksize, progress), output_file)
     
-    if df.empty:
+    if rows == 0:
         print("내보낼 데이터가 없습니다.")
-        return
+        return 0
     
-    df.to_excel(output_file, index=False, engine='openpyxl')
-    print(f"✓ {len(df):,}건의 데이터를 '{output_file}'에 저장했습니다.")
+    print(f"✓ {rows:,}건의 데이터를 '{output_file}'에 저장했습니다.")
+    return rows
+
+def export_to_excel(output_file='repo_trades_export.xlsx', start_date=None, end_date=None,
+                    chunksize=EXPORT_CHUNK_ROWS, progress=print_progress):
+    """
+    DB 데이터를 엑셀로 내보내기 (청크 단위, export_trades 참고)
+    """
+    return export_trades(output_file, start_date, end_date, chunksize, progress)
 
-def query_data(sql_query):
+def export_to_parquet(output_dir='repo_trades_parquet', start_date=None, end_date=None):
+    """
+    DB 데이터를 연도 × 담보유형별 Parquet로 내보내기 (청크 단위 스트리밍, RP_Columnar.py)
     """
-    사용자 정의 SQL 쿼리 실행
+    import RP_Columnar
+    return RP_Columnar.export_trades_parquet(DB_FILE, output_dir, start_date, end_date)
+
+def query_data(sql_query, params=(), chunksize=None, progress=None):
     """
+    사용자 정의 SQL 쿼리 실행 (값은 ?로 바인딩해 params로 전달)
+    - chunksize 없음: 전체 결과 DataFrame
+    - chunksize 지정: chunksize 건씩 DataFrame을 돌려주는 이터레이터
+    """
+    if chunksize:
+        return iter_query(sql_query, params, chunksize, progress)
+    
     conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query(sql_query, conn)
+    df = pd.read_sql_query(sql_query, conn, params=params)
     conn.close()
     return df
 
@@ -420,6 +974,7 @@ def main():
     
     # 데이터 수집
     collect_date_range(START_DATE, END_DATE)
+    close_writer()
     
     # 통계 출력
     get_db_stats()
@@ -0,0 +1,252 @@
+"""
+금융위원회 REPO거래정보 - Parquet(열 기반) 내보내기 / 읽기
+- 원본 거래: SQLite에서 청크 단위로 읽어 연도 × 담보유형별 폴더에 Parquet로 스트리밍 저장
+      <출력폴더>/year=2025/scrsItmsKcdNm=국채/part-<첫날짜>_<끝날짜>.parquet
+  파일 이름이 내보낸 basDt 구간이라 일부 기간만 다시 내보내면 그 구간의 행만 교체
+- 일별 금리(daily_repo_rates): Parquet 파일 하나로 저장
+- 읽기: 필요한 컬럼만, 연도/담보 폴더와 basDt 통계(row group)로 걸러서 읽음
+
+사용법:
+    python RP_Columnar.py trades <원본거래.db> <출력폴더> [시작일 종료일]
+    python RP_Columnar.py daily <D_Repo.db> <출력.parquet>
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from RP_Schema import TRADE_COLUMNS
+
+CHUNK_ROWS = 500000           # SQLite에서 한 번에 읽는 건수 (메모리 상한)
+COMPRESSION = 'zstd'
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# 숫자 컬럼 (나머지는 문자열)
+NUMERIC_COLUMNS = ['rpInrt', 'rpBuyAmt', 'rpMrgamRto', 'buyScrtBuyAmt', 'buyScrtEvlAmt']
+PARTITION_COLUMN = 'scrsItmsKcdNm'
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet 기능에는 pyarrow가 필요합니다: pip install pyarrow")
+
+def _file_schema():
+    """파티션 폴더로 빠지는 담보유형 컬럼을 제외한 파일 스키마"""
+    return pa.schema([
+        (col, pa.float64() if col in NUMERIC_COLUMNS else pa.string())
+        for col in TRADE_COLUMNS if col != PARTITION_COLUMN
+    ])
+
+def _partition_dir(out_dir, year, collateral):
+    name = NULL_PARTITION if collateral is None or pd.isna(collateral) else str(collateral)
+    return os.path.join(out_dir, f'year={year}', f'{PARTITION_COLUMN}={name}')
+
+def _year_bounds(year, start_date, end_date):
+    """내보내기 구간을 연도 안으로 자른 (첫 날짜, 끝 날짜)"""
+    lo = max(f'{year}0101', start_date) if start_date else f'{year}0101'
+    hi = min(f'{year}1231', end_date) if end_date else f'{year}1231'
+    return lo, hi
+
+def _file_range(name, year):
+    """part-<첫날짜>_<끝날짜>.parquet -> (첫 날짜, 끝 날짜), 구간이 없는 이름(part-0 등)은 연도 전체"""
+    stem = os.path.splitext(name)[0].split('-', 1)[-1]
+    lo, _, hi = stem.partition('_')
+    if len(lo) == 8 and len(hi) == 8 and lo.isdigit() and hi.isdigit():
+        return lo, hi
+    return f'{year}0101', f'{year}1231'
+
+def _clear_range(out_dir, year, lo, hi):
+    """
+    연도 폴더에서 [lo, hi] 구간의 기존 행 제거
+    - 구간 안에 완전히 들어가는 파일은 삭제
+    - 일부만 겹치는 파일은 구간 밖 행만 남겨 다시 씀
+    """
+    year_dir = os.path.join(out_dir, f'year={year}')
+    if not os.path.isdir(year_dir):
+        return
+    if lo <= f'{year}0101' and hi >= f'{year}1231':
+        shutil.rmtree(year_dir, ignore_errors=True)
+        return
+
+    for part_dir in os.listdir(year_dir):
+        part_path = os.path.join(year_dir, part_dir)
+        for name in os.listdir(part_path):
+            if not name.endswith('.parquet'):
+                continue
+            path = os.path.join(part_path, name)
+            f_lo, f_hi = _file_range(name, year)
+            if f_hi < lo or f_lo > hi:
+                continue
+            if lo <= f_lo and f_hi <= hi:
+                os.remove(path)
+                continue
+            table = pq.read_table(path)
+            keep = pc.invert(pc.and_(pc.greater_equal(table['basDt'], lo), pc.less_equal(table['basDt'], hi)))
+            table = table.filter(keep)
+            if table.num_rows == 0:
+                os.remove(path)
+            else:
+                tmp = path + '.tmp'
+                pq.write_table(table, tmp, compression=COMPRESSION)
+                os.replace(tmp, path)
+
+def _existing_years(out_dir):
+    """출력 폴더에 이미 있는 연도 목록"""
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(int(d[5:]) for d in os.listdir(out_dir) if d.startswith('year=') and d[5:].isdigit())
+
+def _date_span(conn, where, params):
+    """내보낼 거래의 (최소, 최대) basDt"""
+    return conn.execute(f"SELECT MIN(basDt), MAX(basDt) FROM repo_trades {where}", params).fetchone()
+
+def export_trades_parquet(db_path, out_dir, start_date=None, end_date=None, chunk_rows=CHUNK_ROWS, verbose=True):
+    """
+    repo_trades를 연도 × 담보유형 파티션 Parquet로 내보내기
+    - 청크 단위로 읽고 쓰므로 전체 기간을 메모리에 올리지 않음
+    - 내보내는 basDt 구간의 기존 행만 지우고 새로 씀 (연도 전체를 덮으면 연도 폴더를 새로 씀,
+      구간 밖의 날짜/다른 연도는 그대로)
+    반환값: 내보낸 건수
+    """
+    _require_pyarrow()
+
+    conditions, params = [], []
+    if start_date:
+        conditions.append('basDt >= ?')
+        params.append(start_date)
+    if end_date:
+        conditions.append('basDt <= ?')
+        params.append(end_date)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = f"SELECT {', '.join(TRADE_COLUMNS)} FROM repo_trades {where} ORDER BY basDt, rpSqno"
+
+    schema = _file_schema()
+    writers = {}
+    total = 0
+
+    conn = sqlite3.connect(db_path)
+    try:
+        # 기존 파일에서 이번 구간 정리 (구간이 열려 있으면 DB에 있는 날짜 범위까지)
+        # 지정한 구간에 DB 거래가 없어도(삭제/no_data 재수집) 기존 행은 지움
+        first, last = _date_span(conn, where, params)
+        years = _existing_years(out_dir)
+        if first is not None:
+            lo_all, hi_all = start_date or str(first), end_date or str(last)
+        elif (start_date or end_date) and years:
+            lo_all, hi_all = start_date or f'{years[0]}0101', end_date or f'{years[-1]}1231'
+        else:
+            lo_all = hi_all = None
+        if lo_all is not None:
+            for year in range(int(lo_all[:4]), int(hi_all[:4]) + 1):
+                _clear_range(out_dir, year, *_year_bounds(year, lo_all, hi_all))
+
+        for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunk_rows):
+            for col in NUMERIC_COLUMNS:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+            for col in TRADE_COLUMNS:
+                if col not in NUMERIC_COLUMNS:
+                    chunk[col] = chunk[col].astype('string')
+            years = chunk['basDt'].str[:4]
+
+            for (year, collateral), part in chunk.groupby([years, PARTITION_COLUMN], dropna=False, sort=False):
+                key = (year, collateral)
+                if key not in writers:
+                    path = _partition_dir(out_dir, year, collateral)
+                    os.makedirs(path, exist_ok=True)
+                    lo, hi = _year_bounds(year, start_date or str(first), end_date or str(last))
+                    writers[key] = pq.ParquetWriter(os.path.join(path, f'part-{lo}_{hi}.parquet'), schema,
+                                                    compression=COMPRESSION)
+                table = pa.Table.from_pandas(part.drop(columns=[PARTITION_COLUMN]), schema=schema,
+                                             preserve_index=False)
+                writers[key].write_table(table)
+
+            total += len(chunk)
+            if verbose:
+                print(f"  → {total:,}건 내보냄 (마지막 날짜 {chunk['basDt'].iloc[-1]})")
+    finally:
+        conn.close()
+        for writer in writers.values():
+            writer.close()
+
+    if verbose:
+        print(f"✓ Parquet 내보내기 완료: {out_dir} ({total:,}건, 파티션 {len(writers)}개)")
+    return total
+
+def read_trades(dataset_dir, columns=None, start_date=None, end_date=None, collaterals=None, as_pandas=True):
+    """
+    Parquet 거래 데이터 읽기
+    - columns: 읽을 컬럼 목록 (None이면 전체)
+    - start_date / end_date: 'YYYYMMDD' (연도 폴더 + basDt row group 통계로 걸러냄)
+    - collaterals: 담보유형 이름 목록 (담보 폴더 단위로 걸러냄)
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(dataset_dir, format='parquet',
+                         partitioning=ds.partitioning(
+                             pa.schema([('year', pa.int32()), (PARTITION_COLUMN, pa.string())]),
+                             flavor='hive'))
+
+    expr = None
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if start_date:
+        expr = _and((ds.field('year') >= int(start_date[:4])) & (ds.field('basDt') >= start_date))
+    if end_date:
+        expr = _and((ds.field('year') <= int(end_date[:4])) & (ds.field('basDt') <= end_date))
+    if collaterals:
+        expr = _and(ds.field(PARTITION_COLUMN).isin(list(collaterals)))
+
+    if columns is None:
+        columns = TRADE_COLUMNS
+    table = dataset.to_table(columns=list(columns), filter=expr)
+    return table.to_pandas() if as_pandas else table
+
+def export_daily_rates_parquet(db_path, out_path, table='daily_repo_rates'):
+    """
+    일별 금리 테이블(daily_repo_rates, 날짜 × 담보유형)을 Parquet 파일 하나로 저장
+    """
+    _require_pyarrow()
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
+    conn.close()
+
+    df['basDt'] = pd.to_datetime(df['basDt'])
+    df = df.sort_values('basDt').reset_index(drop=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), out_path, compression=COMPRESSION)
+    print(f"✓ 일별 금리 Parquet 저장: {out_path} ({len(df)}일)")
+
+def read_daily_rates(path, columns=None, start_date=None, end_date=None):
+    """
+    일별 금리 Parquet 읽기 (basDt 인덱스)
+    - columns: 담보유형 컬럼 목록 (None이면 전체)
+    - start_date / end_date: 'YYYY-MM-DD' 또는 'YYYYMMDD'
+    """
+    _require_pyarrow()
+    filters = []
+    if start_date:
+        filters.append(('basDt', '>=', pd.Timestamp(start_date)))
+    if end_date:
+        filters.append(('basDt', '<=', pd.Timestamp(end_date)))
+    read_columns = None if columns is None else ['basDt'] + [c for c in columns if c != 'basDt']
+
+    df = pq.read_table(path, columns=read_columns, filters=filters or None).to_pandas()
+    return df.set_index('basDt')
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == 'trades':
+        start, end = (sys.argv[4], sys.argv[5]) if len(sys.argv) >= 6 else (None, None)
+        export_trades_parquet(sys.argv[2], sys.argv[3], start, end)
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'daily':
+        export_daily_rates_parquet(sys.argv[2], sys.argv[3])
+    else:
+        print(__doc__)
@@ -0,0 +1,245 @@
+"""
+금융위원회 REPO거래정보 - 다차원 집계 엔진
+원하는 집계(큐브) 여러 개를 원본 거래 DB 한 번의 스트리밍 스캔으로 동시에 계산
+
+큐브 = 그룹 차원 목록 + 지표 목록 (+ 큐브별 조건)
+- 차원: rdptTermCcdNm, rpRmngExprDcdNm, slngShtrFinBzcDcdNm, buynShtrFinBzcDcdNm,
+        scrsItmsKcdNm, rpBuyAplCurCdNm, day, month, year
+- 지표: vwap(가중평균 금리), volume(거래대금), count(건수),
+        haircut(평균 rpMrgamRto), rate_pct(금리 분위수)
+
+예시 (기초통계량 분석 노트북의 연도별 거래대금 2종을 한 번에):
+    cubes = [
+        Cube('annual_volume', ['year'], ['volume'], where={'rpBuyAplCurCdNm': '대한민국 원'}),
+        Cube('annual_collateral_volume', ['year', 'scrsItmsKcdNm'], ['volume'],
+             where={'rpBuyAplCurCdNm': '대한민국 원', 'rdptTermCcdNm': '1영업일'}),
+    ]
+    result = compute_cubes([r'...\\r_2015-2019.db', r'...\\r_2020-2024.db'], cubes)
+    result['annual_volume']
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+CHUNK_ROWS = 500000          # 한 번에 읽는 거래 건수 (메모리 상한)
+CUBE_CACHE_DIR = 'cache'     # 결과 캐시 폴더 (None이면 캐시 사용 안 함)
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# 거래 테이블 컬럼 차원 / 날짜에서 파생되는 차원 (basDt 'YYYYMMDD' 앞자리)
+COLUMN_DIMS = ['rpBuyAplCurCdNm', 'rdptTermCcdNm', 'rpRmngExprDcdNm',
+               'slngShtrFinBzcDcdNm', 'buynShtrFinBzcDcdNm', 'scrsItmsKcdNm']
+TIME_DIMS = {'day': 8, 'month': 6, 'year': 4}
+METRICS = ['vwap', 'volume', 'count', 'haircut', 'rate_pct']
+
+# 부분합 컬럼 (DB/청크 간에 그대로 더해도 되는 값)
+SUM_COLUMNS = ['n', 'volume', 'vw_amt', 'vw_rate_amt', 'hc_sum', 'hc_n']
+
+class Cube:
+    """
+    집계 정의 하나
+    name: 결과 이름, dims: 그룹 차원 목록, metrics: 지표 목록,
+    where: {컬럼: 값 또는 값 목록} 조건 (없으면 전체 거래)
+    """
+    def __init__(self, name, dims, metrics, where=None, quantiles=DEFAULT_QUANTILES):
+        for d in dims:
+            if d not in COLUMN_DIMS and d not in TIME_DIMS:
+                raise ValueError(f"지원하지 않는 차원: {d}")
+        for m in metrics:
+            if m not in METRICS:
+                raise ValueError(f"지원하지 않는 지표: {m}")
+        self.name = name
+        self.dims = list(dims)
+        self.metrics = list(metrics)
+        self.where = {k: (list(v) if isinstance(v, (list, tuple, set)) else [v]) for k, v in (where or {}).items()}
+        self.quantiles = tuple(quantiles)
+
+    def spec(self):
+        """캐시 키용 정의"""
+        return {'name': self.name, 'dims': self.dims, 'metrics': self.metrics,
+                'where': {k: sorted(v) for k, v in self.where.items()}, 'quantiles': self.quantiles}
+
+def _shared_where(cubes):
+    """모든 큐브가 똑같이 거는 조건만 SQL WHERE로 내려보냄"""
+    shared = dict(cubes[0].where)
+    for cube in cubes[1:]:
+        shared = {k: v for k, v in shared.items() if sorted(cube.where.get(k, [])) == sorted(v)}
+    return shared
+
+def _needed_columns(cubes):
+    cols = {'basDt', 'rpInrt', 'rpBuyAmt', 'rpMrgamRto', 'buyScrtBuyAmt'}
+    for cube in cubes:
+        cols.update(d for d in cube.dims if d in COLUMN_DIMS)
+        cols.update(cube.where)
+    return sorted(cols)
+
+def _partial(chunk, cube):
+    """
+    청크 하나에 대한 큐브 부분합 (그룹별 합계) + 금리 값별 건수(분위수용)
+    """
+    if cube.where:
+        mask = pd.Series(True, index=chunk.index)
+        for col, values in cube.where.items():
+            mask &= chunk[col].isin(values)
+        chunk = chunk[mask]
+    if chunk.empty:
+        return None, None
+
+    frame = pd.DataFrame({d: chunk[d] for d in cube.dims}, index=chunk.index)
+    positive = chunk['buyScrtBuyAmt'] > 0
+    frame['n'] = 1
+    frame['volume'] = chunk['rpBuyAmt']
+    frame['vw_amt'] = chunk['buyScrtBuyAmt'].where(positive, 0.0)
+    frame['vw_rate_amt'] = (chunk['rpInrt'] * chunk['buyScrtBuyAmt']).where(positive, 0.0)
+    frame['hc_sum'] = chunk['rpMrgamRto'].fillna(0.0)
+    frame['hc_n'] = chunk['rpMrgamRto'].notna().astype(int)
+
+    keys = cube.dims or (lambda _: 0)
+    sums = frame.groupby(keys, dropna=False)[SUM_COLUMNS].sum()
+
+    rate_counts = None
+    if 'rate_pct' in cube.metrics:
+        # 금리는 소수 셋째 자리 단위로 공시되므로 값별 건수로 정확한 분위수 계산 가능
+        # 금리 결측 거래는 분위수에서 제외 (NaN이 맨 뒤로 정렬돼 상위 분위수가 NaN이 되지 않도록)
+        rated = chunk[chunk['rpInrt'].notna()]
+        if not rated.empty:
+            rc = pd.DataFrame({d: rated[d] for d in cube.dims}, index=rated.index)
+            rc['rpInrt'] = rated['rpInrt'].round(4)
+            rate_counts = rc.groupby(cube.dims + ['rpInrt'], dropna=False).size()
+
+    return sums, rate_counts
+
+def _merge(acc, part):
+    """부분합 누적 (인덱스가 같은 그룹끼리 더함)"""
+    if part is None:
+        return acc
+    if acc is None:
+        return part
+    return acc.add(part, fill_value=0)
+
+def _quantiles_from_counts(rate_counts, dims, quantiles):
+    """그룹별 금리 값별 건수 → 분위수 (하한 방식: 누적 비율이 q 이상이 되는 첫 값)"""
+    df = rate_counts.rename('cnt').reset_index()
+    df = df.sort_values(dims + ['rpInrt'])
+    group = df.groupby(dims, dropna=False, sort=False) if dims else None
+    cum = group['cnt'].cumsum() if dims else df['cnt'].cumsum()
+    tot = group['cnt'].transform('sum') if dims else pd.Series(df['cnt'].sum(), index=df.index)
+    df['frac'] = cum / tot
+
+    out = None
+    for q in quantiles:
+        hit = df[df['frac'] >= q - 1e-12]
+        first = hit.groupby(dims, dropna=False).first()['rpInrt'] if dims else pd.Series([hit['rpInrt'].iloc[0]], index=[0])
+        first = first.rename(f'rate_p{int(round(q * 100))}')
+        out = first.to_frame() if out is None else out.join(first)
+    return out
+
+def _finalize(cube, sums, rate_counts):
+    """부분합 → 최종 지표"""
+    if sums is None:
+        return pd.DataFrame(columns=cube.dims + cube.metrics)
+
+    result = pd.DataFrame(index=sums.index)
+    if 'count' in cube.metrics:
+        result['count'] = sums['n'].astype('int64')
+    if 'volume' in cube.metrics:
+        result['volume'] = sums['volume']
+    if 'vwap' in cube.metrics:
+        result['vwap'] = sums['vw_rate_amt'] / sums['vw_amt'].where(sums['vw_amt'] > 0)
+    if 'haircut' in cube.metrics:
+        result['haircut'] = sums['hc_sum'] / sums['hc_n'].where(sums['hc_n'] > 0)
+    if 'rate_pct' in cube.metrics and rate_counts is not None:
+        pct = _quantiles_from_counts(rate_counts, cube.dims, cube.quantiles)
+        result = result.join(pct) if cube.dims else result.assign(**pct.iloc[0].to_dict())
+    elif 'rate_pct' in cube.metrics:
+        # 금리가 모두 결측
+        result = result.assign(**{f'rate_p{int(round(q * 100))}': float('nan') for q in cube.quantiles})
+
+    if cube.dims:
+        return result.reset_index()
+    return result.reset_index(drop=True)
+
+def _cache_key(db_paths, cubes, start_date, end_date):
+    """DB 파일 경로/수정시각/크기 + 큐브 정의로 캐시 키 생성"""
+    files = []
+    for path in db_paths:
+        st = os.stat(path)
+        wal = path + '-wal'
+        wal_mtime = os.stat(wal).st_mtime_ns if os.path.exists(wal) else 0
+        files.append([os.path.abspath(path), st.st_mtime_ns, st.st_size, wal_mtime])
+    payload = json.dumps({'files': files, 'cubes': [c.spec() for c in cubes],
+                          'range': [start_date, end_date]}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def scan_db(db_path, cubes, start_date=None, end_date=None, chunk_rows=CHUNK_ROWS):
+    """
+    DB 하나를 한 번 스캔하며 모든 큐브의 부분합 계산
+    반환값: {큐브명: (부분합, 금리 값별 건수)}
+    """
+    columns = _needed_columns(cubes)
+    conditions, params = [], []
+    for col, values in _shared_where(cubes).items():
+        conditions.append(f"{col} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if start_date:
+        conditions.append('basDt >= ?')
+        params.append(start_date)
+    if end_date:
+        conditions.append('basDt <= ?')
+        params.append(end_date)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    conn = sqlite3.connect(db_path)
+    sql = f"SELECT {', '.join(columns)} FROM repo_trades {where}"
+    partials = {c.name: (None, None) for c in cubes}
+
+    for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunk_rows):
+        for col in ('rpInrt', 'rpBuyAmt', 'rpMrgamRto', 'buyScrtBuyAmt'):
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        chunk['basDt'] = chunk['basDt'].astype(str)
+        for dim, width in TIME_DIMS.items():
+            if any(dim in c.dims for c in cubes):
+                chunk[dim] = chunk['basDt'].str[:width]
+
+        for cube in cubes:
+            sums, rate_counts = _partial(chunk, cube)
+            acc_sums, acc_rates = partials[cube.name]
+            partials[cube.name] = (_merge(acc_sums, sums), _merge(acc_rates, rate_counts))
+
+    conn.close()
+    return partials
+
+def compute_cubes(db_paths, cubes, start_date=None, end_date=None, use_cache=True, verbose=True):
+    """
+    여러 DB 파일에 대해 큐브 계산 (DB별 1회 스캔, 부분합을 합쳐 최종 지표 산출)
+    반환값: {큐브명: DataFrame}
+    """
+    if isinstance(db_paths, str):
+        db_paths = [db_paths]
+
+    cache_path = None
+    if use_cache and CUBE_CACHE_DIR:
+        os.makedirs(CUBE_CACHE_DIR, exist_ok=True)
+        cache_path = os.path.join(CUBE_CACHE_DIR, f'cube_{_cache_key(db_paths, cubes, start_date, end_date)}.pkl')
+        if os.path.exists(cache_path):
+            if verbose:
+                print(f"✓ 캐시 사용: {cache_path}")
+            return pd.read_pickle(cache_path)
+
+    totals = {c.name: (None, None) for c in cubes}
+    for db_path in db_paths:
+        partials = scan_db(db_path, cubes, start_date, end_date)
+        for name, (sums, rates) in partials.items():
+            acc_sums, acc_rates = totals[name]
+            totals[name] = (_merge(acc_sums, sums), _merge(acc_rates, rates))
+        if verbose:
+            print(f"  ✓ {os.path.basename(db_path)}: 스캔 완료")
+
+    results = {c.name: _finalize(c, *totals[c.name]) for c in cubes}
+
+    if cache_path:
+        pd.to_pickle(results, cache_path)
+    return results
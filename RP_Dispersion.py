@@ -0,0 +1,227 @@
+"""
+금융위원회 REPO거래정보 - 일별 금리 분포 통계 (합칠 수 있는 분위수 스케치)
+daily_vwap_agg는 가중평균만 남기므로 금리 분산/꼬리 정보가 사라짐 -> 날짜별 스케치 테이블을 함께 유지
+
+스케치 = (날짜, 통화, 만기, 담보, 종류, 값) 단위의 가중치 합 + 건수
+- rate:    rpInrt를 RATE_DECIMALS 자리로 반올림한 값별 SUM(buyScrtBuyAmt), 건수 (금액 > 0 거래)
+- haircut: rpMrgamRto를 HAIRCUT_DECIMALS 자리로 반올림한 값별 SUM(buyScrtBuyAmt), 건수
+금리는 소수 셋째 자리 단위로 공시되므로 rate 스케치는 근사가 아니라 정확한 분포
+스케치는 더하기만 하면 합쳐지므로 날짜 -> 월/연도, 연도별 DB(분할 저장소) -> 전체 기간을 원본 재스캔 없이 계산
+
+사용법:
+    python RP_Dispersion.py <거래.db> [<거래.db> ...] [--out 결과.csv]
+        각 DB의 스케치를 변경분만 갱신한 뒤 (basDt, 담보) 단위 분포 통계 출력/저장
+"""
+
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import RP_Aggregate as ra
+
+SKETCH_TABLE = 'daily_rate_sketch'
+SKETCH_STATE_TABLE = 'daily_rate_sketch_state'
+
+RATE_DECIMALS = 3
+HAIRCUT_DECIMALS = 2
+RATE_PERCENTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+HAIRCUT_PERCENTILES = (0.25, 0.5, 0.75)
+
+SKETCH_KEYS = ['basDt', 'rpBuyAplCurCdNm', 'rdptTermCcdNm', 'scrsItmsKcdNm']
+
+def init_sketch_tables(conn):
+    """
+    스케치 테이블 / 갱신 상태 테이블 생성
+    """
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {SKETCH_TABLE} (
+            basDt TEXT NOT NULL,
+            rpBuyAplCurCdNm TEXT,
+            rdptTermCcdNm TEXT,
+            scrsItmsKcdNm TEXT,
+            kind TEXT NOT NULL,
+            value REAL NOT NULL,
+            weight REAL,
+            cnt INTEGER,
+            PRIMARY KEY (basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm, kind, value)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {SKETCH_STATE_TABLE} (
+            basDt TEXT PRIMARY KEY,
+            refreshed_at TEXT
+        )
+    ''')
+
+def refresh_sketch_date(conn, base_date):
+    """
+    날짜 하나의 스케치를 다시 계산 (커밋은 호출자가 담당)
+    SQLite 안에서 값별 GROUP BY로 바로 만들어 거래 행을 파이썬으로 가져오지 않음
+    """
+    source = ra.date_source_sql(conn)
+    conn.execute(f'DELETE FROM {SKETCH_TABLE} WHERE basDt = ?', (base_date,))
+    conn.execute(f'''
+        INSERT INTO {SKETCH_TABLE}
+        SELECT basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm,
+               'rate', ROUND(rpInrt, {RATE_DECIMALS}), SUM(buyScrtBuyAmt), COUNT(*)
+        FROM ({source})
+        WHERE buyScrtBuyAmt > 0 AND rpInrt IS NOT NULL
+        GROUP BY rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm, ROUND(rpInrt, {RATE_DECIMALS})
+    ''', (base_date,))
+    conn.execute(f'''
+        INSERT INTO {SKETCH_TABLE}
+        SELECT basDt, rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm,
+               'haircut', ROUND(rpMrgamRto, {HAIRCUT_DECIMALS}), SUM(MAX(buyScrtBuyAmt, 0)), COUNT(*)
+        FROM ({source})
+        WHERE rpMrgamRto IS NOT NULL
+        GROUP BY rpBuyAplCurCdNm, rdptTermCcdNm, scrsItmsKcdNm, ROUND(rpMrgamRto, {HAIRCUT_DECIMALS})
+    ''', (base_date,))
+    conn.execute(
+        f'INSERT OR REPLACE INTO {SKETCH_STATE_TABLE} (basDt, refreshed_at) VALUES (?, ?)',
+        (base_date, datetime.now().isoformat())
+    )
+
+def refresh_dirty_sketches(conn, verbose=True):
+    """
+    변경된 날짜만 스케치 갱신 (기존 DB 최초 실행 시에는 전체 날짜)
+    """
+    init_sketch_tables(conn)
+    dates = ra.find_dirty_dates(conn, SKETCH_STATE_TABLE)
+    for i, base_date in enumerate(dates, 1):
+        refresh_sketch_date(conn, base_date)
+        if i % 100 == 0:
+            conn.commit()
+            if verbose:
+                print(f"  → 스케치 갱신 {i}/{len(dates)}일")
+    conn.commit()
+    if verbose:
+        print(f"✓ 금리 분포 스케치 갱신: {len(dates)}일")
+    return dates
+
+def load_sketches(conn, currency=ra.DEFAULT_CURRENCY, term=ra.DEFAULT_TERM,
+                  start_date='20150101', end_date='20251231'):
+    """
+    스케치 조회 (basDt, scrsItmsKcdNm, kind, value, weight, cnt)
+    """
+    return pd.read_sql_query(f'''
+        SELECT basDt, scrsItmsKcdNm, kind, value, weight, cnt
+        FROM {SKETCH_TABLE}
+        WHERE rpBuyAplCurCdNm = ? AND rdptTermCcdNm = ?
+          AND basDt BETWEEN ? AND ?
+    ''', conn, params=(currency, term, start_date, end_date))
+
+def merge_sketches(sketches, by=('basDt', 'scrsItmsKcdNm')):
+    """
+    스케치 합치기 - 같은 (by, kind, value)의 가중치/건수를 더함
+    by에 'month' / 'year'를 주면 basDt 앞자리로 묶음, by=()면 기간 전체
+    sketches: DataFrame 하나 또는 목록 (여러 DB/분할에서 읽은 것)
+    """
+    df = pd.concat(sketches, ignore_index=True) if isinstance(sketches, (list, tuple)) else sketches.copy()
+    by = list(by)
+    for dim, width in (('month', 6), ('year', 4)):
+        if dim in by:
+            df[dim] = df['basDt'].astype(str).str[:width]
+    return df.groupby(by + ['kind', 'value'], dropna=False)[['weight', 'cnt']].sum().reset_index()
+
+def _with_total(sketch, by):
+    """담보 차원이 있으면 담보를 합친 전체(ra.TOTAL_LABEL) 스케치 추가"""
+    if 'scrsItmsKcdNm' not in by:
+        return sketch
+    rest = [d for d in by if d != 'scrsItmsKcdNm']
+    total = sketch.groupby(rest + ['kind', 'value'], dropna=False)[['weight', 'cnt']].sum().reset_index()
+    total['scrsItmsKcdNm'] = ra.TOTAL_LABEL
+    return pd.concat([sketch, total], ignore_index=True)
+
+def _percentiles(sketch, by, weight_col, percentiles, prefix):
+    """
+    그룹별 가중 분위수 (하한 방식: 누적 가중치 비율이 q 이상이 되는 첫 값, RP_Cube와 동일)
+    """
+    df = sketch[sketch[weight_col] > 0].sort_values(by + ['value'], kind='stable')
+    if df.empty:
+        return pd.DataFrame(columns=by + [f'{prefix}_p{int(round(q * 100))}' for q in percentiles])
+
+    codes = df.groupby(by, dropna=False, sort=False).ngroup().to_numpy()
+    weights = df[weight_col].to_numpy(dtype=float)
+    cum = np.cumsum(weights)
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    group_start_cum = np.repeat(cum[starts] - weights[starts], np.diff(np.r_[starts, len(df)]))
+    group_total = np.repeat(np.add.reduceat(weights, starts), np.diff(np.r_[starts, len(df)]))
+    frac = (cum - group_start_cum) / group_total
+
+    out = df.iloc[starts][by].reset_index(drop=True)
+    values = df['value'].to_numpy()
+    for q in percentiles:
+        # 그룹별로 frac >= q 인 첫 위치: (그룹 코드, 조건 불충족) 정렬 순서로 찾기
+        hit = frac >= q - 1e-12
+        order = np.lexsort((~hit, codes))
+        first_pos = order[np.r_[0, np.flatnonzero(np.diff(codes[order])) + 1]]
+        out[f'{prefix}_p{int(round(q * 100))}'] = values[first_pos]
+    return out
+
+def summarize(sketch, by=('basDt', 'scrsItmsKcdNm'), with_total=True,
+              rate_percentiles=RATE_PERCENTILES, haircut_percentiles=HAIRCUT_PERCENTILES):
+    """
+    스케치 -> 분포 통계
+    반환 컬럼: by..., trade_count, volume, vwap_rate, rate_std (금액가중 표준편차),
+               rate_p1..p99 (금액가중 분위수), haircut_p25..p75 (건수 기준 분위수)
+    """
+    by = list(by)
+    sketch = merge_sketches(sketch, by)
+    if with_total:
+        sketch = _with_total(sketch, by)
+
+    rate = sketch[sketch['kind'] == 'rate'].copy()
+    rate['wv'] = rate['weight'] * rate['value']
+    rate['wv2'] = rate['weight'] * rate['value'] ** 2
+    sums = rate.groupby(by, dropna=False)[['cnt', 'weight', 'wv', 'wv2']].sum()
+
+    result = pd.DataFrame(index=sums.index)
+    result['trade_count'] = sums['cnt'].astype('int64')
+    result['volume'] = sums['weight']
+    result['vwap_rate'] = sums['wv'] / sums['weight']
+    variance = (sums['wv2'] / sums['weight'] - result['vwap_rate'] ** 2).clip(lower=0)
+    result['rate_std'] = np.sqrt(variance)
+    result = result.reset_index()
+
+    result = result.merge(_percentiles(rate, by, 'weight', rate_percentiles, 'rate'), on=by, how='left')
+    haircut = sketch[sketch['kind'] == 'haircut']
+    result = result.merge(_percentiles(haircut, by, 'cnt', haircut_percentiles, 'haircut'), on=by, how='left')
+    return result.sort_values(by, kind='stable').reset_index(drop=True)
+
+def daily_dispersion(db_paths, start_date='20150101', end_date='20251231', by=('basDt', 'scrsItmsKcdNm'),
+                     currency=ra.DEFAULT_CURRENCY, term=ra.DEFAULT_TERM, refresh=True, verbose=True):
+    """
+    여러 DB(연도별 파일, 분할 저장소 등)의 스케치를 읽어 합친 뒤 분포 통계 산출
+    refresh=True면 각 DB의 변경된 날짜 스케치를 먼저 갱신
+    """
+    if isinstance(db_paths, str):
+        db_paths = [db_paths]
+    sketches = []
+    for db_path in db_paths:
+        conn = sqlite3.connect(db_path)
+        init_sketch_tables(conn)
+        if refresh:
+            refresh_dirty_sketches(conn, verbose)
+        sketches.append(load_sketches(conn, currency, term, start_date, end_date))
+        conn.close()
+    return summarize(sketches, by)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    output = None
+    if '--out' in args:
+        i = args.index('--out')
+        output = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    result = daily_dispersion(args)
+    print(result.tail(20).to_string(index=False))
+    if output:
+        result.to_csv(output, encoding='utf-8-sig', index=False)
+        print(f"✓ 저장 완료: {output} ({len(result):,}행)")
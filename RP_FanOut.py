@@ -0,0 +1,419 @@
+"""
+금융위원회 REPO거래정보 - 서비스키 여러 개로 동시 수집 (fan-out)
+- 서비스키마다 조회 스레드 WORKERS_PER_KEY개가 공용 작업 큐(날짜 × 페이지)에서 작업을 꺼내 처리
+  → 빠른 키가 더 많은 날짜를 가져가므로 날짜 범위가 키 처리량에 맞게 자연스럽게 나뉨
+- 키별 초당 요청 수(TokenBucket), 일일 한도, 오류 허용 횟수를 따로 관리
+  한도/인증 오류가 나거나 오류 허용 횟수를 넘은 키는 빠지고, 실패한 작업은 다른 키가 이어받음
+- 모든 결과는 같은 DB(공용 TradeWriter 하나)에 적재
+- 수집 대상 오퍼레이션은 Operation을 상속해 OPERATIONS에 등록 (기본: getCaseForTrad)
+
+사용 예:
+    import RP_FanOut as fo
+    fo.collect_fan_out('20150101', '20151231', keys=['키1', '키2', '키3'])
+"""
+
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import RP_Calendar
+import RP_Collector as rc
+
+# GetRepoTradInfoService 공통 주소 (오퍼레이션 이름을 뒤에 붙임)
+SERVICE_BASE_URL = rc.BASE_URL.rsplit('/', 1)[0]
+
+# 서비스키 풀 설정
+SERVICE_KEYS = [rc.SERVICE_KEY]
+KEY_RATE_PER_SEC = 2.0       # 키별 초당 요청 수
+KEY_DAILY_QUOTA = 10000      # 키별 일일 요청 한도 (공공데이터포털 개발계정 기본값)
+KEY_ERROR_BUDGET = 20        # 키별 허용 오류 횟수 (넘으면 해당 키 제외)
+WORKERS_PER_KEY = 4          # 키별 조회 스레드 수
+MAX_TASK_ATTEMPTS = 5        # 페이지 하나의 최대 시도 횟수 (키가 바뀌어도 누적)
+RATE_LIMITED_WAIT_SEC = 1.0  # 초당 요청 수 초과(23) 응답 시 대기 시간
+
+# 공공데이터포털 결과 코드
+RESULT_OK = '00'
+RESULT_QUOTA_EXCEEDED = '22'
+RESULT_RATE_EXCEEDED = '23'
+RESULT_KEY_ERRORS = ('30', '31', '32')   # 미등록 키 / 기간 만료 / 미등록 IP
+
+# =============================================================================
+# 오퍼레이션
+# =============================================================================
+class Operation:
+    """
+    GetRepoTradInfoService 오퍼레이션 하나의 조회 조건 / 적재 방법
+    """
+    name = None
+    page_size = rc.PAGE_SIZE
+
+    def params(self, base_date, page_no):
+        return {'numOfRows': str(self.page_size), 'pageNo': str(page_no), 'resultType': 'json', 'basDt': base_date}
+
+    def init_store(self, writer):
+        """적재 테이블 생성"""
+
+    def done_dates(self, writer):
+        """이미 수집이 끝난 날짜 집합"""
+        return set()
+
+    def save_page(self, writer, base_date, page_no, items):
+        """페이지 하나 적재, 저장 건수 반환"""
+        raise NotImplementedError
+
+    def finish_date(self, writer, base_date, total_count, saved_count, status):
+        """날짜 하나의 수집 결과 기록"""
+
+class CaseForTradOperation(Operation):
+    """
+    건별거래조회 (getCaseForTrad) → repo_trades / collection_status (RP_Collector와 같은 저장 방식)
+    """
+    name = 'getCaseForTrad'
+
+    def done_dates(self, writer):
+        return writer.load_done_dates()
+
+    def save_page(self, writer, base_date, page_no, items):
+        return writer.write_trades(items, base_date, page_no, self.page_size)
+
+    def finish_date(self, writer, base_date, total_count, saved_count, status):
+        writer.set_status(base_date, total_count, saved_count, status)
+
+class RawJsonOperation(Operation):
+    """
+    응답 항목을 JSON 원문 그대로 저장하는 범용 오퍼레이션 (컬럼 정의 없이 새 오퍼레이션 추가용)
+    <table>(basDt, pageNo, seq, item) / <table>_status(basDt, total_count, collected_count, collected_at, status)
+    """
+    def __init__(self, name, table):
+        self.name = name
+        self.table = table
+
+    def init_store(self, writer):
+        with writer.lock:
+            writer.conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    basDt TEXT, pageNo INTEGER, seq INTEGER, item TEXT,
+                    PRIMARY KEY (basDt, pageNo, seq)
+                )
+            ''')
+            writer.conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.table}_status (
+                    basDt TEXT PRIMARY KEY, total_count INTEGER, collected_count INTEGER,
+                    collected_at TEXT, status TEXT
+                )
+            ''')
+
+    def done_dates(self, writer):
+        with writer.lock:
+            rows = writer.conn.execute(
+                f"SELECT basDt FROM {self.table}_status WHERE status IN ('completed', 'no_data')"
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def save_page(self, writer, base_date, page_no, items):
+        with writer.lock:
+            writer.conn.executemany(
+                f'INSERT OR REPLACE INTO {self.table} (basDt, pageNo, seq, item) VALUES (?, ?, ?, ?)',
+                [(base_date, page_no, i, json.dumps(item, ensure_ascii=False)) for i, item in enumerate(items)]
+            )
+        return len(items)
+
+    def finish_date(self, writer, base_date, total_count, saved_count, status):
+        with writer.lock:
+            writer.conn.execute(
+                f'INSERT OR REPLACE INTO {self.table}_status VALUES (?, ?, ?, ?, ?)',
+                (base_date, total_count, saved_count, datetime.now().isoformat(), status)
+            )
+
+# 사용 가능한 오퍼레이션 (새 오퍼레이션은 register_operation으로 추가)
+OPERATIONS = {'getCaseForTrad': CaseForTradOperation()}
+
+def register_operation(operation):
+    OPERATIONS[operation.name] = operation
+    return operation
+
+# =============================================================================
+# 서비스키
+# =============================================================================
+class ServiceKey:
+    """
+    서비스키 하나의 요청 속도 / 일일 한도 / 오류 허용 횟수 관리 (스레드 안전)
+    """
+    def __init__(self, key, rate_per_sec=KEY_RATE_PER_SEC, daily_quota=KEY_DAILY_QUOTA,
+                 error_budget=KEY_ERROR_BUDGET):
+        self.key = key
+        self.limiter = rc.TokenBucket(rate_per_sec, max(1, int(rate_per_sec * 2)))
+        self.daily_quota = daily_quota
+        self.error_budget = error_budget
+        self.used = 0
+        self.errors = 0
+        self.rows = 0
+        self.disabled_reason = None
+        self.lock = threading.Lock()
+
+    @property
+    def label(self):
+        return f'{self.key[:6]}…'
+
+    @property
+    def active(self):
+        return self.disabled_reason is None
+
+    def acquire(self):
+        """요청 1건 사용 (한도를 다 썼거나 제외된 키면 False)"""
+        with self.lock:
+            if not self.active:
+                return False
+            if self.daily_quota is not None and self.used >= self.daily_quota:
+                self.disabled_reason = '일일 한도 소진'
+                return False
+            self.used += 1
+        self.limiter.acquire()
+        return True
+
+    def record_error(self):
+        with self.lock:
+            self.errors += 1
+            if self.errors > self.error_budget and self.active:
+                self.disabled_reason = f'오류 {self.errors}회'
+
+    def disable(self, reason):
+        with self.lock:
+            if self.active:
+                self.disabled_reason = reason
+
+# =============================================================================
+# 수집기
+# =============================================================================
+class FanOutCollector:
+    """
+    서비스키 풀로 날짜 × 페이지 작업을 동시에 처리하는 수집기
+    """
+    def __init__(self, keys, operation='getCaseForTrad', workers_per_key=WORKERS_PER_KEY,
+                 base_url=SERVICE_BASE_URL):
+        self.keys = [k if isinstance(k, ServiceKey) else ServiceKey(k) for k in keys]
+        self.operation = OPERATIONS[operation] if isinstance(operation, str) else operation
+        self.workers_per_key = workers_per_key
+        self.url = f'{base_url}/{self.operation.name}'
+
+        self.tasks = queue.Queue()
+        self.outstanding = 0
+        self.dates = {}
+        self.lock = threading.Lock()
+        self.success_dates = []
+        self.failed_dates = []
+
+        pool_size = len(self.keys) * workers_per_key
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    # -------------------------------------------------------------------------
+    # 작업 관리
+    # -------------------------------------------------------------------------
+    def _add_task(self, base_date, page_no, attempts=0):
+        with self.lock:
+            self.outstanding += 1
+        self.tasks.put((base_date, page_no, attempts))
+
+    def _task_done(self):
+        with self.lock:
+            self.outstanding -= 1
+
+    def _page_finished(self, writer, base_date, page_no, saved=0, failed=False):
+        """페이지 하나 처리 완료 → 날짜의 마지막 페이지면 수집 상태 기록 (같은 페이지는 한 번만 셈)"""
+        with self.lock:
+            state = self.dates[base_date]
+            if page_no in state['done']:
+                return
+            state['done'].add(page_no)
+            state['saved'] += saved
+            state['failed'] += int(failed)
+            state['left'] -= 1
+            if state['left'] > 0:
+                return
+            total, collected, n_failed = state['total'], state['saved'], state['failed']
+
+        status = 'partial' if n_failed else 'completed'
+        self.operation.finish_date(writer, base_date, total, collected, status)
+        (self.failed_dates if n_failed else self.success_dates).append(base_date)
+        print(f"  {'✗' if n_failed else '✓'} {base_date}: {collected}/{total}건"
+              f"{f' (실패 {n_failed}페이지)' if n_failed else ''}")
+
+    # -------------------------------------------------------------------------
+    # 조회
+    # -------------------------------------------------------------------------
+    def _fetch(self, key, base_date, page_no):
+        """
+        페이지 하나 조회
+        반환값: ('ok', data) / ('retry', None) / ('key_dead', None) / ('error', None)
+        """
+        params = {'serviceKey': key.key, **self.operation.params(base_date, page_no)}
+        try:
+            response = self.session.get(self.url, params=params, timeout=60)
+            data = response.json()
+            code = data.get('response', {}).get('header', {}).get('resultCode')
+        except Exception:
+            return 'error', None
+
+        if code == RESULT_OK:
+            return 'ok', data
+        if code == RESULT_RATE_EXCEEDED:
+            time.sleep(RATE_LIMITED_WAIT_SEC)
+            return 'retry', None
+        if code == RESULT_QUOTA_EXCEEDED:
+            key.disable('일일 한도 초과 응답')
+            return 'key_dead', None
+        if code in RESULT_KEY_ERRORS:
+            key.disable(f'키 오류 ({code})')
+            return 'key_dead', None
+        return 'error', None
+
+    def _worker(self, key, writer):
+        while True:
+            try:
+                base_date, page_no, attempts = self.tasks.get(timeout=0.2)
+            except queue.Empty:
+                with self.lock:
+                    if self.outstanding == 0:
+                        return
+                if not key.active:
+                    return
+                continue
+
+            if not key.acquire():
+                # 이 키는 더 쓸 수 없음 → 작업을 돌려놓고 종료 (다른 키가 처리)
+                self.tasks.put((base_date, page_no, attempts))
+                return
+
+            try:
+                outcome, data = self._fetch(key, base_date, page_no)
+                if outcome == 'ok':
+                    self._handle_page(writer, key, base_date, page_no, data)
+                elif outcome == 'error':
+                    key.record_error()
+                    if attempts + 1 < MAX_TASK_ATTEMPTS:
+                        self._add_task(base_date, page_no, attempts + 1)
+                    else:
+                        self._page_failed(writer, base_date, page_no)
+                else:
+                    # 속도 제한/키 제외: 시도 횟수를 늘리지 않고 다시 큐에 넣음
+                    self._add_task(base_date, page_no, attempts)
+            except Exception as e:
+                # 적재 오류 / 잘못된 응답 본문: 페이지 실패로 기록 (날짜는 'partial')
+                print(f"❌ {base_date} {page_no}페이지 처리 오류: {e}")
+                try:
+                    self._page_failed(writer, base_date, page_no)
+                except Exception as e2:
+                    print(f"❌ {base_date}: 수집 상태 기록 실패 ({e2})")
+                    self._mark_failed(base_date)
+            finally:
+                self._task_done()
+
+    def _mark_failed(self, base_date):
+        with self.lock:
+            if base_date not in self.failed_dates:
+                self.failed_dates.append(base_date)
+
+    def _page_failed(self, writer, base_date, page_no):
+        with self.lock:
+            started = base_date in self.dates
+        if not started:
+            # 1페이지(전체 건수)를 못 받은 날짜
+            print(f"{base_date}: 조회 실패")
+            self._mark_failed(base_date)
+        else:
+            self._page_finished(writer, base_date, page_no, failed=True)
+
+    def _handle_page(self, writer, key, base_date, page_no, data):
+        items = rc._extract_items(data)
+        if page_no == 1:
+            total_count = int(data['response'].get('body', {}).get('totalCount', 0) or 0)
+            if total_count == 0:
+                self.operation.finish_date(writer, base_date, 0, 0, 'no_data')
+                self.success_dates.append(base_date)
+                return
+            pages = (total_count + self.operation.page_size - 1) // self.operation.page_size
+            with self.lock:
+                self.dates[base_date] = {'total': total_count, 'left': pages, 'saved': 0, 'failed': 0, 'done': set()}
+            for page in range(2, pages + 1):
+                self._add_task(base_date, page)
+
+        saved = self.operation.save_page(writer, base_date, page_no, items)
+        with key.lock:
+            key.rows += saved
+        self._page_finished(writer, base_date, page_no, saved)
+
+    # -------------------------------------------------------------------------
+    # 실행
+    # -------------------------------------------------------------------------
+    def run(self, dates):
+        """
+        날짜 목록 수집 (이미 수집된 날짜는 제외, 최신 날짜부터)
+        반환값: 키별 사용량 요약 목록
+        """
+        # 새 DB면 repo_trades / collection_status 생성 (기록기 연결보다 먼저)
+        rc.init_database()
+        writer = rc.get_writer()
+        self.operation.init_store(writer)
+        done = self.operation.done_dates(writer)
+        targets = sorted((d for d in dates if d not in done), reverse=True)
+        for base_date in targets:
+            self._add_task(base_date, 1)
+
+        print(f"수집 대상 {len(targets)}일 (이미 수집 {len(dates) - len(targets)}일 제외), "
+              f"서비스키 {len(self.keys)}개 × 스레드 {self.workers_per_key}개")
+
+        threads = [
+            threading.Thread(target=self._worker, args=(key, writer), name=f'rp-fanout-{i}-{j}', daemon=True)
+            for i, key in enumerate(self.keys) for j in range(self.workers_per_key)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.commit()
+
+        if self.outstanding > 0:
+            print(f"⚠️ 사용 가능한 서비스키가 없어 작업 {self.outstanding}개가 남았습니다 (다음 실행 때 이어서 수집)")
+            # 일부 페이지만 받은 날짜는 'partial'로 기록 (RP_Collector.verify_and_repair로 누락 페이지만 복구 가능)
+            for base_date, state in self.dates.items():
+                if state['left'] > 0:
+                    self.operation.finish_date(writer, base_date, state['total'], state['saved'], 'partial')
+            writer.commit()
+
+        return [
+            {'key': k.label, 'requests': k.used, 'rows': k.rows, 'errors': k.errors,
+             'disabled': k.disabled_reason}
+            for k in self.keys
+        ]
+
+def collect_fan_out(start_date, end_date, keys=None, operation='getCaseForTrad',
+                    workers_per_key=WORKERS_PER_KEY, base_url=SERVICE_BASE_URL):
+    """
+    서비스키 여러 개로 날짜 범위 수집 (RP_Collector.DB_FILE에 적재)
+    """
+    collector = FanOutCollector(keys or SERVICE_KEYS, operation, workers_per_key, base_url)
+    dates = RP_Calendar.trading_days(start_date, end_date)
+
+    print(f"\n{'='*80}")
+    print(f"데이터 수집 기간: {start_date} ~ {end_date} ({collector.operation.name}, 서비스키 분산)")
+    print(f"{'='*80}")
+
+    started = time.perf_counter()
+    summary = collector.run(dates)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'='*80}")
+    print(f"수집 완료 - {len(collector.success_dates)}일 수집, 실패/일부: {len(collector.failed_dates)}일, {elapsed:.1f}초")
+    for s in summary:
+        disabled = f" (제외: {s['disabled']})" if s['disabled'] else ''
+        print(f"  키 {s['key']}: 요청 {s['requests']:,}건, 적재 {s['rows']:,}건, 오류 {s['errors']}회{disabled}")
+    print(f"{'='*80}\n")
+    return summary
@@ -0,0 +1,303 @@
+"""
+금융위원회 REPO거래정보 - 기초통계량 분석 그림 생성 (입력 해시 캐시 + 병렬 렌더링)
+기초통계량 분석 노트북의 그림을 필요한 것만 다시 그림
+
+- fig_seasonality_{담보}.png       : 연도별 오버레이 스프레드 계절성 (연도 x dayofyear 행렬을 한 번에 피벗)
+- fig_annual_volume.png            : 연도별 전체 RP 거래대금 (대한민국 원)
+- fig_collateral_volume_stacked.png: 익일물 담보별 거래대금 (Stacked)
+- fig_collateral_share_stacked.png : 익일물 담보별 거래 비중 (Stacked 100%)
+
+그림마다 입력 데이터(배열 + 라벨 + FIGURE_VERSION)의 해시를 manifest에 기록해 두고
+해시가 같고 PNG가 남아 있으면 건너뜀 -> 바뀐 그림만 프로세스 풀에서 병렬로 렌더링
+(그림 모양을 바꾸면 FIGURE_VERSION을 올려 전체를 다시 그리게 함)
+
+사용법:
+    python RP_Figures.py [출력폴더] [--force] [--only 이름 ...]
+        이름: seasonality, annual_volume, collateral_volume_stacked, collateral_share_stacked
+              또는 seasonality_전체 처럼 개별 그림
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import RP_Aggregate as ra
+import RP_Cube
+import RP_Panel
+
+BASE_PATH = r'C:\Users\jay15\Desktop\DB_DATA\DataBase'
+
+# 원본 거래 DB (거래대금 집계용, 노트북과 동일)
+TRADE_DBS = [
+    os.path.join(BASE_PATH, 'r_2015-2019.db'),
+    os.path.join(BASE_PATH, 'r_2020-2024.db'),
+    os.path.join(BASE_PATH, 'r_2025.db'),
+]
+
+OUTPUT_DIR = './output'
+FIGURE_CACHE_DIR = os.path.join('cache', 'figures')
+FIGURE_VERSION = 2       # 그림 모양(스타일/라벨) 변경 시 올림 -> 전체 재생성
+DPI = 150
+MIN_SEASONALITY_OBS = 100   # 계절성 그림을 그릴 최소 관측일 수
+WORKERS = None              # 프로세스 수 (None이면 CPU 수)
+
+# -----------------------------------------------------------------------------
+# 그림 입력 데이터
+# -----------------------------------------------------------------------------
+def seasonality_matrix(series):
+    """
+    일별 시계열 -> (연도 목록, 연도 x 366 값 행렬, 연도 x 366 거래일 행렬)
+    - 값 행렬: 인덱스에 있는 날짜의 값 (값이 없는 거래일은 NaN 그대로 -> 그림에서 선이 끊김)
+    - 거래일 행렬: 시계열 인덱스에 있는 날짜면 True (주말/휴일 등 인덱스에 없는 날만 건너뜀)
+    연도별 필터 반복 대신 (연도 위치, dayofyear) 인덱스로 한 번에 채움
+    """
+    years, year_pos = np.unique(series.index.year, return_inverse=True)
+    matrix = np.full((len(years), 366), np.nan)
+    observed = np.zeros((len(years), 366), dtype=bool)
+    matrix[year_pos, series.index.dayofyear - 1] = series.to_numpy(dtype=np.float64)
+    observed[year_pos, series.index.dayofyear - 1] = True
+    return years, matrix, observed
+
+def volume_tables(trade_dbs=TRADE_DBS, verbose=True):
+    """
+    연도별 전체 거래대금 / 연도 x 담보 익일물 거래대금 (조원)
+    RP_Cube로 DB별 1회 스캔해 두 집계를 함께 계산
+    """
+    cubes = [
+        RP_Cube.Cube('annual_volume', ['year'], ['volume'], where={'rpBuyAplCurCdNm': ra.DEFAULT_CURRENCY}),
+        RP_Cube.Cube('annual_collateral_volume', ['year', 'scrsItmsKcdNm'], ['volume'],
+                     where={'rpBuyAplCurCdNm': ra.DEFAULT_CURRENCY, 'rdptTermCcdNm': ra.DEFAULT_TERM}),
+    ]
+    result = RP_Cube.compute_cubes(trade_dbs, cubes, verbose=verbose)
+
+    annual = result['annual_volume'].set_index('year')['volume'].sort_index() / 1e12
+    pivot = result['annual_collateral_volume'].pivot_table(
+        index='year', columns='scrsItmsKcdNm', values='volume', aggfunc='sum', fill_value=0
+    ) / 1e12
+    pivot = pivot[pivot.sum().sort_values(ascending=False).index]   # 거래대금 큰 순서
+    return annual, pivot
+
+# -----------------------------------------------------------------------------
+# 그림 작업 정의 (이름, 종류, 입력, 파일명)
+# -----------------------------------------------------------------------------
+def seasonality_jobs(spread, min_obs=MIN_SEASONALITY_OBS):
+    jobs = []
+    for col in spread.columns:
+        if spread[col].notna().sum() > min_obs:
+            years, matrix, observed = seasonality_matrix(spread[col])
+            jobs.append((f'seasonality_{col}', 'seasonality',
+                         {'label': col, 'years': years, 'matrix': matrix, 'observed': observed},
+                         f'fig_seasonality_{col}.png'))
+    return jobs
+
+def volume_jobs(annual, pivot):
+    share = pivot.div(pivot.sum(axis=1), axis=0) * 100
+    return [
+        ('annual_volume', 'annual_volume', {'series': annual}, 'fig_annual_volume.png'),
+        ('collateral_volume_stacked', 'stacked', {'table': pivot, 'share': False},
+         'fig_collateral_volume_stacked.png'),
+        ('collateral_share_stacked', 'stacked', {'table': share, 'share': True},
+         'fig_collateral_share_stacked.png'),
+    ]
+
+def _payload_hash(kind, payload):
+    """그림 입력 해시 (배열/표 내용 + 라벨 + 그림 버전)"""
+    h = hashlib.sha1(f'{kind}|{FIGURE_VERSION}|{DPI}'.encode('utf-8'))
+    for key in sorted(payload):
+        value = payload[key]
+        h.update(key.encode('utf-8'))
+        if isinstance(value, (pd.Series, pd.DataFrame)):
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            if isinstance(value, pd.DataFrame):
+                h.update(json.dumps([str(c) for c in value.columns], ensure_ascii=False).encode('utf-8'))
+        elif isinstance(value, np.ndarray):
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            h.update(repr(value).encode('utf-8'))
+    return h.hexdigest()
+
+# -----------------------------------------------------------------------------
+# 렌더링 (작업자 프로세스에서 실행)
+# -----------------------------------------------------------------------------
+def _setup_matplotlib():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams['font.family'] = 'Malgun Gothic'
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+def _plot_seasonality(plt, payload, ax):
+    years, matrix, label = payload['years'], payload['matrix'], payload['label']
+    days = np.arange(1, 367)
+    colors = plt.cm.viridis(np.linspace(0, 1, len(years)))
+    for year, row, mask, color in zip(years, matrix, payload['observed'], colors):
+        # 인덱스에 없는 날(주말/휴일)만 건너뛰고, 값이 없는 거래일은 NaN으로 남겨 선을 끊음 (노트북과 동일)
+        ax.plot(days[mask], row[mask], label=str(year), color=color, alpha=0.7, linewidth=1)
+
+    ax.axhline(y=0, color='gray', linestyle='--', linewidth=0.8)
+    ax.set_xlabel('Day of Year', fontsize=12)
+    ax.set_ylabel('스프레드 (bp)', fontsize=12)
+    ax.set_title(f'{label} 스프레드 계절성 분석 (연도별 오버레이)', fontsize=14, fontweight='bold')
+    for q_day in (90, 181, 273, 365):
+        ax.axvline(x=q_day, color='red', linestyle=':', alpha=0.3)
+    ax.legend(loc='upper right', ncol=3, fontsize=9)
+    ax.set_xlim(1, 366)
+
+def _plot_annual_volume(plt, payload, ax):
+    series = payload['series']
+    amounts = series.to_numpy()
+    bars = ax.bar(series.index.astype(str), amounts, color='steelblue', alpha=0.8, edgecolor='black')
+    for bar, val in zip(bars, amounts):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + amounts.max() * 0.01,
+                f'{val:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    ax.set_xlabel('연도', fontsize=12)
+    ax.set_ylabel('거래대금 (조원)', fontsize=12)
+    ax.set_title('연도별 전체 RP 거래대금 (대한민국 원 한정)', fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+
+def _plot_stacked(plt, payload, ax):
+    table, share = payload['table'], payload['share']
+    table.plot(kind='bar', stacked=True, ax=ax, colormap='tab20', edgecolor='white', linewidth=0.5)
+    ax.set_xlabel('연도', fontsize=12)
+    if share:
+        ax.set_ylabel('비중 (%)', fontsize=12)
+        ax.set_title('익일물 담보별 거래 비중 추이 (Stacked 100%)', fontsize=14, fontweight='bold')
+        ax.set_ylim(0, 100)
+    else:
+        ax.set_ylabel('거래대금 (조원)', fontsize=12)
+        ax.set_title('익일물 담보별 거래대금 추이 (Stacked Bar)', fontsize=14, fontweight='bold')
+    ax.legend(title='담보유형', bbox_to_anchor=(1.02, 1), loc='upper left', fontsize=9)
+    ax.grid(axis='y', alpha=0.3)
+    plt.setp(ax.get_xticklabels(), rotation=45)
+
+PLOTTERS = {
+    'seasonality': (_plot_seasonality, (14, 7)),
+    'annual_volume': (_plot_annual_volume, (12, 6)),
+    'stacked': (_plot_stacked, (14, 7)),
+}
+
+def _render(task):
+    """작업 1개 렌더링 -> 임시 파일에 저장 후 교체"""
+    kind, payload, path = task
+    plt = _setup_matplotlib()
+    plotter, figsize = PLOTTERS[kind]
+    fig, ax = plt.subplots(figsize=figsize)
+    plotter(plt, payload, ax)
+    fig.tight_layout()
+    tmp = path + '.tmp.png'
+    fig.savefig(tmp, dpi=DPI, bbox_inches='tight')
+    plt.close(fig)
+    os.replace(tmp, path)
+    return path
+
+# -----------------------------------------------------------------------------
+# 빌드
+# -----------------------------------------------------------------------------
+def _manifest_path(output_dir):
+    key = hashlib.sha1(os.path.abspath(output_dir).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(FIGURE_CACHE_DIR, f'figures_{key}.json')
+
+def _load_manifest(output_dir):
+    path = _manifest_path(output_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _save_manifest(output_dir, manifest):
+    os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+    with open(_manifest_path(output_dir), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+def _selected(name, only):
+    """only: 그룹 이름(seasonality 등) 또는 개별 그림 이름 목록"""
+    return not only or name in only or any(name.startswith(f'{o}_') for o in only)
+
+def build_figures(jobs, output_dir=OUTPUT_DIR, force=False, only=None, workers=WORKERS, verbose=True):
+    """
+    입력 해시가 바뀌었거나 파일이 없는 그림만 렌더링
+    jobs: [(이름, 종류, 입력, 파일명)] (seasonality_jobs / volume_jobs 결과)
+    반환값: {이름: 파일 경로} (건너뛴 그림 포함)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+
+    paths, stale = {}, []
+    for name, kind, payload, filename in jobs:
+        if not _selected(name, only):
+            continue
+        path = os.path.join(output_dir, filename)
+        digest = _payload_hash(kind, payload)
+        paths[name] = path
+        if not force and os.path.exists(path) and manifest.get(name, {}).get('hash') == digest:
+            continue
+        stale.append((name, digest, (kind, payload, path)))
+
+    if verbose:
+        print(f"📊 그림 {len(paths)}개 중 변경 {len(stale)}개 렌더링, {len(paths) - len(stale)}개 건너뜀")
+    if not stale:
+        return paths
+
+    t0 = time.time()
+    tasks = [task for _, _, task in stale]
+    if workers == 1 or len(tasks) == 1:
+        list(map(_render, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_render, tasks))
+
+    for name, digest, (_, _, path) in stale:
+        manifest[name] = {'hash': digest, 'file': os.path.basename(path),
+                          'rendered_at': pd.Timestamp.now().isoformat()}
+        if verbose:
+            print(f"  ✓ {name}: {path}")
+    _save_manifest(output_dir, manifest)
+    if verbose:
+        print(f"✓ 렌더링 완료: {time.time() - t0:.1f}초")
+    return paths
+
+def build_all(panel=None, trade_dbs=TRADE_DBS, output_dir=OUTPUT_DIR, force=False, only=None,
+              workers=WORKERS, verbose=True):
+    """
+    노트북 그림 전체 (필요한 입력만 계산: only에 거래대금 그림이 없으면 거래 DB를 읽지 않음)
+    """
+    jobs = []
+    if _selected('seasonality', only) or any(o.startswith('seasonality_') for o in only or []):
+        panel = panel if panel is not None else RP_Panel.load_panel(verbose=verbose)
+        jobs += seasonality_jobs(RP_Panel.spread_frame(panel))
+
+    volume_names = ['annual_volume', 'collateral_volume_stacked', 'collateral_share_stacked']
+    if any(_selected(n, only) for n in volume_names):
+        missing = [p for p in trade_dbs if not os.path.exists(p)]
+        if missing:
+            print(f"⚠️ 거래 DB 없음 - 거래대금 그림 건너뜀: {missing}")
+        else:
+            jobs += volume_jobs(*volume_tables(trade_dbs, verbose))
+
+    return build_figures(jobs, output_dir, force, only, workers, verbose)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    force = '--force' in args
+    args = [a for a in args if a != '--force']
+    only = None
+    if '--only' in args:
+        i = args.index('--only')
+        only = args[i + 1:]
+        args = args[:i]
+        if not only:
+            print(__doc__)
+            sys.exit(1)
+    if len(args) > 1:
+        print(__doc__)
+        sys.exit(1)
+
+    build_all(output_dir=args[0] if args else OUTPUT_DIR, force=force, only=only)
@@ -0,0 +1,241 @@
+"""
+금융위원회 REPO거래정보 - 업권 간 자금흐름 행렬 (매도 업권 x 매수 업권, 일별)
+slngShtrFinBzcDcdNm(매도=자금 차입) x buynShtrFinBzcDcdNm(매수=자금 공급) 단위의
+거래대금 / 가중평균 금리 / 건수를 날짜별 정방행렬로 만들어 메모리 매핑(.npy) 파일로 저장
+
+저장 형식 (FLOW_DIR):
+    meta.json   : 업권 목록(행/열 순서), 필터 조건, 생성 시각
+    dates.npy   : (D,) int32 YYYYMMDD 오름차순
+    volume.npy  : (D, S, S) float64  SUM(rpBuyAmt)
+    vwap.npy    : (D, S, S) float64  SUM(rpInrt*buyScrtBuyAmt)/SUM(buyScrtBuyAmt), 거래 없으면 NaN
+    count.npy   : (D, S, S) int32    거래 건수
+    vw_amt.npy / vw_rate_amt.npy : 가중평균 금리 부분합 (기간 합산/증분 갱신용)
+여러 해를 읽을 때 GROUP BY 없이 np.load(mmap_mode='r') 배열을 날짜로 잘라 쓰기만 하면 됨 (복사 없음)
+
+사용법:
+    python RP_Flows.py build <거래.db> [<거래.db> ...]
+        전체 기간 흐름 행렬 생성 (연도별 DB 여러 개 가능)
+    python RP_Flows.py update <거래.db> [<거래.db> ...]
+        저장된 마지막 날짜 이후만 추가
+    python RP_Flows.py show <YYYYMMDD>
+        해당 날짜 거래대금 행렬 출력
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import RP_Aggregate as ra
+
+FLOW_DIR = r'C:\Users\jay15\Desktop\DB_DATA\DataBase\flows'
+ARRAYS = {
+    'volume': np.float64,
+    'vwap': np.float64,
+    'count': np.int32,
+    'vw_amt': np.float64,
+    'vw_rate_amt': np.float64,
+}
+
+FLOW_QUERY = '''
+    SELECT basDt,
+           IFNULL(slngShtrFinBzcDcdNm, '') AS seller,
+           IFNULL(buynShtrFinBzcDcdNm, '') AS buyer,
+           SUM(CAST(rpBuyAmt AS REAL)) AS volume,
+           SUM(CASE WHEN CAST(buyScrtBuyAmt AS REAL) > 0 THEN CAST(buyScrtBuyAmt AS REAL) END) AS vw_amt,
+           SUM(CASE WHEN CAST(buyScrtBuyAmt AS REAL) > 0
+                    THEN CAST(rpInrt AS REAL) * CAST(buyScrtBuyAmt AS REAL) END) AS vw_rate_amt,
+           COUNT(*) AS count
+    FROM repo_trades
+    WHERE rpBuyAplCurCdNm = ? AND basDt BETWEEN ? AND ?
+    GROUP BY basDt, seller, buyer
+'''
+
+def aggregate_flows(db_paths, start_date='20150101', end_date='20251231', currency=ra.DEFAULT_CURRENCY):
+    """
+    원본 DB(들)에서 (날짜, 매도 업권, 매수 업권) 부분합 1회 집계
+    여러 DB는 부분합끼리 더해서 합침
+    """
+    if isinstance(db_paths, str):
+        db_paths = [db_paths]
+    frames = []
+    for db_path in db_paths:
+        conn = sqlite3.connect(db_path)
+        df = pd.read_sql_query(FLOW_QUERY, conn, params=(currency, start_date, end_date))
+        conn.close()
+        # 정규화 DB의 호환 뷰는 basDt가 정수 -> 와이드 DB와 같은 키로 맞춤
+        df['basDt'] = df['basDt'].astype(str)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    return df.groupby(['basDt', 'seller', 'buyer'], as_index=False)[['volume', 'vw_amt', 'vw_rate_amt', 'count']].sum(min_count=1)
+
+def _to_arrays(df, sectors):
+    """부분합 long 형식 → (dates, {이름: (D, S, S) 배열})"""
+    dates = np.array(sorted(df['basDt'].astype(int).unique()), dtype=np.int32)
+    pos = {s: i for i, s in enumerate(sectors)}
+    d_idx = np.searchsorted(dates, df['basDt'].astype(int).to_numpy())
+    s_idx = df['seller'].map(pos).to_numpy()
+    b_idx = df['buyer'].map(pos).to_numpy()
+
+    shape = (len(dates), len(sectors), len(sectors))
+    arrays = {}
+    for name in ['volume', 'vw_amt', 'vw_rate_amt', 'count']:
+        arr = np.zeros(shape, dtype=ARRAYS[name])
+        arr[d_idx, s_idx, b_idx] = df[name].fillna(0).to_numpy()
+        arrays[name] = arr
+    return dates, arrays
+
+def _write(flow_dir, dates, sectors, arrays, meta):
+    """
+    배열을 .npy로 저장 (임시 파일에 쓴 뒤 교체 - 읽는 중인 메모리 매핑은 기존 파일 유지)
+    """
+    os.makedirs(flow_dir, exist_ok=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = arrays['vw_rate_amt'] / np.where(arrays['vw_amt'] > 0, arrays['vw_amt'], np.nan)
+    outputs = dict(arrays, vwap=vwap, dates=dates)
+    for name, arr in outputs.items():
+        tmp = os.path.join(flow_dir, f'{name}.tmp.npy')
+        np.save(tmp, arr)
+        os.replace(tmp, os.path.join(flow_dir, f'{name}.npy'))
+
+    meta = dict(meta, sectors=sectors, n_dates=int(len(dates)),
+                first_date=str(dates[0]) if len(dates) else None,
+                last_date=str(dates[-1]) if len(dates) else None,
+                updated_at=datetime.now().isoformat())
+    with open(os.path.join(flow_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+def build_flows(db_paths, flow_dir=FLOW_DIR, start_date='20150101', end_date='20251231',
+                currency=ra.DEFAULT_CURRENCY, verbose=True):
+    """
+    흐름 행렬 전체 생성
+    """
+    df = aggregate_flows(db_paths, start_date, end_date, currency)
+    sectors = sorted(set(df['seller']) | set(df['buyer']))
+    dates, arrays = _to_arrays(df, sectors)
+    _write(flow_dir, dates, sectors, arrays, {'currency': currency})
+    if verbose:
+        print(f"✓ 흐름 행렬 저장: {flow_dir} ({len(dates)}일 x {len(sectors)}x{len(sectors)} 업권)")
+    return FlowMatrices(flow_dir)
+
+def update_flows(db_paths, flow_dir=FLOW_DIR, end_date='99991231', verbose=True):
+    """
+    저장된 마지막 날짜 이후의 날짜만 집계해 추가
+    새 업권이 나타나면 기존 행렬을 새 업권 순서로 옮겨 담음
+    """
+    if not os.path.exists(os.path.join(flow_dir, 'meta.json')):
+        return build_flows(db_paths, flow_dir, verbose=verbose)
+
+    old = FlowMatrices(flow_dir)
+    start_date = str(int(old.dates[-1]) + 1) if len(old.dates) else '00000000'
+    df = aggregate_flows(db_paths, start_date, end_date, old.meta['currency'])
+    if df.empty:
+        if verbose:
+            print("✓ 추가할 날짜 없음")
+        return old
+
+    sectors = sorted(set(old.sectors) | set(df['seller']) | set(df['buyer']))
+    new_dates, new_arrays = _to_arrays(df, sectors)
+
+    # 기존 행렬을 새 업권 순서에 맞춰 배치한 뒤 새 날짜를 뒤에 붙임
+    remap = np.array([sectors.index(s) for s in old.sectors], dtype=int)
+    arrays = {}
+    for name, new in new_arrays.items():
+        prev = np.zeros((len(old.dates), len(sectors), len(sectors)), dtype=ARRAYS[name])
+        prev[:, remap[:, None], remap[None, :]] = getattr(old, name)
+        arrays[name] = np.concatenate([prev, new])
+    dates = np.concatenate([np.asarray(old.dates), new_dates])
+    meta = {'currency': old.meta['currency']}
+    old.close()
+
+    _write(flow_dir, dates, sectors, arrays, meta)
+    if verbose:
+        print(f"✓ 흐름 행렬 추가: {len(new_dates)}일 (전체 {len(dates)}일, 업권 {len(sectors)}개)")
+    return FlowMatrices(flow_dir)
+
+class FlowMatrices:
+    """
+    저장된 흐름 행렬 (메모리 매핑, 읽기 전용)
+    행 = 매도 업권(자금 차입), 열 = 매수 업권(자금 공급), 순서는 self.sectors
+    """
+    def __init__(self, flow_dir=FLOW_DIR):
+        self.flow_dir = flow_dir
+        with open(os.path.join(flow_dir, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.sectors = self.meta['sectors']
+        self.dates = np.load(os.path.join(flow_dir, 'dates.npy'))
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(flow_dir, f'{name}.npy'), mmap_mode='r'))
+
+    def close(self):
+        for name in ARRAYS:
+            arr = getattr(self, name, None)
+            if arr is not None and getattr(arr, '_mmap', None) is not None:
+                arr._mmap.close()
+            setattr(self, name, None)
+
+    def _range(self, start_date, end_date):
+        lo = np.searchsorted(self.dates, int(start_date), side='left')
+        hi = np.searchsorted(self.dates, int(end_date), side='right')
+        return slice(lo, hi)
+
+    def slice(self, start_date, end_date, metric='volume'):
+        """
+        기간 잘라내기 (복사 없는 메모리 매핑 뷰)
+        반환값: (dates (d,), 배열 (d, S, S))
+        """
+        sl = self._range(start_date, end_date)
+        return self.dates[sl], getattr(self, metric)[sl]
+
+    def matrix(self, date, metric='volume'):
+        """날짜 하나의 행렬 (업권 라벨이 붙은 DataFrame)"""
+        i = np.searchsorted(self.dates, int(date))
+        if i >= len(self.dates) or self.dates[i] != int(date):
+            raise KeyError(f"흐름 행렬에 없는 날짜: {date}")
+        return pd.DataFrame(np.asarray(getattr(self, metric)[i]), index=self.sectors, columns=self.sectors)
+
+    def period_matrix(self, start_date, end_date):
+        """
+        기간 합산 행렬 (거래대금/건수 합계, 가중평균 금리는 부분합으로 재계산)
+        반환값: {'volume', 'vwap', 'count'} DataFrame
+        """
+        sl = self._range(start_date, end_date)
+        volume = self.volume[sl].sum(axis=0)
+        count = self.count[sl].sum(axis=0)
+        vw_amt = self.vw_amt[sl].sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = self.vw_rate_amt[sl].sum(axis=0) / np.where(vw_amt > 0, vw_amt, np.nan)
+        label = dict(index=self.sectors, columns=self.sectors)
+        return {'volume': pd.DataFrame(volume, **label), 'vwap': pd.DataFrame(vwap, **label),
+                'count': pd.DataFrame(count, **label)}
+
+    def net_borrowing(self, start_date, end_date):
+        """
+        업권별 일별 순차입 (매도로 조달한 금액 - 매수로 공급한 금액), DataFrame (날짜 x 업권)
+        """
+        dates, volume = self.slice(start_date, end_date)
+        net = volume.sum(axis=2) - volume.sum(axis=1)
+        index = pd.to_datetime(dates.astype(str), format='%Y%m%d')
+        return pd.DataFrame(net, index=index, columns=self.sectors)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == 'build':
+        build_flows(sys.argv[2:])
+    elif command == 'update':
+        update_flows(sys.argv[2:])
+    elif command == 'show':
+        flows = FlowMatrices()
+        pd.set_option('display.width', 200)
+        print((flows.matrix(sys.argv[2]) / 1e8).round(1).to_string())
+        print("(단위: 억원)")
+    else:
+        print(__doc__)
@@ -0,0 +1,277 @@
+"""
+금융위원회 REPO거래정보 - 실행 계측 (타이머 / 카운터 / JSON-lines 실행 로그 / 프로파일)
+RP_Collector, RP_Classify, RP_Aggregate의 주요 구간에 붙어 실행마다 어디서 시간을 쓰는지 기록
+
+- timer(이름): 구간 소요 시간 (횟수, 합계, 최대) - with 문으로 사용
+- count(이름, n): 카운터 (재시도, 캐시 적중, 적재 건수 등)
+- run(이름, **정보): 실행 단위 - 끝날 때 RUN_LOG에 한 줄(JSON) 추가
+  {"event": "run_end", "run_id", "name", "started_at", "elapsed_sec", "timers": {...}, "counters": {...}, "rates": {...}}
+  event(이름, **필드)로 중간 기록(날짜 수집 완료 등)도 같은 파일에 남김
+- 프로파일: 환경변수 RP_PROFILE=cprofile 이면 실행 전체를 cProfile로 측정해 logs/<run_id>.prof 저장
+            (실행 중 새로 시작된 작업 스레드도 스레드별로 측정해 합침)
+            RP_PROFILE=pyspy 이면 py-spy 연결 명령만 출력 (작업 스레드 이름에 단계 구분이 붙어 있음)
+- 끄기: 환경변수 RP_METRICS=0 (logs/ 폴더는 .gitignore에 포함)
+
+실행 간 비교:
+    python RP_Metrics.py [실행로그.jsonl] [실행이름]
+        최근 실행들의 주요 지표(경과 시간, 건/초, 구간별 평균 ms)를 표로 출력
+"""
+
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+ENABLED = os.environ.get('RP_METRICS', '1') != '0'   # RP_METRICS=0 이면 계측/실행 로그 끔
+LOG_DIR = 'logs'
+RUN_LOG = os.path.join(LOG_DIR, 'rp_runs.jsonl')
+PROFILE = os.environ.get('RP_PROFILE', '').lower()   # '', 'cprofile', 'pyspy'
+PROFILE_TOP = 25        # cProfile 요약에 출력할 함수 수
+
+# 처리량(건/초)으로 함께 기록할 카운터 -> 기준 타이머
+RATE_COUNTERS = {
+    'db.rows_inserted': 'db.insert',
+    'http.bytes': 'http.request',
+}
+
+class Metrics:
+    """
+    타이머/카운터 집계 (스레드 안전)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.timer_count = {}
+            self.timer_total = {}
+            self.timer_max = {}
+            self.counters = {}
+
+    def observe(self, name, seconds):
+        with self.lock:
+            self.timer_count[name] = self.timer_count.get(name, 0) + 1
+            self.timer_total[name] = self.timer_total.get(name, 0.0) + seconds
+            if seconds > self.timer_max.get(name, 0.0):
+                self.timer_max[name] = seconds
+
+    def add(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """현재 지표 dict (timers: 이름 -> count / total_sec / avg_ms / max_ms)"""
+        with self.lock:
+            timers = {
+                name: {
+                    'count': n,
+                    'total_sec': round(self.timer_total[name], 4),
+                    'avg_ms': round(self.timer_total[name] / n * 1000, 3),
+                    'max_ms': round(self.timer_max.get(name, 0.0) * 1000, 3),
+                }
+                for name, n in sorted(self.timer_count.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+
+        rates = {}
+        for counter, timer in RATE_COUNTERS.items():
+            if counter in counters and timers.get(timer, {}).get('total_sec'):
+                rates[f'{counter}_per_sec'] = round(counters[counter] / timers[timer]['total_sec'], 1)
+        return {'timers': timers, 'counters': counters, 'rates': rates}
+
+_metrics = Metrics()
+_run = None
+_thread_profilers = []
+_run_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+def get_metrics():
+    return _metrics
+
+@contextmanager
+def timer(name):
+    """구간 소요 시간 측정 (ENABLED=False면 측정하지 않음)"""
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _metrics.observe(name, time.perf_counter() - t0)
+
+def count(name, n=1):
+    if ENABLED:
+        _metrics.add(name, n)
+
+def _write_line(record):
+    os.makedirs(os.path.dirname(RUN_LOG) or '.', exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _log_lock:
+        with open(RUN_LOG, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+def event(name, **fields):
+    """실행 중간 기록 (실행 중이 아니면 무시)"""
+    if not ENABLED or _run is None:
+        return
+    _write_line({'event': name, 'run_id': _run['run_id'], 'at': datetime.now().isoformat(), **fields})
+
+# -----------------------------------------------------------------------------
+# 실행 단위
+# -----------------------------------------------------------------------------
+def start_run(name, **info):
+    """
+    실행 시작 (이미 실행 중이면 아무 것도 하지 않고 False - 중첩 호출은 바깥 실행에 합산)
+    끝내지 않고 종료(sys.exit 등)해도 atexit에서 기록
+    """
+    global _run
+    with _run_lock:
+        if not ENABLED or _run is not None:
+            return False
+        _metrics.reset()
+        _run = {
+            'run_id': f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
+            'name': name,
+            'info': info,
+            'started_at': datetime.now().isoformat(),
+            't0': time.perf_counter(),
+            'profiler': None,
+        }
+
+    if PROFILE == 'cprofile':
+        _thread_profilers.clear()
+        threading.setprofile(_profile_new_thread)
+        _run['profiler'] = cProfile.Profile()
+        _run['profiler'].enable()
+    elif PROFILE == 'pyspy':
+        print(f"🔍 py-spy: py-spy record -o {name}.svg --pid {os.getpid()}  (또는 py-spy top --pid {os.getpid()})")
+    return True
+
+def end_run(status='ok', verbose=True):
+    """실행 종료 -> 실행 로그 한 줄 기록, 기록한 dict 반환"""
+    global _run
+    with _run_lock:
+        current, _run = _run, None
+    if current is None:
+        return None
+
+    profile_path = None
+    if current['profiler'] is not None:
+        current['profiler'].disable()
+        threading.setprofile(None)
+        out = io.StringIO()
+        stats = pstats.Stats(current['profiler'], stream=out)
+        for profiler in _thread_profilers:
+            profiler.disable()
+            try:
+                stats.add(profiler)
+            except TypeError:   # 측정된 호출이 없는 스레드
+                pass
+        os.makedirs(LOG_DIR, exist_ok=True)
+        profile_path = os.path.join(LOG_DIR, f"{current['run_id']}.prof")
+        stats.dump_stats(profile_path)
+        if verbose:
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+            print(out.getvalue())
+
+    record = {
+        'event': 'run_end',
+        'run_id': current['run_id'],
+        'name': current['name'],
+        'status': status,
+        'info': current['info'],
+        'started_at': current['started_at'],
+        'elapsed_sec': round(time.perf_counter() - current['t0'], 3),
+        **_metrics.snapshot(),
+    }
+    if profile_path:
+        record['profile'] = profile_path
+    _write_line(record)
+    if verbose:
+        print_summary(record)
+    return record
+
+def _profile_new_thread(frame, event, arg):
+    """threading.setprofile 훅 - 새 스레드의 첫 호출에서 스레드 전용 cProfile로 교체"""
+    sys.setprofile(None)
+    profiler = cProfile.Profile()
+    _thread_profilers.append(profiler)
+    profiler.enable()
+
+@contextmanager
+def run(name, **info):
+    """with run('collector', start=..., end=...): ... (예외 시 status='error')"""
+    started = start_run(name, **info)
+    try:
+        yield
+    except BaseException:
+        if started:
+            end_run(status='error')
+        raise
+    if started:
+        end_run()
+
+@atexit.register
+def _finish_unclosed_run():
+    if _run is not None:
+        end_run(status='exit', verbose=False)
+
+def print_summary(record):
+    print(f"\n[실행 지표] {record['name']} ({record['run_id']}) - {record['elapsed_sec']}초")
+    for name, t in record['timers'].items():
+        print(f"  {name:24s}: {t['count']:7d}회, 합계 {t['total_sec']:9.2f}초, "
+              f"평균 {t['avg_ms']:9.2f}ms, 최대 {t['max_ms']:9.2f}ms")
+    for name, n in record['counters'].items():
+        print(f"  {name:24s}: {n:,}")
+    for name, r in record['rates'].items():
+        print(f"  {name:24s}: {r:,}")
+    print(f"  → 기록: {RUN_LOG}")
+
+# -----------------------------------------------------------------------------
+# 실행 간 비교
+# -----------------------------------------------------------------------------
+def load_runs(path=RUN_LOG, name=None):
+    """실행 로그의 run_end 기록 목록 (name이 있으면 해당 실행만)"""
+    if not os.path.exists(path):
+        return []
+    runs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('event') == 'run_end' and (name is None or record.get('name') == name):
+                runs.append(record)
+    return runs
+
+def compare_runs(runs, last=10):
+    """최근 실행들의 경과 시간 / 처리량 / 구간별 평균 ms 비교표 (DataFrame)"""
+    import pandas as pd
+
+    rows = []
+    for record in runs[-last:]:
+        row = {'run_id': record['run_id'], 'name': record['name'], 'status': record.get('status'),
+               'elapsed_sec': record['elapsed_sec'], **record.get('rates', {})}
+        for timer_name, t in record.get('timers', {}).items():
+            row[f'{timer_name}_avg_ms'] = t['avg_ms']
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(__doc__)
+        sys.exit(1)
+    path = sys.argv[1] if len(sys.argv) > 1 else RUN_LOG
+    runs = load_runs(path, sys.argv[2] if len(sys.argv) > 2 else None)
+    if not runs:
+        print(f"⚠️ 실행 기록 없음: {path}")
+        sys.exit(1)
+    print(compare_runs(runs).T.to_string())
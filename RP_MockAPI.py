@@ -0,0 +1,207 @@
+"""
+금융위원회 REPO거래정보 - 건별거래조회(getCaseForTrad) 로컬 스텁 서버
+실제 API 대신 결정적인(재현 가능한) 가짜 거래 데이터를 응답
+- 서비스키별 초당 요청 수 / 일일 한도를 지정하면 공공데이터포털과 같은 오류 코드로 응답
+  (22: 일일 한도 초과, 23: 초당 요청 수 초과, 30: 등록되지 않은 키)
+- generator='synthetic'이면 RP_Synth의 실제 시장과 비슷한 거래(통화/만기/담보/업권 구성)로 응답
+  (RP_Synth.generate_db로 만든 DB와 같은 날짜는 같은 거래)
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# 스텁 서버 설정
+MOCK_HOST = '127.0.0.1'
+MOCK_PORT = 0                 # 0이면 빈 포트 자동 할당
+TRADES_PER_DAY = 2500         # 평일 하루 거래 건수 (기본값)
+API_PATH = '/1160100/service/GetRepoTradInfoService/getCaseForTrad'
+
+GENERATORS = ('simple', 'synthetic')
+DAY_CACHE_SIZE = 64           # 날짜별 생성 결과 캐시 (페이지마다 다시 만들지 않음)
+
+COLLATERALS = ['국채', '통안채', '은행채', '금융채', '특수채', '회사채', '지방채', 'CP', '주식.ETF']
+
+def make_trades(base_date, trades_per_day=TRADES_PER_DAY):
+    """
+    날짜별로 항상 같은 결과를 주는 가짜 거래 목록 생성 (주말은 빈 목록)
+    """
+    if datetime.strptime(base_date, '%Y%m%d').weekday() >= 5:
+        return []
+
+    rng = random.Random(int(base_date))
+    trades = []
+    for sqno in range(1, trades_per_day + 1):
+        collateral = rng.choice(COLLATERALS)
+        amount = rng.randint(1, 500) * 1e8
+        trades.append({
+            'basDt': base_date,
+            'rpSqno': str(sqno),
+            'rpBuyAplCurCd': 'KRW',
+            'rpBuyAplCurCdNm': '대한민국 원',
+            'rdptTermCcd': '1',
+            'rdptTermCcdNm': '1영업일',
+            'rpRmngExprDcd': '1',
+            'rpRmngExprDcdNm': '1일이하',
+            'rpInrt': str(round(rng.uniform(2.5, 3.5), 3)),
+            'slngShtrFinBzcDcd': '10',
+            'slngShtrFinBzcDcdNm': '증권',
+            'buynShtrFinBzcDcd': '20',
+            'buynShtrFinBzcDcdNm': '자산운용',
+            'rpOpngDt': base_date,
+            'rpBuyAmt': str(amount),
+            'rpMrgamRto': '0',
+            'scrsItmsKcd': str(COLLATERALS.index(collateral) + 1),
+            'scrsItmsKcdNm': collateral,
+            'isinCd': f'KR{rng.randint(0, 10**10 - 1):010d}',
+            'isinCdNm': f'{collateral} {rng.randint(1, 99)}',
+            'buyScrtBuyAmt': str(amount),
+            'buyScrtEvlAmt': str(amount * 1.02),
+        })
+    return trades
+
+@lru_cache(maxsize=DAY_CACHE_SIZE)
+def day_trades(base_date, trades_per_day=TRADES_PER_DAY, generator='simple'):
+    """
+    날짜 하나의 전체 거래 (생성 방식별, 캐시)
+    synthetic: 하루 건수가 trades_per_day 평균으로 날짜마다 달라짐, 휴장일은 빈 목록
+    """
+    if generator == 'simple':
+        return make_trades(base_date, trades_per_day)
+    if generator == 'synthetic':
+        import RP_Synth
+        return RP_Synth.day_records(base_date, RP_Synth.rows_for_day(base_date, trades_per_day))
+    raise ValueError(f"지원하지 않는 생성 방식: {generator}")
+
+def make_error(code, message):
+    """
+    공공데이터포털 오류 응답 (header만 있음)
+    """
+    return {'response': {'header': {'resultCode': code, 'resultMsg': message}}}
+
+def check_service_key(server, key):
+    """
+    서비스키 검사 (등록 여부, 일일 한도, 초당 요청 수)
+    반환값: 오류 응답 dict 또는 None(정상)
+    """
+    with server.key_lock:
+        if server.valid_keys is not None and key not in server.valid_keys:
+            return make_error('30', 'SERVICE_KEY_IS_NOT_REGISTERED_ERROR.')
+
+        used = server.key_usage.get(key, 0)
+        if server.key_daily_quota is not None and used >= server.key_daily_quota:
+            return make_error('22', 'LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR.')
+
+        if server.key_rate_per_sec is not None:
+            now = time.monotonic()
+            recent = [t for t in server.key_recent.get(key, []) if now - t < 1.0]
+            if len(recent) >= server.key_rate_per_sec:
+                server.key_recent[key] = recent
+                return make_error('23', 'LIMITED_NUMBER_OF_SERVICE_REQUESTS_PER_SECOND_EXCEEDS_ERROR.')
+            recent.append(now)
+            server.key_recent[key] = recent
+
+        server.key_usage[key] = used + 1
+    return None
+
+def make_response(base_date, num_rows, page_no, trades_per_day=TRADES_PER_DAY, generator='simple'):
+    """
+    실제 API와 같은 구조(response/header/body/items/item)의 응답 생성
+    """
+    trades = day_trades(base_date, trades_per_day, generator)
+    start = (page_no - 1) * num_rows
+    page_items = trades[start:start + num_rows]
+    return {
+        'response': {
+            'header': {'resultCode': '00', 'resultMsg': 'NORMAL SERVICE.'},
+            'body': {
+                'numOfRows': num_rows,
+                'pageNo': page_no,
+                'totalCount': len(trades),
+                'items': {'item': page_items} if page_items else '',
+            }
+        }
+    }
+
+class MockRepoHandler(BaseHTTPRequestHandler):
+    """getCaseForTrad 요청 처리기"""
+
+    # HTTP/1.1: keep-alive 연결 재사용 확인용
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != API_PATH:
+            self.send_error(404)
+            return
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.request_count += 1
+
+        data = check_service_key(self.server, params.get('serviceKey'))
+        if data is None:
+            try:
+                data = make_response(
+                    params['basDt'],
+                    int(params.get('numOfRows', 10)),
+                    int(params.get('pageNo', 1)),
+                    self.server.trades_per_day,
+                    self.server.generator
+                )
+            except (KeyError, ValueError):
+                data = make_error('10', 'INVALID_REQUEST_PARAMETER_ERROR.')
+
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # 요청 로그 출력 생략
+        pass
+
+def start_mock_server(host=MOCK_HOST, port=MOCK_PORT, trades_per_day=TRADES_PER_DAY,
+                      key_rate_per_sec=None, key_daily_quota=None, valid_keys=None, generator='simple'):
+    """
+    백그라운드 스레드에서 스텁 서버 실행
+    - key_rate_per_sec: 서비스키별 초당 최대 요청 수 (None이면 제한 없음)
+    - key_daily_quota: 서비스키별 최대 요청 수 (None이면 제한 없음)
+    - valid_keys: 등록된 서비스키 목록 (None이면 모든 키 허용)
+    - generator: 'simple'(기존 단순 거래) 또는 'synthetic'(RP_Synth)
+    반환값: (server, base_url) - RP_Collector.BASE_URL에 base_url을 지정해 사용
+    """
+    if generator not in GENERATORS:
+        raise ValueError(f"지원하지 않는 생성 방식: {generator}")
+    server = ThreadingHTTPServer((host, port), MockRepoHandler)
+    server.daemon_threads = True
+    server.request_count = 0
+    server.trades_per_day = trades_per_day
+    server.generator = generator
+    server.key_rate_per_sec = key_rate_per_sec
+    server.key_daily_quota = key_daily_quota
+    server.valid_keys = set(valid_keys) if valid_keys is not None else None
+    server.key_usage = {}
+    server.key_recent = {}
+    server.key_lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f'http://{server.server_address[0]}:{server.server_address[1]}{API_PATH}'
+    return server, base_url
+
+if __name__ == "__main__":
+    server, base_url = start_mock_server(port=8000)
+    print(f"✓ 스텁 서버 실행 중: {base_url}")
+    print("  (종료: Ctrl+C)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,234 @@
+"""
+금융위원회 REPO거래정보 - 분석용 패널 데이터 (레포 금리 + 시장 데이터)
+두 분석 노트북(기초통계량 분석, 회귀 분석)이 매번 다시 만드는 데이터를 한 번만 읽어 스냅샷으로 저장
+
+- 원천: 시장금리 CSV, 주가지수 CSV(KOSPI 천 단위 쉼표), VKOSPI CSV(cp949), D_Repo DB(daily_repo_rates)
+- 스냅샷: 날짜 인덱스, 금리는 float32, 담보유형은 category 타입으로 cache/panel/ 에 저장
+- 원천 파일의 크기/수정시각이 바뀌면 내용 해시를 비교해 달라진 경우에만 다시 생성
+
+사용 예 (노트북 전처리 대체):
+    import RP_Panel
+    panel = RP_Panel.load_panel()
+    df_market, df_analysis, df_panel = RP_Panel.analysis_frames(panel, '20150101', '20251231')
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+BASE_PATH = r'C:\Users\jay15\Desktop\DB_DATA\DataBase'
+SOURCES = {
+    'rate': os.path.join(BASE_PATH, '시장금리(일별)_250109.csv'),
+    'stock': os.path.join(BASE_PATH, '국내주가지수(일별)_250109.csv'),
+    'vkospi': os.path.join(BASE_PATH, 'VKOSPI(일별)_251231.csv'),
+    'repo': os.path.join(BASE_PATH, 'D_Repo_2015-2025.db'),
+}
+PANEL_CACHE_DIR = os.path.join('cache', 'panel')
+RATE_DTYPE = 'float32'    # 저장 시 금리/지수 타입 (분석 시에는 float64로 변환)
+RATE_DECIMALS = 3         # 원천 금리 소수 자리 (float32 저장 오차 제거용 반올림)
+INDEX_DECIMALS = 2        # 원천 지수(KOSPI, VKOSPI) 소수 자리
+
+# 시장금리 컬럼명 표준화 (회귀 분석 노트북과 동일)
+RATE_RENAME = {
+    '기준금리': 'BASE_RATE',
+    'CD(91일)': 'CD91',
+    'CP(91일, A1)': 'CP91',
+    'KOFR(공시RFR)': 'KOFR',
+    '콜금리(1일, 전체거래)': 'CALL',
+    '국고채(3년)': 'KTB3Y',
+    '국고채(10년)': 'KTB10Y',
+    '국고채(2년)': 'KTB2Y',
+    '통안증권(91일)': 'MSB91',
+    '회사채(3년, AA-)': 'CORP_AA',
+    '회사채(3년, BBB-)': 'CORP_BBB'
+}
+
+# 분석 변수 (회귀 분석 노트북과 동일)
+ANALYSIS_COLS = ['RepoSpread', 'BankStress', 'CreditSpread', 'YieldSlope', 'r10', 'VKOSPI', 'KOSPI_ret', 'BASE_RATE']
+PANEL_MARKET_COLS = ['BASE_RATE', 'BankStress', 'CreditSpread', 'YieldSlope', 'r10', 'VKOSPI', 'KOSPI_ret']
+
+# -----------------------------------------------------------------------------
+# 원천 파일 서명 (스냅샷 무효화용)
+# -----------------------------------------------------------------------------
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _signature(path, with_hash=False):
+    st = os.stat(path)
+    sig = {'path': os.path.abspath(path), 'size': st.st_size, 'mtime': st.st_mtime_ns}
+    if with_hash:
+        sig['sha1'] = _file_hash(path)
+    return sig
+
+def _is_fresh(manifest, sources):
+    """
+    스냅샷이 원천 파일과 일치하는지 확인
+    크기/수정시각이 같으면 바로 통과, 수정시각만 다르면 내용 해시로 다시 확인
+    """
+    if manifest.get('rate_dtype') != RATE_DTYPE or set(manifest.get('sources', {})) != set(sources):
+        return False
+    for name, path in sources.items():
+        old = manifest['sources'][name]
+        if not os.path.exists(path):
+            return False
+        new = _signature(path)
+        if new['path'] != old['path'] or new['size'] != old['size']:
+            return False
+        if new['mtime'] != old['mtime'] and _file_hash(path) != old.get('sha1'):
+            return False
+    return True
+
+# -----------------------------------------------------------------------------
+# 원천 파일 읽기
+# -----------------------------------------------------------------------------
+def _read_rates(path):
+    df = pd.read_csv(path, encoding='utf-8')
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns=RATE_RENAME)
+    df['date'] = pd.to_datetime(df['DATE'])
+    df = df.drop(columns=['DATE']).set_index('date')
+    return df.apply(pd.to_numeric, errors='coerce').astype(RATE_DTYPE)
+
+def _read_stock(path):
+    df = pd.read_csv(path, encoding='utf-8', usecols=['DATE', 'KOSPI'], dtype={'KOSPI': str})
+    df['date'] = pd.to_datetime(df['DATE'])
+    df['KOSPI'] = pd.to_numeric(df['KOSPI'].str.replace(',', '', regex=False), errors='coerce')
+    return df.set_index('date')[['KOSPI']].astype(RATE_DTYPE)
+
+def _read_vkospi(path):
+    df = pd.read_csv(path, encoding='cp949', usecols=['DATE', '종가'])
+    df['date'] = pd.to_datetime(df['DATE'])
+    return df.rename(columns={'종가': 'VKOSPI'}).set_index('date')[['VKOSPI']].astype(RATE_DTYPE)
+
+def _read_repo(path):
+    conn = sqlite3.connect(path)
+    df = pd.read_sql('SELECT * FROM daily_repo_rates', conn)
+    conn.close()
+    date_col = 'basDt' if 'basDt' in df.columns else 'index'
+    df['date'] = pd.to_datetime(df[date_col])
+    return df.drop(columns=[date_col]).set_index('date').sort_index().astype(RATE_DTYPE)
+
+def build_panel(sources=None):
+    """
+    원천 파일을 읽어 패널 스냅샷 생성
+    반환값: {'rates', 'kospi', 'vkospi', 'repo_daily', 'repo_long'}
+      - 시계열은 모두 날짜 인덱스, 값은 RATE_DTYPE
+      - repo_long: (date, collateral[category], RP_rate) - 결측 제외
+    """
+    sources = sources or SOURCES
+    repo_daily = _read_repo(sources['repo'])
+
+    repo_long = repo_daily.rename_axis(columns='collateral').stack().rename('RP_rate').reset_index()
+    repo_long['collateral'] = pd.Categorical(repo_long['collateral'], categories=list(repo_daily.columns))
+    repo_long = repo_long.sort_values(['collateral', 'date'], kind='stable').reset_index(drop=True)
+
+    return {
+        'rates': _read_rates(sources['rate']),
+        'kospi': _read_stock(sources['stock']),
+        'vkospi': _read_vkospi(sources['vkospi']),
+        'repo_daily': repo_daily,
+        'repo_long': repo_long,
+    }
+
+def load_panel(sources=None, use_cache=True, verbose=True):
+    """
+    패널 스냅샷 로드 (원천이 바뀌지 않았으면 캐시 파일만 읽음)
+    """
+    sources = sources or SOURCES
+    if not use_cache:
+        return build_panel(sources)
+
+    key = hashlib.sha1(json.dumps(sorted(os.path.abspath(p) for p in sources.values()),
+                                  ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+    data_path = os.path.join(PANEL_CACHE_DIR, f'panel_{key}.pkl')
+    manifest_path = os.path.join(PANEL_CACHE_DIR, f'panel_{key}.json')
+
+    if os.path.exists(data_path) and os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if _is_fresh(manifest, sources):
+            return pd.read_pickle(data_path)
+
+    if verbose:
+        print("⏳ 패널 스냅샷 생성 중 (원천 파일 변경 또는 최초 실행)...")
+    panel = build_panel(sources)
+
+    os.makedirs(PANEL_CACHE_DIR, exist_ok=True)
+    pd.to_pickle(panel, data_path)
+    manifest = {'rate_dtype': RATE_DTYPE,
+                'sources': {name: _signature(path, with_hash=True) for name, path in sources.items()}}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    if verbose:
+        print(f"✓ 패널 스냅샷 저장: {data_path}")
+    return panel
+
+# -----------------------------------------------------------------------------
+# 분석용 데이터 (회귀 분석 노트북 전처리와 동일한 결과)
+# -----------------------------------------------------------------------------
+def market_frame(panel, start_date='20150101', end_date='20251231'):
+    """
+    시장금리 + KOSPI + VKOSPI + 전체 RP 금리 병합 후 분석 변수 생성 (bp 단위)
+    반환값: date 컬럼을 가진 DataFrame (노트북의 df_market)
+    """
+    market = panel['rates'].join(
+        [panel['kospi'], panel['vkospi'], panel['repo_daily'][['전체']].rename(columns={'전체': 'REPO_TOTAL'})],
+        how='outer'
+    ).astype(np.float64).sort_index()
+    # float32 스냅샷 값을 원천 자리수로 반올림 (노트북 원천 값과 동일)
+    market = market.round({**{c: RATE_DECIMALS for c in market.columns}, 'KOSPI': INDEX_DECIMALS,
+                           'VKOSPI': INDEX_DECIMALS})
+
+    start_dt = pd.to_datetime(start_date, format='%Y%m%d')
+    end_dt = pd.to_datetime(end_date, format='%Y%m%d')
+    market = market[(market.index >= start_dt) & (market.index <= end_dt)]
+
+    market['RepoSpread'] = (market['REPO_TOTAL'] - market['BASE_RATE']) * 100
+    market['BankStress'] = (market['CALL'] - market['BASE_RATE']) * 100
+    market['CreditSpread'] = (market['CP91'] - market['MSB91']) * 100
+    market['YieldSlope'] = (market['KTB10Y'] - market['KTB3Y']) * 100
+    market['r10'] = market['KTB10Y']
+    market['KOSPI_ret'] = market['KOSPI'].ffill().pct_change() * 100
+    return market.rename_axis('date').reset_index()
+
+def spread_frame(panel):
+    """
+    담보별 스프레드 (RP 금리 - 기준금리, bp), 날짜 인덱스 (기초통계량 분석 노트북의 df_spread_only)
+    금리는 원천 자리수로 반올림해 float32 저장 오차 없이 노트북과 같은 값
+    """
+    repo = panel['repo_daily'].astype(np.float64).round(RATE_DECIMALS)
+    base = panel['rates']['BASE_RATE'].astype(np.float64).round(RATE_DECIMALS)
+    repo, base = repo.align(base, join='inner', axis=0)
+    return repo.sub(base, axis=0) * 100
+
+def analysis_frames(panel, start_date='20150101', end_date='20251231'):
+    """
+    노트북의 (df_market, df_analysis, df_panel) 생성
+    - df_analysis: 전체 시장 분석 데이터 (date 인덱스)
+    - df_panel: 담보유형별 패널 ((collateral, date) 인덱스, RepoSpread 포함)
+    """
+    df_market = market_frame(panel, start_date, end_date)
+    df_analysis = df_market[['date'] + ANALYSIS_COLS].dropna().set_index('date').sort_index()
+
+    start_dt = pd.to_datetime(start_date, format='%Y%m%d')
+    end_dt = pd.to_datetime(end_date, format='%Y%m%d')
+    repo_long = panel['repo_long']
+    repo_long = repo_long[(repo_long['date'] >= start_dt) & (repo_long['date'] <= end_dt)]
+
+    df_panel = repo_long.assign(RP_rate=repo_long['RP_rate'].astype(np.float64).round(RATE_DECIMALS)).merge(
+        df_market[['date'] + PANEL_MARKET_COLS], on='date', how='inner'
+    )
+    df_panel['RepoSpread'] = (df_panel['RP_rate'] - df_panel['BASE_RATE']) * 100
+    df_panel = df_panel.dropna()
+    df_panel['collateral'] = df_panel['collateral'].astype(str)
+    df_panel = df_panel.set_index(['collateral', 'date']).sort_index()
+
+    return df_market, df_analysis, df_panel
@@ -0,0 +1,337 @@
+"""
+금융위원회 REPO거래정보 - 수집/적재 분리 파이프라인
+API 조회 스레드(생산자)가 페이지를 제한된 큐에 넣고,
+전용 기록 스레드(소비자) 하나가 큐를 비우며 repo_trades / collection_status에 적재
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import RP_Calendar
+import RP_Collector as rc
+
+# 파이프라인 설정
+FETCH_WORKERS = 8       # 동시에 API를 호출하는 스레드 수
+QUEUE_SIZE = 32         # 큐에 쌓아둘 수 있는 최대 페이지 수 (초과 시 조회 스레드 대기 = 역압)
+REPORT_EVERY_SEC = 10   # 진행 상황/지표 출력 주기 (초)
+
+class PipelineMetrics:
+    """
+    큐 깊이와 단계별 지연 시간 집계 (스레드 안전)
+    - fetch: API 호출 + JSON 디코딩
+    - queue_wait: 페이지가 큐에서 기다린 시간
+    - write: DB 적재 시간
+    """
+    STAGES = ('fetch', 'queue_wait', 'write')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stage_count = {s: 0 for s in self.STAGES}
+        self.stage_total = {s: 0.0 for s in self.STAGES}
+        self.stage_max = {s: 0.0 for s in self.STAGES}
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.rows_written = 0
+        self.pages_failed = 0
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.stage_count[stage] += 1
+            self.stage_total[stage] += seconds
+            self.stage_max[stage] = max(self.stage_max[stage], seconds)
+
+    def sample_depth(self, depth):
+        with self.lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.depth_max = max(self.depth_max, depth)
+
+    def add_rows(self, n):
+        with self.lock:
+            self.rows_written += n
+
+    def add_failed_page(self):
+        with self.lock:
+            self.pages_failed += 1
+
+    def snapshot(self):
+        """현재 지표를 dict로 반환"""
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            snap = {
+                'elapsed_sec': round(elapsed, 2),
+                'rows_written': self.rows_written,
+                'rows_per_sec': round(self.rows_written / elapsed, 1) if elapsed > 0 else 0.0,
+                'pages_failed': self.pages_failed,
+                'queue_depth_avg': round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+                'queue_depth_max': self.depth_max,
+            }
+            for s in self.STAGES:
+                n = self.stage_count[s]
+                snap[f'{s}_count'] = n
+                snap[f'{s}_avg_ms'] = round(self.stage_total[s] / n * 1000, 2) if n else 0.0
+                snap[f'{s}_max_ms'] = round(self.stage_max[s] * 1000, 2)
+            return snap
+
+    def print_summary(self):
+        snap = self.snapshot()
+        print(f"\n[파이프라인 지표]")
+        print(f"  경과 {snap['elapsed_sec']}초, 적재 {snap['rows_written']:,}건 ({snap['rows_per_sec']:,}건/초), "
+              f"실패 페이지 {snap['pages_failed']}개")
+        print(f"  큐 깊이: 평균 {snap['queue_depth_avg']}, 최대 {snap['queue_depth_max']} (한도 {QUEUE_SIZE})")
+        for s in self.STAGES:
+            print(f"  {s:10s}: {snap[f'{s}_count']:6d}회, 평균 {snap[f'{s}_avg_ms']:8.2f}ms, 최대 {snap[f'{s}_max_ms']:8.2f}ms")
+
+class IngestPipeline:
+    """
+    날짜 목록을 받아 조회(다중 스레드) → 큐 → 적재(단일 스레드)로 처리
+    """
+    # 큐 메시지 종류
+    PAGE = 'page'
+    DATE_DONE = 'date_done'
+    NO_DATA = 'no_data'
+    STOP = 'stop'
+
+    def __init__(self, db_file=None, fetch_workers=FETCH_WORKERS, queue_size=QUEUE_SIZE):
+        self.db_file = db_file or rc.DB_FILE
+        self.fetch_workers = fetch_workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.metrics = PipelineMetrics()
+        self.saved_by_date = {}
+        self.partial_dates = []
+        self.writer_error = None
+        # 날짜별 남은 페이지 수 / 전체 건수 / 실패 페이지 수 (조회 스레드 공유)
+        self.lock = threading.Lock()
+        self.remaining = {}
+        self.total_by_date = {}
+        self.failed_by_date = {}
+
+    # -------------------------------------------------------------------------
+    # 생산자: API 조회
+    # -------------------------------------------------------------------------
+    def _put(self, message):
+        self.queue.put(message)
+        self.metrics.sample_depth(self.queue.qsize())
+
+    def _fetch_page(self, base_date, page_no):
+        t0 = time.monotonic()
+        result = rc.get_repo_trades(base_date, num_rows=rc.PAGE_SIZE, page_no=page_no)
+        self.metrics.observe('fetch', time.monotonic() - t0)
+        return result
+
+    def _page_finished(self, base_date, failed=False):
+        """
+        날짜의 남은 페이지 수 차감, 마지막 페이지면 완료 메시지(실패 페이지 수 포함) 적재
+        (같은 큐에 페이지 뒤에 들어가므로 적재 스레드는 항상 페이지를 먼저 처리)
+        """
+        with self.lock:
+            if failed:
+                self.failed_by_date[base_date] = self.failed_by_date.get(base_date, 0) + 1
+            self.remaining[base_date] -= 1
+            done = self.remaining[base_date] == 0
+            if done:
+                del self.remaining[base_date]
+                total_count = self.total_by_date.pop(base_date)
+                failed_pages = self.failed_by_date.pop(base_date, 0)
+        if done:
+            self._put((self.DATE_DONE, base_date, total_count, failed_pages))
+
+    def _fetch_rest(self, base_date, page_no):
+        """2페이지 이후 조회 → 큐 적재 (실패한 페이지는 날짜 완료 시 'partial'로 기록)"""
+        failed = True
+        try:
+            result = self._fetch_page(base_date, page_no)
+            if result and 'response' in result:
+                self._put((self.PAGE, base_date, page_no, rc._extract_items(result), time.monotonic()))
+                failed = False
+        except Exception as e:
+            print(f"{base_date}: {page_no}페이지 조회 오류 ({e})")
+        finally:
+            if failed:
+                self.metrics.add_failed_page()
+            self._page_finished(base_date, failed)
+
+    def fetch_date(self, base_date, executor):
+        """
+        날짜 하나 조회: 1페이지로 전체 건수 확인 후 나머지 페이지를 같은 풀에 분배
+        반환값: 1페이지 조회 성공 여부
+        """
+        result = self._fetch_page(base_date, 1)
+        if not result or 'response' not in result:
+            print(f"{base_date}: 조회 실패")
+            return False
+
+        total_count = int(result['response'].get('body', {}).get('totalCount', 0) or 0)
+        if total_count == 0:
+            print(f"{base_date}: 데이터 없음")
+            self._put((self.NO_DATA, base_date))
+            return True
+
+        pages = (total_count + rc.PAGE_SIZE - 1) // rc.PAGE_SIZE
+        with self.lock:
+            self.remaining[base_date] = pages
+            self.total_by_date[base_date] = total_count
+
+        self._put((self.PAGE, base_date, 1, rc._extract_items(result), time.monotonic()))
+        for page in range(2, pages + 1):
+            executor.submit(self._fetch_rest, base_date, page)
+        self._page_finished(base_date)
+        return True
+
+    # -------------------------------------------------------------------------
+    # 소비자: DB 적재 (전용 스레드 하나)
+    # -------------------------------------------------------------------------
+    def _writer_loop(self):
+        writer = rc.TradeWriter(self.db_file)
+        try:
+            while True:
+                message = self.queue.get()
+                kind = message[0]
+
+                if kind == self.STOP:
+                    break
+                elif kind == self.PAGE:
+                    _, base_date, page_no, items, enqueued_at = message
+                    self.metrics.observe('queue_wait', time.monotonic() - enqueued_at)
+                    t0 = time.monotonic()
+                    saved = writer.write_trades(items, base_date, page_no, rc.PAGE_SIZE)
+                    self.metrics.observe('write', time.monotonic() - t0)
+                    self.metrics.add_rows(saved)
+                    self.saved_by_date[base_date] = self.saved_by_date.get(base_date, 0) + saved
+                elif kind == self.DATE_DONE:
+                    _, base_date, total_count, failed_pages = message
+                    saved = self.saved_by_date.pop(base_date, 0)
+                    if failed_pages:
+                        # 누락 페이지는 다음 실행(또는 verify_and_repair) 때 다시 조회
+                        writer.set_status(base_date, total_count, saved, 'partial')
+                        self.partial_dates.append(base_date)
+                        print(f"  ✗ {base_date}: {failed_pages}페이지 실패 ({saved}/{total_count}건), 다음 실행 때 재조회")
+                    else:
+                        writer.set_status(base_date, total_count, saved, 'completed')
+                        print(f"  ✓ {base_date} 완료: {saved}건 저장됨 (전체 {total_count}건)")
+                elif kind == self.NO_DATA:
+                    writer.set_status(message[1], 0, 0, 'no_data')
+        except Exception as e:
+            self.writer_error = e
+            print(f"❌ 적재 스레드 오류: {e}")
+            # 생산자가 막히지 않도록 큐를 계속 비움
+            while self.queue.get()[0] != self.STOP:
+                pass
+        finally:
+            writer.close()
+
+    # -------------------------------------------------------------------------
+    # 실행
+    # -------------------------------------------------------------------------
+    def run(self, dates):
+        """
+        날짜 목록 수집 실행 (이미 completed / no_data인 날짜는 건너뜀)
+        반환값: (성공 일수, 실패 일수) - 일부 페이지만 받은 'partial' 날짜는 실패로 셈
+        """
+        completed = load_completed_dates(self.db_file)
+        dates = [d for d in dates if d not in completed]
+        print(f"수집 대상 {len(dates)}일 (이미 완료 {len(completed)}일 제외)")
+
+        writer_thread = threading.Thread(target=self._writer_loop, name='rp-writer', daemon=True)
+        writer_thread.start()
+
+        success_count = 0
+        fail_count = 0
+        last_report = time.monotonic()
+
+        # 나머지 페이지 작업은 fetch_date가 같은 풀에 추가하므로
+        # with 블록을 빠져나올 때(shutdown) 모든 페이지 조회가 끝나 있음
+        # 예외가 나도 적재 스레드가 멈춰 있지 않도록 STOP은 항상 보냄
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+                first_pages = {executor.submit(self.fetch_date, d, executor): d for d in dates}
+                for future in as_completed(first_pages):
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        print(f"{first_pages[future]}: 수집 오류 ({e})")
+                        ok = False
+                    if ok:
+                        success_count += 1
+                    else:
+                        fail_count += 1
+
+                    if time.monotonic() - last_report >= REPORT_EVERY_SEC:
+                        snap = self.metrics.snapshot()
+                        print(f"  → 적재 {snap['rows_written']:,}건, 큐 {self.queue.qsize()}/{self.queue.maxsize}, "
+                              f"{snap['rows_per_sec']:,}건/초")
+                        last_report = time.monotonic()
+        finally:
+            self._put((self.STOP,))
+            writer_thread.join()
+
+        if self.writer_error is not None:
+            raise self.writer_error
+
+        # 1페이지는 받았지만 누락 페이지가 있는 날짜
+        success_count -= len(self.partial_dates)
+        fail_count += len(self.partial_dates)
+        return success_count, fail_count
+
+def load_completed_dates(db_file):
+    """
+    collection_status에서 completed / no_data 날짜를 한 번에 조회
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        rows = conn.execute("SELECT basDt FROM collection_status WHERE status IN ('completed', 'no_data')").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    conn.close()
+    return {r[0] for r in rows}
+
+def collect_date_range_pipeline(start_date, end_date, fetch_workers=FETCH_WORKERS, queue_size=QUEUE_SIZE):
+    """
+    날짜 범위 수집 (주말/KRX 휴장일 제외, 최신 날짜부터, 파이프라인 방식)
+    """
+    start_dt = datetime.strptime(start_date, '%Y%m%d')
+    end_dt = datetime.strptime(end_date, '%Y%m%d')
+
+    dates = RP_Calendar.trading_days(start_date, end_date)[::-1]
+
+    print(f"\n{'='*80}")
+    print(f"데이터 수집 기간: {start_dt.strftime('%Y-%m-%d')} ~ {end_dt.strftime('%Y-%m-%d')} (파이프라인)")
+    print(f"조회 스레드 {fetch_workers}개, 큐 한도 {queue_size}페이지, 초당 {rc._rate_limiter.rate:g}건 제한")
+    print(f"{'='*80}")
+
+    pipeline = IngestPipeline(fetch_workers=fetch_workers, queue_size=queue_size)
+    success_count, fail_count = pipeline.run(dates)
+
+    print(f"\n{'='*80}")
+    print(f"수집 완료 - 거래일 {success_count}일 수집, 실패: {fail_count}일")
+    pipeline.metrics.print_summary()
+    print(f"{'='*80}\n")
+
+    return pipeline.metrics.snapshot()
+
+def main():
+    """
+    메인 실행 함수 (RP_Collector 설정을 그대로 사용)
+    """
+    print("=" * 80)
+    print("금융위원회 REPO거래정보 - 파이프라인 수집")
+    print("=" * 80)
+
+    if not rc.test_api_connection():
+        print("\nAPI 연결에 실패했습니다.")
+        return
+
+    rc.init_database()
+    collect_date_range_pipeline(rc.START_DATE, rc.END_DATE)
+    rc.get_db_stats()
+
+    print("\n프로그램 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+"""
+금융위원회 REPO거래정보 - 배치 회귀분석 엔진
+회귀 분석 노트북의 OLS/PanelOLS 루프를 한 번에 처리 (reg_*.csv 결과 동일)
+
+- 설계행렬(수준/1차 차분 + 시차)은 한 곳에서 생성
+- 변수 개수가 같은 모형들은 행을 0으로 채워 쌓은 뒤 한 번의 배치 QR 분해로 추정
+- 표준오차: nonrobust / HC1 / HAC(Newey-West, Bartlett) / cluster 를 배치로 계산
+  (statsmodels OLS.fit(cov_type=...), linearmodels PanelOLS(entity_effects=True) clustered 와 동일)
+  * HC1, cluster: n/(n-k) 소표본 보정 / HAC: 보정 없음 (statsmodels 기본값)
+  * p-value: nonrobust, cluster는 t분포 / HC1, HAC는 정규분포
+
+사용법:
+    python RP_Regression.py [출력폴더]
+        RP_Panel 스냅샷으로 reg_level_kofr / reg_diff_kofr / reg_panel_level / reg_panel_diff /
+        reg_collateral_level / reg_collateral_diff.csv 저장
+    python RP_Regression.py rolling [구간|expanding] [출력폴더]
+        담보유형별 이동/누적 수준 회귀 계수·표준오차·R² 시계열 -> reg_rolling_level.csv
+
+노트북에서:
+    import RP_Panel, RP_Regression
+    df_market, df_analysis, df_panel = RP_Panel.analysis_frames(RP_Panel.load_panel())
+    results = RP_Regression.run_all(df_analysis, df_panel)
+    results['model_level'].params['BankStress']
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+N_LAGS = 3
+HAC_MAXLAGS = 5
+MIN_OBS = 50            # 담보유형별 회귀 최소 관측치
+BATCH_SIZE = 256        # 한 번에 쌓아서 푸는 모형 수 (메모리 제한)
+ROLLING_WINDOW = 250    # 이동 회귀 구간 (관측치 수, 약 1년)
+OUTPUT_DIR = './output'
+
+LEVEL_VARS = ['BankStress', 'CreditSpread', 'VKOSPI', 'KOSPI_ret', 'YieldSlope', 'r10']
+PANEL_VARS = ['RepoSpread'] + LEVEL_VARS
+
+# 1차 차분 변수: 차분 컬럼 -> 원 변수
+DIFF_SOURCE = {
+    'd_spread': 'RepoSpread',
+    'd_bank': 'BankStress',
+    'd_credit': 'CreditSpread',
+    'd_vkospi': 'VKOSPI',
+    'd_slope': 'YieldSlope',
+    'd_r10': 'r10'
+}
+DIFF_VARS = ['d_bank', 'd_credit', 'd_vkospi', 'KOSPI_ret', 'd_slope', 'd_r10']
+LAG_VARS = ['d_bank', 'd_credit']
+
+# -----------------------------------------------------------------------------
+# 결과 포맷 (노트북과 동일)
+# -----------------------------------------------------------------------------
+def format_pvalue(p):
+    """p-value 포맷팅"""
+    if p < 0.001:
+        return "<0.001"
+    else:
+        return f"{p:.4f}"
+
+def get_significance(p):
+    """유의수준 별표"""
+    if p < 0.01:
+        return '***'
+    elif p < 0.05:
+        return '**'
+    elif p < 0.1:
+        return '*'
+    return ''
+
+class OLSResult:
+    """
+    배치 추정 결과 1건 (statsmodels 결과와 같은 속성명: params, bse, tvalues, pvalues, nobs, rsquared ...)
+    """
+    def __init__(self, names, params, bse, nobs, ssr, tss, df_resid, k_constant, use_t):
+        self.params = pd.Series(params, index=names)
+        self.bse = pd.Series(bse, index=names)
+        self.tvalues = self.params / self.bse
+        if use_t:
+            p = 2 * stats.t.sf(np.abs(self.tvalues.values), df_resid)
+        else:
+            p = 2 * stats.norm.sf(np.abs(self.tvalues.values))
+        self.pvalues = pd.Series(p, index=names)
+        self.std_errors = self.bse    # linearmodels 속성명
+        self.tstats = self.tvalues
+        self.nobs = nobs
+        self.ssr = ssr
+        self.df_resid = df_resid
+        self.rsquared = 1 - ssr / tss
+        self.rsquared_adj = 1 - (nobs - k_constant) / df_resid * (1 - self.rsquared)
+
+    def coef_table(self):
+        """노트북 reg_*.csv 형식의 계수표"""
+        return pd.DataFrame({
+            '변수': self.params.index,
+            '계수': self.params.values.round(4),
+            '표준오차': self.bse.values.round(4),
+            't-stat': self.tvalues.values.round(3),
+            'p-value': [format_pvalue(p) for p in self.pvalues],
+            '유의': [get_significance(p) for p in self.pvalues]
+        })
+
+# -----------------------------------------------------------------------------
+# 배치 최소제곱
+# -----------------------------------------------------------------------------
+def _meat(scores, cov_type, maxlags, clusters):
+    """
+    샌드위치 가운데 항 (배치): scores (B, n, k) -> (B, k, k)
+    패딩 행은 score가 0이므로 합계/시차곱에 영향 없음 (패딩은 항상 뒤쪽)
+    """
+    meat = scores.transpose(0, 2, 1) @ scores
+    if cov_type == 'HAC':
+        for lag in range(1, maxlags + 1):
+            w = 1 - lag / (maxlags + 1)
+            cross = scores[:, lag:].transpose(0, 2, 1) @ scores[:, :-lag]
+            meat += w * (cross + cross.transpose(0, 2, 1))
+    elif cov_type == 'cluster':
+        meat = np.empty_like(meat)
+        for j, codes in enumerate(clusters):
+            sums = np.zeros((codes.max() + 1, scores.shape[2]))
+            np.add.at(sums, codes, scores[j, :len(codes)])
+            meat[j] = sums.T @ sums
+    return meat
+
+def fit_batch(ys, Xs, names, cov_type='nonrobust', maxlags=HAC_MAXLAGS, clusters=None, k_constant=1):
+    """
+    여러 OLS 모형을 한 번에 추정
+
+    Args:
+        ys: 종속변수 배열 리스트 (모형마다 길이가 달라도 됨)
+        Xs: 설계행렬 리스트 (n_i, k_i) - 상수항 포함 여부는 k_constant로 지정
+        names: 설계행렬 컬럼명 리스트 (모형별) 또는 공통 리스트 1개
+        cov_type: 'nonrobust' / 'HC1' / 'HAC' / 'cluster'
+        clusters: cov_type='cluster'일 때 모형별 그룹 코드 배열 (0부터 시작하는 정수)
+        k_constant: 1이면 중심화 R², 0이면 비중심화 R² (고정효과 within 추정 등)
+
+    Returns:
+        list: OLSResult (입력 순서)
+    """
+    if names and isinstance(names[0], str):
+        names = [names] * len(Xs)
+
+    results = [None] * len(Xs)
+    by_k = {}
+    for i, X in enumerate(Xs):
+        by_k.setdefault(X.shape[1], []).append(i)
+
+    for k, members in by_k.items():
+        for start in range(0, len(members), BATCH_SIZE):
+            idx = members[start:start + BATCH_SIZE]
+            n_max = max(len(ys[i]) for i in idx)
+
+            # 변수 개수가 같은 모형을 0-패딩으로 쌓기 (B, n_max, k)
+            X3 = np.zeros((len(idx), n_max, k))
+            Y = np.zeros((len(idx), n_max))
+            nobs = np.empty(len(idx), dtype=np.int64)
+            for j, i in enumerate(idx):
+                n = len(ys[i])
+                X3[j, :n] = Xs[i]
+                Y[j, :n] = ys[i]
+                nobs[j] = n
+
+            Q, R = np.linalg.qr(X3)
+            params = np.linalg.solve(R, Q.transpose(0, 2, 1) @ Y[..., None])[..., 0]
+            R_inv = np.linalg.inv(R)
+            xpxi = R_inv @ R_inv.transpose(0, 2, 1)
+
+            resid = Y - (X3 @ params[..., None])[..., 0]
+            ssr = (resid ** 2).sum(axis=1)
+            df_resid = nobs - k
+            valid = np.arange(n_max)[None, :] < nobs[:, None]
+            if k_constant:
+                ybar = Y.sum(axis=1) / nobs
+                tss = (((Y - ybar[:, None]) ** 2) * valid).sum(axis=1)
+            else:
+                tss = (Y ** 2).sum(axis=1)
+
+            if cov_type == 'nonrobust':
+                cov = xpxi * (ssr / df_resid)[:, None, None]
+            else:
+                scores = X3 * resid[..., None]
+                group_codes = [clusters[i] for i in idx] if cov_type == 'cluster' else None
+                cov = xpxi @ _meat(scores, cov_type, maxlags, group_codes) @ xpxi
+                if cov_type in ('HC1', 'cluster'):
+                    cov *= (nobs / df_resid)[:, None, None]
+            bse = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+
+            for j, i in enumerate(idx):
+                results[i] = OLSResult(names[i], params[j], bse[j], int(nobs[j]), ssr[j], tss[j],
+                                       int(df_resid[j]), k_constant, use_t=(cov_type in ('nonrobust', 'cluster')))
+    return results
+
+# -----------------------------------------------------------------------------
+# 설계행렬
+# -----------------------------------------------------------------------------
+def diff_columns(n_lags=N_LAGS):
+    """1차 차분 회귀 설명변수 (노트북과 같은 순서)"""
+    cols = list(DIFF_VARS)
+    for lag in range(1, n_lags + 1):
+        cols.extend([f'{v}_L{lag}' for v in LAG_VARS])
+    return cols
+
+def add_diff_terms(df, n_lags=N_LAGS, by=None):
+    """
+    1차 차분 + 시차 변수 추가 후 결측 제거
+    by: 패널이면 그룹 인덱스 레벨명 (예: 'collateral') - 그룹 내에서만 차분/시차
+    """
+    out = df.copy()
+    source = out.groupby(level=by) if by else out
+    for d_col, col in DIFF_SOURCE.items():
+        out[d_col] = source[col].diff()
+    source = out.groupby(level=by) if by else out
+    for lag in range(1, n_lags + 1):
+        for v in LAG_VARS:
+            out[f'{v}_L{lag}'] = source[v].shift(lag)
+    return out.dropna()
+
+def design(df, y_col, x_cols, add_const=True):
+    """(y, X, 컬럼명) - 상수항은 statsmodels add_constant처럼 맨 앞"""
+    y = df[y_col].to_numpy(dtype=float)
+    X = df[x_cols].to_numpy(dtype=float)
+    names = list(x_cols)
+    if add_const:
+        X = np.column_stack([np.ones(len(X)), X])
+        names = ['const'] + names
+    return y, X, names
+
+def within(df, cols, entity_level='collateral'):
+    """고정효과 within 변환 (그룹 평균 차감) + 그룹 코드"""
+    demeaned = df[cols] - df[cols].groupby(level=entity_level).transform('mean')
+    codes = pd.factorize(df.index.get_level_values(entity_level))[0]
+    return demeaned, codes
+
+# -----------------------------------------------------------------------------
+# 노트북 회귀 일괄 실행
+# -----------------------------------------------------------------------------
+def time_series_specs(df_analysis, df_panel, n_lags=N_LAGS, min_obs=MIN_OBS):
+    """
+    시계열 회귀 설계행렬 (전체 시장 + 담보유형별, 수준/1차 차분)
+    최소 관측치 조건은 노트북과 동일
+
+    Returns:
+        dict: {'level': [(라벨, (y, X, 컬럼명)), ...], 'diff': [...], 'df_diff': 전체 시장 차분 데이터}
+              라벨은 전체 시장이 None, 나머지는 담보유형명
+    """
+    x_diff = diff_columns(n_lags)
+    panel_reg = df_panel[PANEL_VARS].dropna()
+    collaterals = sorted(panel_reg.index.get_level_values('collateral').unique())
+
+    df_diff = add_diff_terms(df_analysis, n_lags)
+    level = [(None, design(df_analysis, 'RepoSpread', LEVEL_VARS))]
+    diff = [(None, design(df_diff, 'd_spread', x_diff))]
+    for coll in collaterals:
+        df_coll = panel_reg.xs(coll, level='collateral')
+        if len(df_coll) < min_obs:
+            continue
+        level.append((coll, design(df_coll, 'RepoSpread', LEVEL_VARS)))
+        df_coll_diff = add_diff_terms(df_coll, n_lags)
+        if len(df_coll_diff) >= min_obs:
+            diff.append((coll, design(df_coll_diff, 'd_spread', x_diff)))
+    return {'level': level, 'diff': diff, 'df_diff': df_diff}
+
+def run_all(df_analysis, df_panel, n_lags=N_LAGS, min_obs=MIN_OBS):
+    """
+    회귀 분석 노트북 Part 1~6 을 배치로 실행
+
+    Returns:
+        dict: model_level, model_diff, model_panel, model_panel_diff (OLSResult),
+              level_results, diff_results, panel_results, panel_diff_results,
+              coll_level_df, coll_diff_df (DataFrame, reg_*.csv 형식), specs (time_series_specs 결과)
+    """
+    x_diff = diff_columns(n_lags)
+    specs = time_series_specs(df_analysis, df_panel, n_lags, min_obs)
+    df_diff = specs['df_diff']
+
+    # 수준 회귀 (HAC) / 1차 차분 회귀 (HC1): 전체 시장 + 담보별을 각각 한 번에
+    level_fits = fit_batch(*zip(*[spec for _, spec in specs['level']]), cov_type='HAC', maxlags=HAC_MAXLAGS)
+    diff_fits = fit_batch(*zip(*[spec for _, spec in specs['diff']]), cov_type='HC1')
+
+    # 패널 고정효과 (담보 클러스터)
+    panel_reg = df_panel[PANEL_VARS].dropna()
+    panel_level, codes_level = within(panel_reg, PANEL_VARS)
+    panel_diff_df = add_diff_terms(df_panel, n_lags, by='collateral')
+    panel_diff, codes_diff = within(panel_diff_df, ['d_spread'] + x_diff)
+    model_panel, model_panel_diff = fit_batch(
+        [panel_level['RepoSpread'].to_numpy(), panel_diff['d_spread'].to_numpy()],
+        [panel_level[LEVEL_VARS].to_numpy(), panel_diff[x_diff].to_numpy()],
+        [LEVEL_VARS, x_diff], cov_type='cluster', clusters=[codes_level, codes_diff], k_constant=0
+    )
+
+    model_level, model_diff = level_fits[0], diff_fits[0]
+
+    coll_level_rows = []
+    for (coll, _), m in zip(specs['level'][1:], level_fits[1:]):
+        row = {'담보유형': coll, 'N': int(m.nobs), 'R²': round(m.rsquared, 4)}
+        for v in ['BankStress', 'CreditSpread', 'VKOSPI']:
+            row[v] = m.params[v]
+            row[f'{v}_p'] = m.pvalues[v]
+        coll_level_rows.append(row)
+
+    bank_vars = ['d_bank'] + [f'd_bank_L{i}' for i in range(1, n_lags + 1)]
+    credit_vars = ['d_credit'] + [f'd_credit_L{i}' for i in range(1, n_lags + 1)]
+    coll_diff_rows = []
+    for (coll, _), m in zip(specs['diff'][1:], diff_fits[1:]):
+        row = {'담보유형': coll, 'N': int(m.nobs), 'R²': round(m.rsquared, 4)}
+        for v in ['d_bank', 'd_credit', 'd_vkospi']:
+            row[v] = m.params[v]
+            row[f'{v}_p'] = m.pvalues[v]
+        row['BankStress_총합'] = m.params[bank_vars].sum()
+        row['CreditSpread_총합'] = m.params[credit_vars].sum()
+        coll_diff_rows.append(row)
+
+    return {
+        'model_level': model_level,
+        'model_diff': model_diff,
+        'model_panel': model_panel,
+        'model_panel_diff': model_panel_diff,
+        'df_diff': df_diff,
+        'level_results': model_level.coef_table(),
+        'diff_results': model_diff.coef_table(),
+        'panel_results': model_panel.coef_table(),
+        'panel_diff_results': model_panel_diff.coef_table(),
+        'coll_level_df': pd.DataFrame(coll_level_rows),
+        'coll_diff_df': pd.DataFrame(coll_diff_rows),
+        'specs': specs,
+    }
+
+def save_results(results, output_dir=OUTPUT_DIR):
+    """노트북과 같은 파일명/인코딩으로 CSV 저장"""
+    os.makedirs(output_dir, exist_ok=True)
+    files = {
+        'level_results': 'reg_level_kofr.csv',
+        'diff_results': 'reg_diff_kofr.csv',
+        'panel_results': 'reg_panel_level.csv',
+        'panel_diff_results': 'reg_panel_diff.csv',
+        'coll_level_df': 'reg_collateral_level.csv',
+        'coll_diff_df': 'reg_collateral_diff.csv',
+    }
+    for key, file_name in files.items():
+        results[key].to_csv(os.path.join(output_dir, file_name), encoding='utf-8-sig', index=False)
+    print(f"✓ 결과 저장 완료: {output_dir}/")
+
+# -----------------------------------------------------------------------------
+# 이동(rolling) / 누적(expanding) 회귀 - 시간가변 계수
+# -----------------------------------------------------------------------------
+def rolling_ols(y, X, window=ROLLING_WINDOW, expanding=False, min_nobs=None):
+    """
+    X'X, X'y, y'y 누적합의 차이로 모든 구간의 정규방정식을 구한 뒤 한 번에 풀기
+    (구간마다 다시 적합하지 않음 - 시점당 O(k²) 갱신, statsmodels RollingOLS nonrobust와 동일)
+
+    Args:
+        window: 이동 구간 관측치 수 (expanding=True면 무시)
+        expanding: True면 첫 관측치부터 누적
+        min_nobs: expanding일 때 추정 시작 최소 관측치 (기본 MIN_OBS)
+
+    Returns:
+        dict: params (n, k), bse (n, k), rsquared (n,), nobs (n,) - 추정 불가 시점은 NaN
+    """
+    n, k = X.shape
+    zero = np.zeros((1,))
+    c_xx = np.concatenate([np.zeros((1, k, k)), np.cumsum(X[:, :, None] * X[:, None, :], axis=0)])
+    c_xy = np.concatenate([np.zeros((1, k)), np.cumsum(X * y[:, None], axis=0)])
+    c_y = np.concatenate([zero, np.cumsum(y)])
+    c_yy = np.concatenate([zero, np.cumsum(y ** 2)])
+
+    ends = np.arange(1, n + 1)
+    if expanding:
+        starts = np.zeros(n, dtype=int)
+        valid = ends >= max(min_nobs or MIN_OBS, k + 1)
+    else:
+        starts = ends - window
+        valid = starts >= 0
+    ends, starts = ends[valid], starts[valid]
+    nobs = ends - starts
+
+    xtx = c_xx[ends] - c_xx[starts]
+    xty = c_xy[ends] - c_xy[starts]
+    sum_y = c_y[ends] - c_y[starts]
+    yty = c_yy[ends] - c_yy[starts]
+
+    try:
+        xtx_inv = np.linalg.inv(xtx)
+    except np.linalg.LinAlgError:
+        # 구간 안에서 변수가 상수가 되는 등 특이행렬이 있으면 유사역행렬로
+        xtx_inv = np.linalg.pinv(xtx, hermitian=True)
+    params = (xtx_inv @ xty[..., None])[..., 0]
+    ssr = np.maximum(yty - (params * xty).sum(axis=1), 0)
+    tss = yty - sum_y ** 2 / nobs
+    bse = np.sqrt(np.diagonal(xtx_inv, axis1=1, axis2=2) * (ssr / (nobs - k))[:, None])
+
+    out = {
+        'params': np.full((n, k), np.nan),
+        'bse': np.full((n, k), np.nan),
+        'rsquared': np.full(n, np.nan),
+        'nobs': np.zeros(n, dtype=int),
+    }
+    out['params'][valid] = params
+    out['bse'][valid] = bse
+    out['rsquared'][valid] = 1 - ssr / tss
+    out['nobs'][valid] = nobs
+    return out
+
+def rolling_by_collateral(df_panel, window=ROLLING_WINDOW, expanding=False, x_cols=None, min_nobs=None):
+    """
+    담보유형별 시간가변 수준 회귀 (RepoSpread ~ const + BankStress + CreditSpread + ...)
+    이동 구간은 담보별 관측치 기준 (거래가 없는 날은 건너뜀)
+
+    Returns:
+        DataFrame: 담보유형, date, N, R², {변수}, {변수}_se
+    """
+    x_cols = x_cols or LEVEL_VARS
+    panel_reg = df_panel[['RepoSpread'] + x_cols].dropna()
+    frames = []
+    for coll in sorted(panel_reg.index.get_level_values('collateral').unique()):
+        df_coll = panel_reg.xs(coll, level='collateral')
+        y, X, names = design(df_coll, 'RepoSpread', x_cols)
+        res = rolling_ols(y, X, window, expanding, min_nobs)
+
+        frame = pd.DataFrame({'담보유형': coll, 'date': df_coll.index, 'N': res['nobs'], 'R²': res['rsquared']})
+        for j, name in enumerate(names):
+            frame[name] = res['params'][:, j]
+            frame[f'{name}_se'] = res['bse'][:, j]
+        frames.append(frame[frame['N'] > 0])
+    return pd.concat(frames, ignore_index=True)
+
+# -----------------------------------------------------------------------------
+# 사전 진단 (VIF, Granger) - 노트북 Cell 2.5
+# -----------------------------------------------------------------------------
+def vif(df, cols):
+    """
+    다중공선성 VIF (statsmodels variance_inflation_factor와 동일, 상수항 포함)
+    (X'X)^-1 대각원소 x 각 변수의 제곱합으로 한 번에 계산
+    ※ const 행은 비중심 R² 기준 값 (참고용, 판단은 설명변수 행으로)
+    """
+    _, X, names = design(df, cols[0], cols)
+    xpxi = np.linalg.inv(X.T @ X)
+    # 상수항 자신은 나머지 변수에 상수항이 없으므로 비중심 제곱합
+    ss = ((X - X.mean(axis=0)) ** 2).sum(axis=0)
+    ss[0] = (X[:, 0] ** 2).sum()
+    return pd.DataFrame({'변수': names, 'VIF': np.diag(xpxi) * ss})
+
+def granger(df, pairs, lag=3):
+    """
+    Granger 인과관계 ssr chi2 검정 (statsmodels grangercausalitytests의 ssr_chi2test와 동일)
+    pairs: [(y, x), ...] - x가 y를 예측하는가
+    제약/비제약 모형을 모두 모아 배치로 추정
+
+    Returns:
+        DataFrame: y, x, lag, chi2, p-value
+    """
+    ys, Xs, names = [], [], []
+    for y_col, x_col in pairs:
+        y = df[y_col].to_numpy(dtype=float)
+        x = df[x_col].to_numpy(dtype=float)
+        n = len(y) - lag
+        own = np.column_stack([y[lag - l:lag - l + n] for l in range(1, lag + 1)])
+        other = np.column_stack([x[lag - l:lag - l + n] for l in range(1, lag + 1)])
+        const = np.ones((n, 1))
+        for X in (np.hstack([own, const]), np.hstack([own, other, const])):
+            ys.append(y[lag:])
+            Xs.append(X)
+            names.append([f'c{i}' for i in range(X.shape[1])])
+    fits = fit_batch(ys, Xs, names)
+
+    rows = []
+    for i, (y_col, x_col) in enumerate(pairs):
+        restricted, unrestricted = fits[2 * i], fits[2 * i + 1]
+        chi2 = unrestricted.nobs * (restricted.ssr - unrestricted.ssr) / unrestricted.ssr
+        rows.append({'y': y_col, 'x': x_col, 'lag': lag, 'chi2': chi2, 'p-value': stats.chi2.sf(chi2, lag)})
+    return pd.DataFrame(rows)
+
+def diagnostics(df_analysis, test_vars=('BankStress', 'CreditSpread'), lag=3):
+    """노트북 Cell 2.5 진단: VIF + 양방향 Granger (1차 차분 데이터)"""
+    diag_df = df_analysis.dropna()
+    vif_df = vif(diag_df, ['BankStress', 'CreditSpread', 'VKOSPI', 'KOSPI_ret', 'YieldSlope'])
+    diag_diff = diag_df.diff().dropna()
+    pairs = []
+    for var in test_vars:
+        pairs.extend([('RepoSpread', var), (var, 'RepoSpread')])
+    return vif_df, granger(diag_diff, pairs, lag)
+
+if __name__ == "__main__":
+    import RP_Panel
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'rolling':
+        mode = sys.argv[2] if len(sys.argv) > 2 else str(ROLLING_WINDOW)
+        output_dir = sys.argv[3] if len(sys.argv) > 3 else OUTPUT_DIR
+        _, _, df_panel = RP_Panel.analysis_frames(RP_Panel.load_panel())
+        if mode == 'expanding':
+            rolling = rolling_by_collateral(df_panel, expanding=True)
+            file_name = 'reg_expanding_level.csv'
+        else:
+            rolling = rolling_by_collateral(df_panel, window=int(mode))
+            file_name = 'reg_rolling_level.csv'
+        os.makedirs(output_dir, exist_ok=True)
+        rolling.to_csv(os.path.join(output_dir, file_name), encoding='utf-8-sig', index=False)
+        print(f"✓ 저장 완료: {output_dir}/{file_name} ({len(rolling):,}행)")
+        sys.exit(0)
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_DIR
+    _, df_analysis, df_panel = RP_Panel.analysis_frames(RP_Panel.load_panel())
+    results = run_all(df_analysis, df_panel)
+    for key in ['level_results', 'diff_results', 'panel_results', 'panel_diff_results']:
+        print(f"\n[{key}]")
+        print(results[key].to_string(index=False))
+    save_results(results, output_dir)
@@ -0,0 +1,268 @@
+"""
+금융위원회 REPO거래정보 - 정규화(압축) 저장 스키마
+- 코드/코드명 쌍을 사전(lookup) 테이블로 분리하고 거래 테이블에는 정수 ID만 저장
+- 날짜(basDt, rpOpngDt)는 정수(YYYYMMDD)로 저장, 거래 일련번호(rpSqno)는 원본 문자열 그대로(TEXT) 저장
+- 거래 테이블은 (basDt, rpSqno) 클러스터드 PK의 WITHOUT ROWID 테이블
+- 기존 컬럼명을 그대로 보여주는 호환 뷰 repo_trades 제공 (기존 분석 SQL 그대로 사용 가능)
+  뷰의 basDt는 정수 컬럼을 그대로 노출 -> basDt 조건/정렬에 PK를 사용
+  basDt = '20250102' 같은 문자열 비교는 정수 비교로 바뀌어 그대로 동작하고, SUBSTR(basDt, 1, 4)도 같은 값
+  단, 조회 결과의 basDt는 정수이므로 pandas에서 문자열 연산 전에는 astype(str) 필요
+
+사용법 (기존 DB → 정규화 DB 일괄 변환):
+    python RP_Schema.py <원본.db> <결과.db>
+"""
+
+import os
+import sys
+import sqlite3
+import time
+
+# 원본(와이드) repo_trades 컬럼 순서 - API 응답 필드와 동일
+TRADE_COLUMNS = [
+    'basDt', 'rpSqno', 'rpBuyAplCurCd', 'rpBuyAplCurCdNm',
+    'rdptTermCcd', 'rdptTermCcdNm', 'rpRmngExprDcd', 'rpRmngExprDcdNm',
+    'rpInrt', 'slngShtrFinBzcDcd', 'slngShtrFinBzcDcdNm',
+    'buynShtrFinBzcDcd', 'buynShtrFinBzcDcdNm', 'rpOpngDt',
+    'rpBuyAmt', 'rpMrgamRto', 'scrsItmsKcd', 'scrsItmsKcdNm',
+    'isinCd', 'isinCdNm', 'buyScrtBuyAmt', 'buyScrtEvlAmt'
+]
+
+# 사전 테이블 정의: 테이블명 → 이 사전을 쓰는 (코드 컬럼, 코드명 컬럼, 거래 테이블 ID 컬럼) 목록
+# 매도/매수 업권은 같은 코드 체계이므로 사전 하나를 공유
+DIMENSIONS = {
+    'dim_currency': [('rpBuyAplCurCd', 'rpBuyAplCurCdNm', 'cur_id')],
+    'dim_term': [('rdptTermCcd', 'rdptTermCcdNm', 'term_id')],
+    'dim_rmng_expr': [('rpRmngExprDcd', 'rpRmngExprDcdNm', 'rmng_id')],
+    'dim_fin_bzc': [('slngShtrFinBzcDcd', 'slngShtrFinBzcDcdNm', 'slng_id'),
+                    ('buynShtrFinBzcDcd', 'buynShtrFinBzcDcdNm', 'buyn_id')],
+    'dim_scrs_itms': [('scrsItmsKcd', 'scrsItmsKcdNm', 'scrs_id')],
+    'dim_isin': [('isinCd', 'isinCdNm', 'isin_id')],
+}
+
+# 거래 테이블 컬럼 순서 (INSERT 파라미터 튜플 순서와 동일)
+FACT_TABLE = 'repo_trades_fact'
+FACT_COLUMNS = [
+    'basDt', 'rpSqno', 'cur_id', 'term_id', 'rmng_id', 'rpInrt',
+    'slng_id', 'buyn_id', 'rpOpngDt', 'rpBuyAmt', 'rpMrgamRto',
+    'scrs_id', 'isin_id', 'buyScrtBuyAmt', 'buyScrtEvlAmt'
+]
+FACT_INSERT_SQL = (
+    f"INSERT OR REPLACE INTO {FACT_TABLE} ({', '.join(FACT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(FACT_COLUMNS))})"
+)
+
+def _view_sql():
+    """
+    원본 22개 컬럼명을 그대로 노출하는 호환 뷰 정의
+    basDt/rpSqno는 CAST 없이 노출 (CAST하면 (basDt, rpSqno) PK를 조건/정렬에 쓰지 못함)
+    """
+    select_cols = {
+        'basDt': "f.basDt",
+        'rpSqno': "f.rpSqno",
+        'rpInrt': "f.rpInrt",
+        'rpOpngDt': "CAST(f.rpOpngDt AS TEXT)",
+        'rpBuyAmt': "f.rpBuyAmt",
+        'rpMrgamRto': "f.rpMrgamRto",
+        'buyScrtBuyAmt': "f.buyScrtBuyAmt",
+        'buyScrtEvlAmt': "f.buyScrtEvlAmt",
+    }
+    joins = []
+    for table, columns in DIMENSIONS.items():
+        for code_col, name_col, id_col in columns:
+            alias = id_col.replace('_id', '')
+            select_cols[code_col] = f"{alias}.code"
+            select_cols[name_col] = f"{alias}.name"
+            joins.append(f"LEFT JOIN {table} {alias} ON {alias}.id = f.{id_col}")
+
+    # 원본 테이블과 같은 컬럼 순서
+    select = ',\n            '.join(f"{select_cols[c]} AS {c}" for c in TRADE_COLUMNS)
+    return f'''
+        CREATE VIEW repo_trades AS
+        SELECT
+            {select}
+        FROM {FACT_TABLE} f
+        {chr(10).join('        ' + j for j in joins)}
+    '''
+
+def is_normalized(conn):
+    """
+    정규화 스키마 DB인지 확인
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (FACT_TABLE,)
+    ).fetchone()
+    return row is not None
+
+def init_normalized_schema(conn):
+    """
+    사전 테이블, 거래 테이블, 호환 뷰, 인덱스 생성
+    """
+    cursor = conn.cursor()
+
+    for table in DIMENSIONS:
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                code TEXT,
+                name TEXT,
+                UNIQUE (code, name)
+            )
+        ''')
+
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+            basDt INTEGER NOT NULL,
+            rpSqno TEXT NOT NULL,
+            cur_id INTEGER,
+            term_id INTEGER,
+            rmng_id INTEGER,
+            rpInrt REAL,
+            slng_id INTEGER,
+            buyn_id INTEGER,
+            rpOpngDt INTEGER,
+            rpBuyAmt REAL,
+            rpMrgamRto REAL,
+            scrs_id INTEGER,
+            isin_id INTEGER,
+            buyScrtBuyAmt REAL,
+            buyScrtEvlAmt REAL,
+            PRIMARY KEY (basDt, rpSqno)
+        ) WITHOUT ROWID
+    ''')
+
+    # 수집 상태 추적 테이블 (기존과 동일)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS collection_status (
+            basDt TEXT PRIMARY KEY,
+            total_count INTEGER,
+            collected_count INTEGER,
+            collected_at TEXT,
+            status TEXT
+        )
+    ''')
+
+    # 기존 idx_slng / idx_buyn 대응 (basDt는 PK가 클러스터드 인덱스 역할)
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_fact_slng ON {FACT_TABLE}(slng_id)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_fact_buyn ON {FACT_TABLE}(buyn_id)')
+
+    # 뷰는 데이터가 없으므로 매번 새 정의로 교체 (이전 CAST 뷰를 쓰던 DB도 갱신)
+    cursor.execute('DROP VIEW IF EXISTS repo_trades')
+    cursor.execute(_view_sql())
+    conn.commit()
+
+def _as_int(value):
+    """'20250102' 같은 숫자 문자열은 정수로, 그 외는 그대로 반환"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+def _as_text(value):
+    """일련번호 등 식별자는 문자열 그대로 (앞자리 0 보존)"""
+    if value is None or value == '':
+        return None
+    return str(value)
+
+class CodeEncoder:
+    """
+    API 거래 dict → 거래 테이블 파라미터 튜플 변환기
+    (코드, 코드명) 쌍을 사전 테이블 ID로 바꾸며, 새 쌍은 즉시 사전에 추가
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.cache = {}
+        for table in DIMENSIONS:
+            self.cache[table] = {
+                (code, name): id_ for id_, code, name in conn.execute(f'SELECT id, code, name FROM {table}')
+            }
+
+    def code_id(self, table, code, name):
+        """(코드, 코드명) 쌍의 ID 반환 (없으면 사전에 추가)"""
+        if code is None and name is None:
+            return None
+        key = (code, name)
+        cache = self.cache[table]
+        id_ = cache.get(key)
+        if id_ is None:
+            self.conn.execute(f'INSERT OR IGNORE INTO {table} (code, name) VALUES (?, ?)', key)
+            id_ = self.conn.execute(
+                f'SELECT id FROM {table} WHERE code IS ? AND name IS ?', key
+            ).fetchone()[0]
+            cache[key] = id_
+        return id_
+
+    def encode(self, trade):
+        """거래 dict 1건 → FACT_COLUMNS 순서의 튜플"""
+        ids = {}
+        for table, columns in DIMENSIONS.items():
+            for code_col, name_col, id_col in columns:
+                ids[id_col] = self.code_id(table, trade.get(code_col), trade.get(name_col))
+        return (
+            _as_int(trade.get('basDt')), _as_text(trade.get('rpSqno')),
+            ids['cur_id'], ids['term_id'], ids['rmng_id'], trade.get('rpInrt'),
+            ids['slng_id'], ids['buyn_id'], _as_int(trade.get('rpOpngDt')),
+            trade.get('rpBuyAmt'), trade.get('rpMrgamRto'),
+            ids['scrs_id'], ids['isin_id'],
+            trade.get('buyScrtBuyAmt'), trade.get('buyScrtEvlAmt'),
+        )
+
+    def encode_trades(self, trades_data):
+        return [self.encode(trade) for trade in trades_data]
+
+def migrate_database(src_db, dst_db, batch_size=100000):
+    """
+    기존(와이드) repo_trades DB를 정규화 스키마 DB로 일괄 변환
+    collection_status도 그대로 복사
+    """
+    if os.path.abspath(src_db) == os.path.abspath(dst_db):
+        raise ValueError("원본과 결과 DB는 다른 파일이어야 합니다.")
+
+    src = sqlite3.connect(src_db)
+    dst = sqlite3.connect(dst_db)
+    dst.execute('PRAGMA journal_mode=WAL')
+    dst.execute('PRAGMA synchronous=OFF')
+    dst.execute('PRAGMA cache_size=-262144')
+    init_normalized_schema(dst)
+    encoder = CodeEncoder(dst)
+
+    total = src.execute('SELECT COUNT(*) FROM repo_trades').fetchone()[0]
+    print(f"⏳ 변환 시작: {src_db} → {dst_db} ({total:,}건)")
+
+    t0 = time.time()
+    done = 0
+    cursor = src.execute(f"SELECT {', '.join(TRADE_COLUMNS)} FROM repo_trades ORDER BY basDt, rpSqno")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        trades = [dict(zip(TRADE_COLUMNS, row)) for row in rows]
+        dst.executemany(FACT_INSERT_SQL, encoder.encode_trades(trades))
+        dst.commit()
+        done += len(rows)
+        print(f"  → {done:,}/{total:,}건 ({done / max(time.time() - t0, 1e-9):,.0f}건/초)")
+
+    status_rows = src.execute(
+        'SELECT basDt, total_count, collected_count, collected_at, status FROM collection_status'
+    ).fetchall()
+    dst.executemany('INSERT OR REPLACE INTO collection_status VALUES (?, ?, ?, ?, ?)', status_rows)
+    dst.commit()
+    src.close()
+
+    dst.execute('ANALYZE')
+    dst.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    dst.execute('PRAGMA journal_mode=DELETE')
+    dst.execute('VACUUM')
+    dst.close()
+
+    src_mb = os.path.getsize(src_db) / 1024 ** 2
+    dst_mb = os.path.getsize(dst_db) / 1024 ** 2
+    print(f"✓ 변환 완료: {done:,}건, {time.time() - t0:.1f}초")
+    print(f"  파일 크기: {src_mb:,.1f}MB → {dst_mb:,.1f}MB ({dst_mb / src_mb * 100 if src_mb else 0:.0f}%)")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("사용법: python RP_Schema.py <원본.db> <결과.db>")
+        sys.exit(1)
+    migrate_database(sys.argv[1], sys.argv[2])
@@ -0,0 +1,202 @@
+"""
+금융위원회 REPO거래정보 - 기초통계량 일괄 계산 (담보 x 기간 격자)
+기초통계량 분석 노트북의 describe() / groupby('year').mean() 을 하나의 계산으로 대체
+
+- 입력: 날짜 인덱스의 넓은 표 (컬럼 = 계열, 예: ('spread', '국채'), ('rate', '국채'))
+- 기간 구분: all(전체 기간), year, quarter, month, quarter_end(분기 말 QE_WINDOW 거래일),
+            또는 DatetimeIndex -> 라벨 배열 함수 (해당 없는 날짜는 None)
+- 모든 (기간 구분, 기간, 계열) 그룹을 한 번의 정렬 + bincount로 계산
+  count, mean, std(표본), min, 분위수(선형 보간, pandas와 동일), max
+- 결과 하나에서 spread_summary_stats / yearly_spread_by_collateral / yearly_repo_rate_by_collateral 저장
+
+사용법:
+    python RP_Stats.py [출력폴더]
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import RP_Panel
+
+OUTPUT_DIR = './output'
+QUANTILES = (0.25, 0.5, 0.75)
+QE_WINDOW = 5           # 분기 말 구간 (분기 마지막 거래일 기준 관측일 수)
+TOTAL_COLUMN = '전체'
+
+# 노트북 CSV 컬럼명
+SUMMARY_RENAME = {'count': 'N', 'mean': '평균', 'std': '표준편차', 'min': '최소',
+                  '25%': '25%', '50%': '중앙값', '75%': '75%', 'max': '최대'}
+
+# -----------------------------------------------------------------------------
+# 기간 구분
+# -----------------------------------------------------------------------------
+def _quarter_end_labels(index, window=QE_WINDOW):
+    """분기별 마지막 window개 관측일만 해당 분기 라벨, 나머지는 None"""
+    quarters = index.to_period('Q')
+    from_end = pd.Series(np.arange(len(index))).groupby(np.asarray(quarters)).cumcount(ascending=False)
+    labels = quarters.astype(str).to_numpy(dtype=object)
+    labels[from_end.to_numpy() >= window] = None
+    return labels
+
+PERIODS = {
+    'all': lambda idx: np.full(len(idx), 'all', dtype=object),
+    'year': lambda idx: idx.year.to_numpy(),
+    'quarter': lambda idx: idx.to_period('Q').astype(str).to_numpy(dtype=object),
+    'month': lambda idx: idx.strftime('%Y-%m').to_numpy(dtype=object),
+    'quarter_end': _quarter_end_labels,
+}
+
+def _period_labels(period, index):
+    if callable(period):
+        return np.asarray(period(index), dtype=object)
+    if period not in PERIODS:
+        raise ValueError(f"지원하지 않는 기간 구분: {period}")
+    return PERIODS[period](index)
+
+# -----------------------------------------------------------------------------
+# 통계 계산
+# -----------------------------------------------------------------------------
+def _quantile_name(q):
+    return f'{q * 100:g}%'
+
+def _lerp(a, b, t):
+    """numpy.percentile(linear)과 같은 보간식 (pandas describe와 같은 값)"""
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+def grid_stats(frame, periods=('all', 'year'), quantiles=QUANTILES):
+    """
+    (기간 구분 x 기간 x 계열) 격자 기초통계
+
+    Args:
+        frame: 날짜 인덱스 DataFrame (컬럼 = 계열, MultiIndex 가능)
+        periods: 기간 구분 목록 (이름 또는 함수), 함수는 이름 f'custom{순번}'
+    Returns:
+        DataFrame - 인덱스 (bucket, period, *계열 레벨)
+                    컬럼 count, mean, std, min, 분위수('25%' 등), max
+        관측이 없는 그룹은 count 0, 나머지 NaN (groupby().mean()과 같은 모양)
+    """
+    values = frame.to_numpy(dtype=np.float64)
+    n_rows, n_cols = values.shape
+    finite = ~np.isnan(values)
+
+    # 기간 구분마다 그룹 번호 = offset + 기간 코드 * 계열 수 + 계열 위치
+    gids, vals, keys, offset = [], [], [], 0
+    for i, period in enumerate(periods):
+        name = period if isinstance(period, str) else f'custom{i}'
+        codes, uniques = pd.factorize(_period_labels(period, frame.index), sort=True)
+        mask = finite & (codes >= 0)[:, None]
+        gid = offset + codes[:, None] * n_cols + np.arange(n_cols)[None, :]
+        gids.append(gid[mask])
+        vals.append(values[mask])
+        keys.extend((name, label, col) for label in uniques for col in range(n_cols))
+        offset += len(uniques) * n_cols
+    gid = np.concatenate(gids)
+    val = np.concatenate(vals)
+
+    # 평균은 단순 합산 후 편차 합으로 한 번 보정 (bincount 누적 오차 제거 -> 반올림 경계값도 pandas와 같음)
+    count = np.bincount(gid, minlength=offset)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(gid, weights=val, minlength=offset) / count
+        mean = mean + np.bincount(gid, weights=val - mean[gid], minlength=offset) / count
+        sq = np.bincount(gid, weights=(val - mean[gid]) ** 2, minlength=offset)
+        std = np.sqrt(sq / (count - 1))
+    std[count < 2] = np.nan
+
+    # (그룹, 값) 정렬 한 번 -> 그룹마다 연속 구간에서 최소/분위수/최대
+    order = np.lexsort((val, gid))
+    val = val[order]
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    has = count > 0
+    last = start + np.maximum(count - 1, 0)
+
+    def pick(pos):
+        out = np.full(offset, np.nan)
+        out[has] = val[pos[has]]
+        return out
+
+    stats = {'count': count, 'mean': mean, 'std': std, 'min': pick(start)}
+    for q in quantiles:
+        h = (count - 1) * q
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+        stats[_quantile_name(q)] = _lerp(pick(start + np.maximum(lo, 0)), pick(start + hi), h - lo)
+    stats['max'] = pick(last)
+
+    series = list(frame.columns)
+    names = list(frame.columns.names) if frame.columns.nlevels > 1 else [frame.columns.name or 'series']
+    index = pd.MultiIndex.from_tuples(
+        [(b, label) + (series[c] if frame.columns.nlevels > 1 else (series[c],)) for b, label, c in keys],
+        names=['bucket', 'period'] + names
+    )
+    return pd.DataFrame(stats, index=index)
+
+# -----------------------------------------------------------------------------
+# 노트북 결과표
+# -----------------------------------------------------------------------------
+def notebook_frame(panel):
+    """
+    레포 금리(전체 날짜) + 스프레드(기준금리가 있는 날짜)를 한 표로 - 컬럼 (kind, collateral)
+    """
+    rate = panel['repo_daily'].astype(np.float64).round(RP_Panel.RATE_DECIMALS)
+    spread = RP_Panel.spread_frame(panel).reindex(rate.index)
+    return pd.concat({'rate': rate, 'spread': spread}, axis=1, names=['kind', 'collateral'])
+
+def notebook_tables(stats, collaterals):
+    """
+    grid_stats 결과 -> 노트북 CSV 3종 + 연도별 전체 스프레드 표
+    """
+    summary = stats.xs(('all', 'spread'), level=['bucket', 'kind']).droplevel('period').reindex(collaterals)
+    summary = summary[list(SUMMARY_RENAME)].rename(columns=SUMMARY_RENAME)
+    summary['N'] = summary['N'].astype(int)
+    summary.index.name = None
+
+    yearly = stats.xs('year', level='bucket')['mean']
+    yearly_spread = yearly.xs('spread', level='kind').unstack('collateral').reindex(columns=collaterals)
+    yearly_rate = yearly.xs('rate', level='kind').unstack('collateral').reindex(columns=collaterals)
+    for table in (yearly_spread, yearly_rate):
+        table.index.name = 'year'
+        table.columns.name = None
+
+    yearly_total = stats.xs(('year', 'spread', TOTAL_COLUMN), level=['bucket', 'kind', 'collateral'])
+    yearly_total = yearly_total[['count', 'mean', 'std', 'min', 'max']].rename(columns=SUMMARY_RENAME)
+    yearly_total.index.name = 'year'
+
+    return {
+        'spread_summary_stats': summary,
+        'yearly_spread_by_collateral': yearly_spread.round(2),
+        'yearly_repo_rate_by_collateral': yearly_rate.round(3),
+        'yearly_total_spread': yearly_total,
+    }
+
+def save_tables(tables, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    for name in ['spread_summary_stats', 'yearly_spread_by_collateral', 'yearly_repo_rate_by_collateral']:
+        path = os.path.join(output_dir, f'{name}.csv')
+        tables[name].to_csv(path, encoding='utf-8-sig')
+        print(f"  ✓ 저장: {path}")
+
+def run(panel=None, periods=('all', 'year'), output_dir=OUTPUT_DIR):
+    """기초통계량 노트북 표 계산 + 저장 (periods에 quarter 등을 더하면 stats에 함께 계산됨)"""
+    panel = panel if panel is not None else RP_Panel.load_panel()
+    frame = notebook_frame(panel)
+    stats = grid_stats(frame, periods)
+    tables = notebook_tables(stats, list(panel['repo_daily'].columns))
+    if output_dir:
+        save_tables(tables, output_dir)
+    tables['stats'] = stats
+    return tables
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(__doc__)
+        sys.exit(1)
+
+    tables = run(output_dir=sys.argv[1] if len(sys.argv) > 1 else OUTPUT_DIR)
+    print("\n[전체 기간 기초통계 - 스프레드(bp)]")
+    print(tables['spread_summary_stats'].round(2).to_string())
+    print("\n[연도별 기초통계 - 전체 스프레드(bp)]")
+    print(tables['yearly_total_spread'].round(2).to_string())
@@ -0,0 +1,262 @@
+"""
+금융위원회 REPO거래정보 - 연도별 분할 저장소 (Partitioned Store)
+- 원본 거래를 연도별 DB 파일(repo_trades_YYYY.db) 하나씩에 저장
+- catalog.db에 분할(partition) 목록과 날짜 범위/건수를 등록
+- 조회는 날짜 범위에 해당하는 분할에만, 분할별 읽기 전용 연결로 병렬 실행 후 결과만 병합
+- 새 연도 추가 시 해당 연도 파일만 생성/수정 (다른 연도 파일은 건드리지 않음)
+
+사용법:
+    python RP_Store.py split <기존.db> [저장소 폴더]     # r_2015-2019.db 등을 연도별로 분할
+    python RP_Store.py collect <연도> [저장소 폴더]      # 해당 연도만 API로 수집
+    python RP_Store.py list [저장소 폴더]
+"""
+
+import os
+import sys
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import RP_Aggregate
+
+STORE_DIR = r'C:\Users\jay15\Desktop\DB_DATA\DataBase\store'
+CATALOG_FILE = 'catalog.db'
+PARTITION_PATTERN = 'repo_trades_{key}.db'
+MAX_QUERY_WORKERS = 4     # 동시에 조회할 분할 수
+
+class PartitionedStore:
+    """
+    연도별 분할 저장소
+    """
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.catalog_path = os.path.join(root, CATALOG_FILE)
+        conn = sqlite3.connect(self.catalog_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS partitions (
+                partition_key TEXT PRIMARY KEY,
+                file_name TEXT,
+                min_date TEXT,
+                max_date TEXT,
+                row_count INTEGER,
+                updated_at TEXT
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    # -------------------------------------------------------------------------
+    # 카탈로그
+    # -------------------------------------------------------------------------
+    def partition_path(self, key):
+        return os.path.join(self.root, PARTITION_PATTERN.format(key=key))
+
+    def register(self, key):
+        """
+        분할 하나의 날짜 범위/건수를 카탈로그에 등록(갱신)
+        """
+        path = self.partition_path(key)
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        min_date, max_date = conn.execute('SELECT MIN(basDt), MAX(basDt) FROM repo_trades').fetchone()
+        row_count = conn.execute('SELECT COUNT(*) FROM repo_trades').fetchone()[0]
+        conn.close()
+
+        catalog = sqlite3.connect(self.catalog_path)
+        catalog.execute('''
+            INSERT OR REPLACE INTO partitions (partition_key, file_name, min_date, max_date, row_count, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (str(key), os.path.basename(path), min_date, max_date, row_count, datetime.now().isoformat()))
+        catalog.commit()
+        catalog.close()
+
+    def partitions(self, start_date=None, end_date=None):
+        """
+        날짜 범위와 겹치는 분할 목록 [(key, path, min_date, max_date, row_count)]
+        """
+        conn = sqlite3.connect(self.catalog_path)
+        rows = conn.execute('''
+            SELECT partition_key, file_name, min_date, max_date, row_count
+            FROM partitions
+            WHERE (? IS NULL OR max_date >= ?) AND (? IS NULL OR min_date <= ?)
+            ORDER BY partition_key
+        ''', (start_date, start_date, end_date, end_date)).fetchall()
+        conn.close()
+        return [(k, os.path.join(self.root, f), lo, hi, n) for k, f, lo, hi, n in rows]
+
+    def paths(self, start_date=None, end_date=None):
+        return [p for _, p, _, _, _ in self.partitions(start_date, end_date)]
+
+    def print_catalog(self):
+        print(f"\n{'='*70}")
+        print(f"분할 저장소: {self.root}")
+        print(f"{'='*70}")
+        for key, path, lo, hi, n in self.partitions():
+            print(f"  {key}: {lo} ~ {hi}, {n:,}건 ({os.path.basename(path)})")
+
+    # -------------------------------------------------------------------------
+    # 적재
+    # -------------------------------------------------------------------------
+    def split_legacy(self, src_db):
+        """
+        기존 통합 DB(r_2015-2019.db 등)를 연도별 분할로 복사 (ATTACH + INSERT SELECT, pandas 미사용)
+        분할은 원본 22개 컬럼 그대로의 wide 스키마로 생성 (STORAGE_MODE 설정과 무관)
+        """
+        import RP_Collector as rc
+        import RP_Schema as rs
+
+        src = sqlite3.connect(src_db)
+        years = [r[0] for r in src.execute('SELECT DISTINCT SUBSTR(basDt, 1, 4) FROM repo_trades ORDER BY 1')]
+        src.close()
+
+        for year in years:
+            path = self.partition_path(year)
+            prev = rc.DB_FILE, rc.STORAGE_MODE
+            rc.DB_FILE, rc.STORAGE_MODE = path, 'wide'
+            try:
+                rc.init_database()
+            finally:
+                rc.DB_FILE, rc.STORAGE_MODE = prev
+
+            conn = sqlite3.connect(path)
+            if rs.is_normalized(conn):
+                conn.close()
+                raise ValueError(f"정규화 스키마 분할에는 복사할 수 없습니다: {path}")
+            conn.execute('ATTACH DATABASE ? AS src', (src_db,))
+            conn.execute(f'''
+                INSERT OR REPLACE INTO repo_trades ({', '.join(rc.TRADE_COLUMNS)})
+                SELECT {', '.join(rc.TRADE_COLUMNS)} FROM src.repo_trades
+                WHERE basDt BETWEEN ? AND ?
+            ''', (f'{year}0101', f'{year}1231'))
+            conn.execute('''
+                INSERT OR REPLACE INTO collection_status
+                SELECT * FROM src.collection_status WHERE basDt BETWEEN ? AND ?
+            ''', (f'{year}0101', f'{year}1231'))
+            conn.commit()
+            conn.execute('DETACH DATABASE src')
+            RP_Aggregate.refresh_dirty_dates(conn, verbose=False)
+            conn.close()
+
+            self.register(year)
+            print(f"  ✓ {year} 분할 생성: {path}")
+
+    def collect_year(self, year):
+        """
+        한 연도만 API로 수집해 해당 분할에 저장 (다른 연도 파일은 변경 없음)
+        """
+        import RP_Collector as rc
+
+        prev_db = rc.DB_FILE
+        rc.DB_FILE = self.partition_path(year)
+        try:
+            rc.init_database()
+            rc.collect_date_range(f'{year}0101', f'{year}1231')
+            rc.close_writer()
+        finally:
+            rc.DB_FILE = prev_db
+        self.register(year)
+
+    # -------------------------------------------------------------------------
+    # 조회
+    # -------------------------------------------------------------------------
+    def map_partitions(self, func, start_date=None, end_date=None, workers=MAX_QUERY_WORKERS):
+        """
+        날짜 범위에 해당하는 분할마다 func(conn, key)를 병렬 실행 (분할별 읽기 전용 연결)
+        반환값: 분할 순서대로의 결과 목록
+        """
+        def run(partition):
+            key, path = partition[0], partition[1]
+            conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+            try:
+                return func(conn, key)
+            finally:
+                conn.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, self.partitions(start_date, end_date)))
+
+    def query(self, sql, params=(), start_date=None, end_date=None, key_columns=None):
+        """
+        같은 SQL을 분할마다 실행하고 결과 행만 병합
+        - key_columns=None: 행을 그대로 이어붙임 (날짜별 결과 등 분할 간 겹치지 않는 경우)
+        - key_columns=k: 앞의 k개 컬럼이 같은 행끼리 나머지(SUM/COUNT) 컬럼을 더함
+        반환값: DataFrame
+        """
+        def run(conn, key):
+            cursor = conn.execute(sql, params)
+            return [d[0] for d in cursor.description], cursor.fetchall()
+
+        results = self.map_partitions(run, start_date, end_date)
+        if not results:
+            return pd.DataFrame()
+        columns = results[0][0]
+
+        if key_columns is None:
+            rows = [row for _, part in results for row in part]
+        else:
+            merged = {}
+            for _, part in results:
+                for row in part:
+                    key, values = row[:key_columns], row[key_columns:]
+                    acc = merged.get(key)
+                    merged[key] = list(values) if acc is None else [
+                        (a or 0) + (v or 0) for a, v in zip(acc, values)
+                    ]
+            rows = [k + tuple(v) for k, v in merged.items()]
+
+        return pd.DataFrame(rows, columns=columns)
+
+    def daily_vwap(self, start_date='20150101', end_date='20251231', **kwargs):
+        """
+        분할별 집계 테이블(daily_vwap_agg)에서 일별 가중평균 금리를 병렬 조회 (long format)
+        분할은 날짜가 겹치지 않으므로 결과를 이어붙이기만 함
+        """
+        parts = self.map_partitions(
+            lambda conn, key: RP_Aggregate.load_daily_vwap(conn, start_date=start_date, end_date=end_date, **kwargs),
+            start_date, end_date
+        )
+        if not parts:
+            return pd.DataFrame(columns=['basDt', 'scrsItmsKcdNm', 'vwap_rate'])
+        return pd.concat(parts, ignore_index=True)
+
+    def export_daily_repo_rates(self, output_db, start_date='20150101', end_date='20251231'):
+        """
+        asd.py 통합 결과(D_Repo_2015-2025.db의 daily_repo_rates)와 같은 형태로 저장
+        D_Repo_* 파일 전체를 읽어 합치는 대신 분할별 집계 테이블만 읽음
+        """
+        df = self.daily_vwap(start_date, end_date)
+        df['basDt'] = pd.to_datetime(df['basDt'].astype(str))
+        df['vwap_rate'] = df['vwap_rate'].round(3)
+        wide = df.pivot(index='basDt', columns='scrsItmsKcdNm', values='vwap_rate').sort_index()
+
+        cols = wide.columns.tolist()
+        if RP_Aggregate.TOTAL_LABEL in cols:
+            cols.remove(RP_Aggregate.TOTAL_LABEL)
+            wide = wide[[RP_Aggregate.TOTAL_LABEL] + sorted(cols)]
+
+        conn = sqlite3.connect(output_db)
+        wide.to_sql('daily_repo_rates', conn, if_exists='replace', index=True, index_label='basDt')
+        conn.close()
+        print(f"✓ daily_repo_rates 저장: {output_db} ({len(wide)}일)")
+        return wide
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == 'split' and len(sys.argv) >= 3:
+        store = PartitionedStore(sys.argv[3] if len(sys.argv) > 3 else STORE_DIR)
+        store.split_legacy(sys.argv[2])
+        store.print_catalog()
+    elif command == 'collect' and len(sys.argv) >= 3:
+        store = PartitionedStore(sys.argv[3] if len(sys.argv) > 3 else STORE_DIR)
+        store.collect_year(sys.argv[2])
+        store.print_catalog()
+    elif command == 'list':
+        PartitionedStore(sys.argv[2] if len(sys.argv) > 2 else STORE_DIR).print_catalog()
+    else:
+        print(__doc__)
@@ -0,0 +1,226 @@
+"""
+금융위원회 REPO거래정보 - 합성(가짜) 거래 데이터 생성기 (성능 측정용)
+실제 API와 같은 22개 컬럼, 실제 시장과 비슷한 통화/만기/담보/업권 구성의 repo_trades를 생성
+
+- 날짜마다 (SEED, 날짜)로 난수를 고정 -> 같은 날짜는 기간/행 수와 무관하게 항상 같은 거래
+- 하루치를 numpy로 한 번에 만들고 executemany로 적재 (1M~100M행)
+- 금리 = 연도별 기준금리 + 담보 스프레드 + 만기 프리미엄 + 일별 공통 충격 + 분기말 상승 + 개별 잡음 (소수 셋째 자리)
+- RP_MockAPI(generator='synthetic')가 같은 거래를 API 응답 형식(문자열 값)으로 돌려줌
+
+사용법:
+    python RP_Synth.py <출력.db> <행수> [시작일] [종료일]
+        예: python RP_Synth.py synth_10m.db 10000000 20150101 20251231
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import RP_Calendar
+from RP_Schema import TRADE_COLUMNS
+
+SEED = 20250101
+START_DATE = '20150101'
+END_DATE = '20251231'
+DAY_SIZE_SIGMA = 0.15       # 일별 거래 건수 변동 (로그정규 표준편차)
+INSERT_BATCH = 50000        # executemany 한 번에 넣는 행 수
+
+# (코드, 이름, 비중)
+CURRENCIES = [('KRW', '대한민국 원', 0.96), ('USD', '미국 달러', 0.035), ('JPY', '일본 엔', 0.003),
+              ('EUR', '유럽연합 유로', 0.002)]
+TERMS = [('1', '1영업일', 0.72), ('2', '2~7일', 0.14), ('3', '8일~1개월', 0.09),
+         ('4', '1개월~3개월', 0.04), ('5', '3개월초과', 0.01)]
+TERM_DAYS = [1, 7, 30, 90, 180]                  # 약정 기간 상한 (개시일 계산용)
+TERM_PREMIUM = [0.0, 0.03, 0.08, 0.15, 0.25]     # 만기 프리미엄 (%p)
+REMAINING = [('1', '1일이하'), ('2', '1일초과~1주일이하'), ('3', '1주일초과~1개월이하'),
+             ('4', '1개월초과~3개월이하'), ('5', '3개월초과')]
+
+# (코드, 이름, 비중, 기준금리 대비 스프레드 %p, 기본 증거금률 %, 종목 수)
+COLLATERALS = [
+    ('1', '국채', 0.35, 0.02, 1.0, 200), ('2', '통안채', 0.15, 0.00, 1.0, 80),
+    ('3', '은행채', 0.15, 0.05, 2.0, 600), ('4', '특수채', 0.10, 0.04, 2.0, 400),
+    ('5', '금융채', 0.08, 0.10, 3.0, 500), ('6', '회사채', 0.07, 0.12, 5.0, 1500),
+    ('7', '지방채', 0.02, 0.04, 2.0, 100), ('8', 'CP', 0.05, 0.15, 5.0, 800),
+    ('9', '주식.ETF', 0.03, 0.30, 20.0, 300),
+]
+# (코드, 이름, 매도(자금 차입) 비중, 매수(자금 공급) 비중)
+SECTORS = [('10', '증권', 0.55, 0.10), ('20', '자산운용', 0.10, 0.40), ('30', '은행', 0.10, 0.15),
+           ('40', '신탁', 0.05, 0.20), ('50', '보험', 0.05, 0.05), ('60', '종금', 0.05, 0.03),
+           ('70', '기타', 0.10, 0.07)]
+
+# 연도별 평균 기준금리 (%)
+BASE_RATE_BY_YEAR = {2015: 1.6, 2016: 1.3, 2017: 1.3, 2018: 1.6, 2019: 1.6, 2020: 0.6,
+                     2021: 0.7, 2022: 2.2, 2023: 3.5, 2024: 3.4, 2025: 2.6}
+AMOUNT_MEDIAN = 5e9         # 거래금액 중앙값 (원)
+AMOUNT_SIGMA = 1.2
+RATE_NOISE = 0.04           # 개별 거래 금리 잡음 (%p)
+DAY_SHOCK = 0.03            # 일별 공통 충격 (%p)
+QUARTER_END_BUMP = 0.08     # 분기 말(25일 이후) 금리 상승 (%p)
+ZERO_AMOUNT_SHARE = 0.002   # 매입금액 0 거래 비중 (가중평균 제외 조건 확인용)
+
+def _column(table, i):
+    return np.array([row[i] for row in table], dtype=object)
+
+def _probs(table, i):
+    p = np.array([row[i] for row in table], dtype=float)
+    return p / p.sum()
+
+def rows_for_day(base_date, mean_rows, seed=SEED):
+    """날짜 하나의 거래 건수 (평균 mean_rows, 날짜별로 고정)"""
+    rng = np.random.default_rng([seed, int(base_date), 1])
+    return max(1, int(round(mean_rows * rng.lognormal(-DAY_SIZE_SIGMA ** 2 / 2, DAY_SIZE_SIGMA))))
+
+def generate_day(base_date, n, seed=SEED):
+    """
+    날짜 하나의 거래 n건 -> {컬럼: numpy 배열} (TRADE_COLUMNS 전체)
+    금액/금리 컬럼은 float, 나머지는 문자열(object)
+    """
+    rng = np.random.default_rng([seed, int(base_date)])
+    dt = datetime.strptime(base_date, '%Y%m%d')
+
+    cur = rng.choice(len(CURRENCIES), n, p=_probs(CURRENCIES, 2))
+    term = rng.choice(len(TERMS), n, p=_probs(TERMS, 2))
+    coll = rng.choice(len(COLLATERALS), n, p=_probs(COLLATERALS, 2))
+    seller = rng.choice(len(SECTORS), n, p=_probs(SECTORS, 2))
+    buyer = rng.choice(len(SECTORS), n, p=_probs(SECTORS, 3))
+
+    amount = np.maximum(np.round(rng.lognormal(np.log(AMOUNT_MEDIAN), AMOUNT_SIGMA, n) / 1e8), 1) * 1e8
+    amount[rng.random(n) < ZERO_AMOUNT_SHARE] = 0.0
+
+    base_rate = BASE_RATE_BY_YEAR.get(dt.year, BASE_RATE_BY_YEAR[max(BASE_RATE_BY_YEAR)])
+    day_level = base_rate + rng.normal(0, DAY_SHOCK)
+    if dt.month % 3 == 0 and dt.day >= 25:
+        day_level += QUARTER_END_BUMP
+    spread = np.array([row[3] for row in COLLATERALS])[coll] + np.array(TERM_PREMIUM)[term]
+    rate = np.round(np.maximum(day_level + spread + rng.normal(0, RATE_NOISE, n), 0.001), 3)
+    rate[cur != 0] = np.round(rate[cur != 0] + 2.0, 3)   # 외화 RP는 외화 금리 수준
+
+    haircut = np.array([row[4] for row in COLLATERALS])[coll] + rng.integers(0, 3, n)
+    eval_amount = np.round(amount * (1 + haircut / 100), -4)
+
+    # 개시일 = 기준일 - (약정 기간 안에서 임의 경과일), 익일물은 기준일
+    elapsed = (rng.random(n) * np.array(TERM_DAYS)[term]).astype(int)
+    elapsed[term == 0] = 0
+    opening = np.datetime64(dt.strftime('%Y-%m-%d')) - elapsed.astype('timedelta64[D]')
+    opening = np.char.replace(np.datetime_as_string(opening, unit='D'), '-', '').astype(object)
+
+    issue = rng.integers(0, np.array([row[5] for row in COLLATERALS])[coll])
+    coll_code = _column(COLLATERALS, 0)[coll]
+    isin = ('KR' + coll_code + np.char.zfill(issue.astype(str), 9).astype(object)).astype(object)
+    isin_name = (_column(COLLATERALS, 1)[coll] + ' ' + (issue + 1).astype(str).astype(object)).astype(object)
+
+    return {
+        'basDt': np.full(n, base_date, dtype=object),
+        'rpSqno': np.arange(1, n + 1).astype(str).astype(object),
+        'rpBuyAplCurCd': _column(CURRENCIES, 0)[cur],
+        'rpBuyAplCurCdNm': _column(CURRENCIES, 1)[cur],
+        'rdptTermCcd': _column(TERMS, 0)[term],
+        'rdptTermCcdNm': _column(TERMS, 1)[term],
+        'rpRmngExprDcd': _column(REMAINING, 0)[term],
+        'rpRmngExprDcdNm': _column(REMAINING, 1)[term],
+        'rpInrt': rate,
+        'slngShtrFinBzcDcd': _column(SECTORS, 0)[seller],
+        'slngShtrFinBzcDcdNm': _column(SECTORS, 1)[seller],
+        'buynShtrFinBzcDcd': _column(SECTORS, 0)[buyer],
+        'buynShtrFinBzcDcdNm': _column(SECTORS, 1)[buyer],
+        'rpOpngDt': opening,
+        'rpBuyAmt': amount,
+        'rpMrgamRto': haircut.astype(float),
+        'scrsItmsKcd': coll_code,
+        'scrsItmsKcdNm': _column(COLLATERALS, 1)[coll],
+        'isinCd': isin,
+        'isinCdNm': isin_name,
+        'buyScrtBuyAmt': amount,
+        'buyScrtEvlAmt': eval_amount,
+    }
+
+def day_rows(columns):
+    """generate_day 결과 -> INSERT용 튜플 목록 (TRADE_COLUMNS 순서)"""
+    return list(zip(*[columns[c].tolist() for c in TRADE_COLUMNS]))
+
+def day_records(base_date, n, seed=SEED):
+    """
+    API 응답 item 형식 (모든 값이 문자열인 dict 목록), 휴장일은 빈 목록
+    """
+    if not RP_Calendar.is_trading_day(base_date):
+        return []
+    columns = generate_day(base_date, n, seed)
+    for col in ('rpInrt', 'rpBuyAmt', 'rpMrgamRto', 'buyScrtBuyAmt', 'buyScrtEvlAmt'):
+        columns[col] = columns[col].astype(str).astype(object)
+    values = [columns[c].tolist() for c in TRADE_COLUMNS]
+    return [dict(zip(TRADE_COLUMNS, row)) for row in zip(*values)]
+
+def _init_trade_db(db_path):
+    """RP_Collector와 같은 스키마(repo_trades, collection_status, 인덱스)로 빈 DB 생성"""
+    import RP_Collector as rc
+
+    prev = rc.DB_FILE, rc.STORAGE_MODE
+    rc.DB_FILE, rc.STORAGE_MODE = db_path, 'wide'
+    try:
+        rc.init_database()
+    finally:
+        rc.DB_FILE, rc.STORAGE_MODE = prev
+
+def generate_db(db_path, n_rows, start_date=START_DATE, end_date=END_DATE, seed=SEED, verbose=True):
+    """
+    기간 내 거래일에 n_rows건(근사)을 나눠 repo_trades 생성 + collection_status 'completed' 기록
+    보조 인덱스는 적재 후 다시 만듦
+    반환값: 실제 생성 건수
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(f"이미 있는 파일: {db_path}")
+    _init_trade_db(db_path)
+    days = RP_Calendar.trading_days(start_date, end_date)
+    mean_rows = n_rows / len(days)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA cache_size=-262144')
+    index_sql = [r[0] for r in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'repo_trades' AND sql IS NOT NULL")]
+    for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'repo_trades' AND sql IS NOT NULL").fetchall():
+        conn.execute(f'DROP INDEX {name}')
+
+    insert_sql = (f"INSERT INTO repo_trades ({', '.join(TRADE_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(TRADE_COLUMNS))})")
+    t0 = time.perf_counter()
+    total = 0
+    now = datetime.now().isoformat()
+    for i, base_date in enumerate(days, 1):
+        n = rows_for_day(base_date, mean_rows, seed)
+        rows = day_rows(generate_day(base_date, n, seed))
+        for start in range(0, n, INSERT_BATCH):
+            conn.executemany(insert_sql, rows[start:start + INSERT_BATCH])
+        conn.execute('INSERT OR REPLACE INTO collection_status VALUES (?, ?, ?, ?, ?)',
+                     (base_date, n, n, now, 'completed'))
+        total += n
+        if i % 250 == 0:
+            conn.commit()
+            if verbose:
+                elapsed = time.perf_counter() - t0
+                print(f"  → {base_date}: {i}/{len(days)}일, {total:,}건 ({total / elapsed:,.0f}건/초)")
+    conn.commit()
+
+    if verbose:
+        print("  → 인덱스 생성 중...")
+    for sql in index_sql:
+        conn.execute(sql)
+    conn.commit()
+    conn.close()
+    if verbose:
+        print(f"✓ 합성 DB 생성: {db_path} ({len(days)}일, {total:,}건, {time.perf_counter() - t0:.1f}초)")
+    return total
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    generate_db(sys.argv[1], int(sys.argv[2]),
+                sys.argv[3] if len(sys.argv) > 3 else START_DATE,
+                sys.argv[4] if len(sys.argv) > 4 else END_DATE)
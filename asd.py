@@ -2,6 +2,8 @@ import pandas as pd
 import sqlite3
 from sqlalchemy import create_engine
 
+import RP_Store
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -17,65 +19,86 @@ input_dbs = [
 # 출력 DB 파일
 output_db = f'{BASE_PATH}\\D_Repo_2015-2025.db'
 
+# 연도별 분할 저장소(RP_Store.py) 사용 여부
+# True: D_Repo_* 파일 전체를 읽어 합치는 대신 분할별 일별 집계만 병렬로 읽어 저장
+USE_PARTITION_STORE = False
+STORE_DIR = f'{BASE_PATH}\\store'
+
 # =============================================================================
 # DB 통합
 # =============================================================================
-print("=" * 60)
-print("📂 DB 통합 시작")
-print("=" * 60)
-
-df_list = []
+def merge_daily_dbs(input_dbs, output_db):
+    """
+    기간별 D_Repo DB들의 daily_repo_rates를 하나로 합쳐 output_db에 저장
+    (DB별 전체 읽기 -> concat -> 날짜 중복 제거 -> 정렬 -> to_sql)
+    반환값: 통합 DataFrame (date 인덱스)
+    """
+    df_list = []
 
-for db_path in input_dbs:
-    try:
-        conn = sqlite3.connect(db_path)
-        df_temp = pd.read_sql("SELECT * FROM daily_repo_rates", conn)
-        conn.close()
+    for db_path in input_dbs:
+        try:
+            conn = sqlite3.connect(db_path)
+            df_temp = pd.read_sql("SELECT * FROM daily_repo_rates", conn)
+            conn.close()
         
-        # 날짜 컬럼 처리
-        if 'basDt' in df_temp.columns:
-            df_temp['date'] = pd.to_datetime(df_temp['basDt'])
-            df_temp = df_temp.drop(columns=['basDt'])
-        elif 'index' in df_temp.columns:
-            df_temp['date'] = pd.to_datetime(df_temp['index'])
-            df_temp = df_temp.drop(columns=['index'])
+            # 날짜 컬럼 처리
+            if 'basDt' in df_temp.columns:
+                df_temp['date'] = pd.to_datetime(df_temp['basDt'])
+                df_temp = df_temp.drop(columns=['basDt'])
+            elif 'index' in df_temp.columns:
+                df_temp['date'] = pd.to_datetime(df_temp['index'])
+                df_temp = df_temp.drop(columns=['index'])
         
-        df_list.append(df_temp)
-        print(f"  ✓ {db_path.split(chr(92))[-1]}: {len(df_temp)}일")
+            df_list.append(df_temp)
+            print(f"  ✓ {db_path.split(chr(92))[-1]}: {len(df_temp)}일")
         
-    except Exception as e:
-        print(f"  ✗ {db_path}: 로드 실패 ({e})")
+        except Exception as e:
+            print(f"  ✗ {db_path}: 로드 실패 ({e})")
 
-# 통합
-df_combined = pd.concat(df_list, ignore_index=True)
-df_combined = df_combined.drop_duplicates(subset=['date'], keep='first')
-df_combined = df_combined.sort_values('date').reset_index(drop=True)
-df_combined = df_combined.set_index('date')
+    # 통합
+    df_combined = pd.concat(df_list, ignore_index=True)
+    df_combined = df_combined.drop_duplicates(subset=['date'], keep='first')
+    df_combined = df_combined.sort_values('date').reset_index(drop=True)
+    df_combined = df_combined.set_index('date')
 
-print(f"\n  → 통합 완료: {len(df_combined)}일")
-print(f"  → 기간: {df_combined.index.min().strftime('%Y-%m-%d')} ~ {df_combined.index.max().strftime('%Y-%m-%d')}")
-print(f"  → 컬럼: {df_combined.columns.tolist()}")
+    print(f"\n  → 통합 완료: {len(df_combined)}일")
+    print(f"  → 기간: {df_combined.index.min().strftime('%Y-%m-%d')} ~ {df_combined.index.max().strftime('%Y-%m-%d')}")
+    print(f"  → 컬럼: {df_combined.columns.tolist()}")
 
-# =============================================================================
-# 저장
-# =============================================================================
-print(f"\n💾 저장 중...")
+    # =============================================================================
+    # 저장
+    # =============================================================================
+    print(f"\n💾 저장 중...")
 
-engine = create_engine(f"sqlite:///{output_db}")
-df_combined.to_sql('daily_repo_rates', engine, if_exists='replace', index=True, index_label='basDt')
+    engine = create_engine(f"sqlite:///{output_db}")
+    df_combined.to_sql('daily_repo_rates', engine, if_exists='replace', index=True, index_label='basDt')
+    engine.dispose()
 
-print(f"  ✓ 저장 완료: {output_db}")
+    print(f"  ✓ 저장 완료: {output_db}")
+    return df_combined
 
-# =============================================================================
-# 확인
-# =============================================================================
-print(f"\n{'='*60}")
-print("📊 저장 결과 확인")
-print("=" * 60)
+if __name__ == "__main__":
+    print("=" * 60)
+    print("📂 DB 통합 시작")
+    print("=" * 60)
+
+    if USE_PARTITION_STORE:
+        store = RP_Store.PartitionedStore(STORE_DIR)
+        store.print_catalog()
+        df_combined = store.export_daily_repo_rates(output_db)
+    else:
+        df_combined = merge_daily_dbs(input_dbs, output_db)
+
+    # =============================================================================
+    # 확인
+    # =============================================================================
+    print(f"\n{'='*60}")
+    print("📊 저장 결과 확인")
+    print("=" * 60)
 
-conn_check = sqlite3.connect(output_db)
-df_check = pd.read_sql("SELECT * FROM daily_repo_rates LIMIT 5", conn_check)
-conn_check.close()
+    conn_check = sqlite3.connect(output_db)
+    df_check = pd.read_sql("SELECT * FROM daily_repo_rates LIMIT 5", conn_check)
+    conn_check.close()
 
-print(df_check)
-print(f"\n✅ 통합 완료!")
\ No newline at end of file
+    print(df_check)
+    print(f"\n✅ 통합 완료!")
@@ -0,0 +1,120 @@
+"""
+로컬 스텁 서버(RP_MockAPI)를 상대로 한 수집 테스트
+- RP_FanOut: 미등록 키 / 일일 한도 / 초당 요청 수 제한이 섞여도 모든 날짜가 수집되는지
+- RP_Collector: 일부 페이지만 받은 날짜는 'partial'로 남고, 다시 실행하면 누락 페이지만 받아 완료되는지
+"""
+
+import sqlite3
+
+import pytest
+
+import RP_Collector as rc
+import RP_FanOut as fo
+import RP_Metrics as rm
+import RP_MockAPI
+
+START_DATE, END_DATE = '20250304', '20250306'   # 휴장일 없는 평일 3일
+DATES = ['20250304', '20250305', '20250306']
+TRADES_PER_DAY = 450
+PAGE_SIZE = 100                                  # 하루 5페이지
+
+@pytest.fixture
+def collector_db(tmp_path, monkeypatch):
+    """임시 DB + 빠른 속도 제한 + 재시도 대기 없음 (RP_Collector 전역 설정은 테스트 후 복원)"""
+    db_file = str(tmp_path / 'repo_trades_test.db')
+    monkeypatch.setattr(rm, 'ENABLED', False)
+    monkeypatch.setattr(rc, 'DB_FILE', db_file)
+    monkeypatch.setattr(rc, 'STORAGE_MODE', 'wide')
+    monkeypatch.setattr(rc, 'CACHE_MODE', 'off')
+    monkeypatch.setattr(rc, 'PAGE_SIZE', PAGE_SIZE)
+    monkeypatch.setattr(rc, 'DATE_RETRY_ROUNDS', 0)
+    monkeypatch.setattr(rc, '_rate_limiter', rc.TokenBucket(1000, 1000))
+    rc.init_database()
+    yield db_file
+    rc.close_writer()
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(**kwargs):
+        server, url = RP_MockAPI.start_mock_server(port=0, trades_per_day=TRADES_PER_DAY, **kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def _status(db_file):
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute('SELECT basDt, total_count, collected_count, status FROM collection_status').fetchall()
+    conn.close()
+    return {r[0]: r[1:] for r in rows}
+
+def _trade_counts(db_file):
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute('SELECT basDt, COUNT(*) FROM repo_trades GROUP BY basDt').fetchall()
+    conn.close()
+    return dict(rows)
+
+def _saved_pages(db_file, base_date):
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute('SELECT pageNo FROM collection_pages WHERE basDt = ?', (base_date,)).fetchall()
+    conn.close()
+    return {r[0] for r in rows}
+
+def test_fan_out_with_bad_key_quota_and_rate_limit(collector_db, mock_server, monkeypatch):
+    server, url = mock_server(valid_keys=['good', 'quota'], key_daily_quota=100, key_rate_per_sec=3)
+    server.key_usage['quota'] = 98    # 'quota' 키는 2건만 더 쓸 수 있음 (나머지는 'good' 키가 이어받음)
+
+    codes = []
+    check = RP_MockAPI.check_service_key
+    def recording_check(srv, key):
+        error = check(srv, key)
+        codes.append(error['response']['header']['resultCode'] if error else '00')
+        return error
+    monkeypatch.setattr(RP_MockAPI, 'check_service_key', recording_check)
+    monkeypatch.setattr(fo, 'RATE_LIMITED_WAIT_SEC', 0.05)
+    monkeypatch.setattr(fo.OPERATIONS['getCaseForTrad'], 'page_size', PAGE_SIZE)
+
+    keys = [fo.ServiceKey('bad', rate_per_sec=10), fo.ServiceKey('quota', rate_per_sec=10),
+            fo.ServiceKey('good', rate_per_sec=10)]
+    summary = fo.collect_fan_out(START_DATE, END_DATE, keys=keys, workers_per_key=2,
+                                 base_url=url.rsplit('/', 1)[0])
+    rc.close_writer()
+
+    assert _status(collector_db) == {d: (TRADES_PER_DAY, TRADES_PER_DAY, 'completed') for d in DATES}
+    assert _trade_counts(collector_db) == {d: TRADES_PER_DAY for d in DATES}
+
+    disabled = {s['key']: s['disabled'] for s in summary}
+    assert disabled[keys[0].label] == '키 오류 (30)'
+    assert disabled[keys[1].label] == '일일 한도 초과 응답'
+    assert disabled[keys[2].label] is None
+    assert {'30', '22', '23'} <= set(codes)
+    assert 'bad' not in server.key_usage and server.key_usage['quota'] == 100
+
+def test_collector_resumes_partial_date_with_missing_pages_only(collector_db, mock_server, monkeypatch):
+    # 일일 한도 7건: 최신 날짜(5페이지) 완료 -> 다음 날짜는 1~2페이지만 -> 마지막 날짜는 1페이지부터 실패
+    server, url = mock_server(key_daily_quota=7)
+    monkeypatch.setattr(rc, 'BASE_URL', url)
+
+    rc.collect_date_range(START_DATE, END_DATE, date_workers=1, page_workers=1)
+    rc.get_writer().commit()
+
+    status = _status(collector_db)
+    assert status['20250306'] == (TRADES_PER_DAY, TRADES_PER_DAY, 'completed')
+    assert status['20250305'] == (TRADES_PER_DAY, 2 * PAGE_SIZE, 'partial')
+    assert '20250304' not in status
+    assert _saved_pages(collector_db, '20250305') == {1, 2}
+
+    # 한도 해제 후 다시 실행: 완료 날짜는 건너뛰고, 일부 수집 날짜는 1페이지(건수 확인) + 누락 페이지만 조회
+    server.key_daily_quota = None
+    requests_before = server.request_count
+    rc.collect_date_range(START_DATE, END_DATE, date_workers=1, page_workers=1)
+    rc.close_writer()
+
+    assert server.request_count - requests_before == (1 + 3) + 5
+    assert _status(collector_db) == {d: (TRADES_PER_DAY, TRADES_PER_DAY, 'completed') for d in DATES}
+    assert _trade_counts(collector_db) == {d: TRADES_PER_DAY for d in DATES}